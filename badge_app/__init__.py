@@ -1,4 +1,17 @@
 # -*- coding: utf-8 -*-
-from .app import main
+import sys
+
+
+def main():
+    """带 --headless 时进入无界面模式，不导入 PySide6；否则启动悬浮牌。"""
+
+    if any(参数 == "--headless" or 参数.startswith("--headless=") for 参数 in sys.argv[1:]):
+        from .headless import main as 无界面入口
+
+        sys.exit(无界面入口())
+    from .app import main as 界面入口
+
+    界面入口()
+
 
 __all__ = ["main"]
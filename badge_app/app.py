@@ -1,11 +1,22 @@
 # -*- coding: utf-8 -*-
+import argparse
 import sys
 
 from PySide6 import QtWidgets, QtCore
 
 from .backend import state
-from .backend.market import 行情线程, 写入最近合约, 规范化合约代码
+from .backend.alerts import 添加提醒接收器, 移除提醒接收器, 提醒日志接收器
+from .backend.capture import 回放行情源
+from .backend.catalog import 获取合约目录
+from .backend.hub import 获取行情中心, 关闭行情中心, 设置行情源工厂
+from .backend.latency import 全局启动计时, 全局延迟统计
+from .backend.metrics import 全局指标, 指标导出器
+from .backend.market import 写入最近合约, 格式化价格, 规范化合约代码
+from .backend.snapshot import 价格快照
+from .backend.throttle import 限速投递器
+from .frontend.board import 行情看板窗口
 from .frontend.dialogs import 设置对话框
+from .frontend.layout import 读取组件位置配置
 from .frontend.widgets import 悬浮牌窗口
 
 
@@ -17,14 +28,43 @@ class 主控制(QtCore.QObject):
         state.设置当前合约(self.当前合约)
         写入最近合约(self.当前合约)
         state.保存配置()
+        self._快照 = 价格快照()
+        self._快照.加载()
         self.悬浮牌 = 悬浮牌窗口()
         self.悬浮牌.设置请求.connect(self.打开设置)
+        self._显示快照价格()
         if state.显示大号价格默认:
             self.悬浮牌.show()
 
-        self.行情线程 = None
-        self._启动行情线程(self.当前合约)
+        self._指标导出器 = 指标导出器(state.配置["metrics_port"], state.配置["metrics_file"], state.配置["metrics_interval"])
+        self._指标导出器.启动()
+        self._切换次数 = 全局指标.计数器("tq_badge_contract_switches_total", "悬浮牌切换合约次数")
+
+        self._悬浮牌限速 = 限速投递器(state.配置["badge_max_fps"], self, 名称="badge")
+        self._悬浮牌限速.输出信号.connect(self._更新悬浮牌价格)
+        self._悬浮牌限速.输出信号.connect(self._同步走势)
+        self._托盘限速 = 限速投递器(state.配置["tooltip_max_fps"], self, 名称="tooltip")
+        self._托盘限速.输出信号.connect(self._更新托盘价格)
+
+        self._快照定时器 = QtCore.QTimer(self)
+        self._快照定时器.timeout.connect(self._保存快照)
+        if state.配置["snapshot_interval"] > 0:
+            self._快照定时器.start(int(state.配置["snapshot_interval"] * 1000))
+
+        self.看板 = None
         self._创建托盘()
+        self.行情订阅 = None
+        self._订阅合约(self.当前合约)
+        self._提醒接收器 = [self._托盘提醒]
+        if state.配置["alert_log_path"]:
+            self._提醒接收器.append(提醒日志接收器(state.配置["alert_log_path"]))
+        for 接收器 in self._提醒接收器:
+            添加提醒接收器(接收器)
+        获取行情中心().设置提醒规则(state.配置["price_alerts"])
+        if state.配置["board_visible"]:
+            self.切换看板可见()
+        # 合约目录在首次绘制之后再读盘
+        QtCore.QTimer.singleShot(0, self._核对合约目录)
 
     def _创建托盘(self):
         图标 = self.应用.style().standardIcon(QtWidgets.QStyle.SP_ComputerIcon)
@@ -33,18 +73,23 @@ class 主控制(QtCore.QObject):
 
         self.显示动作 = 菜单.addAction("隐藏大号价格" if self.悬浮牌.isVisible() else "显示大号价格")
         self.锁定动作 = 菜单.addAction("解锁悬浮牌" if self.悬浮牌.已锁定 else "锁定悬浮牌")
+        self.看板动作 = 菜单.addAction("显示看板")
         菜单.addSeparator()
         self.设置动作 = 菜单.addAction("设置")
+        self.延迟动作 = 菜单.addAction("延迟统计")
+        self.延迟动作.setVisible(全局延迟统计.启用)
         菜单.addSeparator()
         self.退出动作 = 菜单.addAction("退出")
 
         self.显示动作.triggered.connect(self.切换悬浮牌可见)
         self.锁定动作.triggered.connect(self.切换锁定)
+        self.看板动作.triggered.connect(self.切换看板可见)
         self.设置动作.triggered.connect(self.打开设置)
+        self.延迟动作.triggered.connect(self.显示延迟统计)
         self.退出动作.triggered.connect(self.退出)
 
         self.托盘.setContextMenu(菜单)
-        self.托盘.setToolTip(f"{self.当前合约} {state.标题前缀}: …")
+        self.托盘.setToolTip(f"{self.当前合约} {state.标题前缀}: {self.悬浮牌.当前价格文本}")
         self.托盘.show()
 
     def 切换悬浮牌可见(self):
@@ -59,6 +104,27 @@ class 主控制(QtCore.QObject):
         self.悬浮牌.切换锁定()
         self.锁定动作.setText("解锁悬浮牌" if self.悬浮牌.已锁定 else "锁定悬浮牌")
 
+    def 切换看板可见(self):
+        if self.看板 is not None and self.看板.isVisible():
+            self.看板.hide()
+            self.看板动作.setText("显示看板")
+            state.配置["board_visible"] = False
+            state.保存配置()
+            return
+        if self.看板 is None:
+            合约列表 = state.配置.get("board_symbols") or []
+            if not 合约列表:
+                self.托盘.showMessage("看板", f"请先在 {state.配置路径} 的 board_symbols 中填写要看的合约")
+                return
+            self.看板 = 行情看板窗口(合约列表, state.配置["board_columns"])
+        self.看板.show()
+        self.看板动作.setText("隐藏看板")
+        state.配置["board_visible"] = True
+        state.保存配置()
+
+    def 显示延迟统计(self):
+        QtWidgets.QMessageBox.information(None, "延迟统计", f"{全局启动计时.汇总文本()}\n\n{全局延迟统计.汇总文本()}")
+
     def 打开设置(self):
         对话 = 设置对话框(self.当前合约, self.悬浮牌)
         对话.合约切换请求.connect(self.切换合约订阅)
@@ -66,52 +132,157 @@ class 主控制(QtCore.QObject):
             self.悬浮牌.应用样式(
                 字号=state.配置["badge_font_size"],
                 颜色=state.配置["badge_font_color"],
-                小字=state.生效小字(),
+                小字=self._小字文本(),
                 小字字号=state.配置["subtitle_font_size"],
                 小字颜色=state.配置["subtitle_font_color"],
             )
-            self.悬浮牌.更新组件位置(state.读取组件位置配置())
+            self.悬浮牌.更新组件位置(读取组件位置配置())
 
-    def _启动行情线程(self, 代码: str):
-        self.行情线程 = 行情线程(代码, state.TQ_USER, state.TQ_PASS)
-        self.行情线程.价格信号.connect(self.处理价格更新)
-        self.行情线程.错误信号.connect(self.处理错误)
-        self.行情线程.start()
+    def _订阅合约(self, 代码: str):
+        self._接入订阅(获取行情中心().订阅(代码))
+
+    def _接入订阅(self, 订阅):
+        self.行情订阅 = 订阅
+        订阅.价格信号.connect(self.处理价格更新)
+        订阅.错误信号.connect(self.处理错误)
+        if 订阅.最新文本 is not None:
+            self.处理价格更新(订阅.最新文本)
+
+    def _断开订阅(self):
+        旧订阅 = self.行情订阅
+        self.行情订阅 = None
+        if 旧订阅 is not None:
+            旧订阅.价格信号.disconnect(self.处理价格更新)
+            旧订阅.错误信号.disconnect(self.处理错误)
+        return 旧订阅
+
+    def _退订合约(self):
+        旧订阅 = self._断开订阅()
+        if 旧订阅 is not None:
+            获取行情中心().退订(旧订阅.合约)
 
     def 切换合约订阅(self, 新合约: str):
         新合约 = 规范化合约代码(新合约)
         if not 新合约 or 新合约 == self.当前合约:
             return
-        旧线程 = self.行情线程
         self.当前合约 = 新合约
+        self._切换次数.增加()
         state.设置当前合约(新合约)
         写入最近合约(新合约)
         state.保存配置()
-        if 旧线程 is not None:
-            旧线程.停止()
-            旧线程.wait(1500)
-        self._启动行情线程(self.当前合约)
-        self.悬浮牌.应用样式(小字=state.生效小字())
-        self.托盘.setToolTip(f"{self.当前合约} {state.标题前缀}: …")
+        # 先清掉旧合约的价格，避免新合约名下短暂显示旧价格
+        self._悬浮牌限速.清空()
+        self._托盘限速.清空()
+        self._快照.合并(获取行情中心().最新价格())
+        self._显示快照价格()
+        self.悬浮牌.重置价格宽度()
+        self.悬浮牌.清空走势()
+        self.悬浮牌.应用样式(小字=self._小字文本())
+        self.托盘.setToolTip(f"{self.当前合约} {state.标题前缀}: {self.悬浮牌.当前价格文本}")
+        旧订阅 = self._断开订阅()
+        旧合约 = 旧订阅.合约 if 旧订阅 is not None else ""
+        self._接入订阅(获取行情中心().切换订阅(旧合约, self.当前合约))
 
     def 退出(self):
-        if self.行情线程 is not None:
-            self.行情线程.停止()
-            self.行情线程.wait(2000)
+        if self.看板 is not None:
+            # 直接关窗会触发 hideEvent 退订，但不改动下次启动是否显示看板
+            self.看板.hide()
+        self._退订合约()
+        for 接收器 in self._提醒接收器:
+            移除提醒接收器(接收器)
+        self._快照定时器.stop()
+        任务 = self._保存快照()
+        关闭行情中心()
+        if 任务 is not None:
+            任务.result()
+        if 全局延迟统计.启用:
+            全局延迟统计.写入文件()
+        state.刷新配置()
+        self._指标导出器.停止()
         self.托盘.hide()
         self.应用.quit()
 
+    def _小字文本(self) -> str:
+        小字 = state.生效小字()
+        if not state.配置["badge_show_tick"]:
+            return 小字
+        资料 = 获取合约目录().获取(self.当前合约)
+        if 资料 is None:
+            return 小字
+        return f"{小字} · {格式化价格(资料.最小变动, 资料.小数位)}"
+
+    def _核对合约目录(self):
+        """补上备注里的最小变动；命令行或配置里的合约已不在市时直接提示，不必等无价格告警。"""
+
+        self.悬浮牌.应用样式(小字=self._小字文本())
+        if 获取合约目录().已知(self.当前合约) is False:
+            self.处理错误(f"在市合约中没有 {self.当前合约}，请检查代码或确认合约是否已到期")
+
+    def _显示快照价格(self):
+        """有当前合约的快照就先半透明显示上次的价格，否则显示 …。"""
+
+        条目 = self._快照.获取(self.当前合约)
+        if 条目 is None:
+            self.悬浮牌.设置过期(False)
+            self.悬浮牌.更新价格文本("…")
+            return
+        价格, 小数位, _时间 = 条目
+        self.悬浮牌.设置过期(True)
+        self.悬浮牌.更新价格文本(格式化价格(价格, 小数位))
+
+    def _保存快照(self):
+        """把本会话的新价格并入快照，有变化时交给后台线程写盘。"""
+
+        if not self._快照.合并(获取行情中心().最新价格()):
+            return None
+        return state.后台写入文本(self._快照.路径, self._快照.导出文本())
+
     def 处理价格更新(self, 文本):
-        self.悬浮牌.更新价格文本(文本)
+        self._悬浮牌限速.提交(文本)
+        self._托盘限速.提交(文本)
+
+    def _更新悬浮牌价格(self, 文本):
+        时刻 = self.行情订阅.最新时刻 if self.行情订阅 is not None else None
+        self.悬浮牌.设置过期(False, 时刻)
+        self.悬浮牌.更新价格文本(文本, 时刻)
+
+    def _同步走势(self, _文本=None):
+        self.悬浮牌.同步走势(获取行情中心().历史(self.当前合约))
+
+    def _更新托盘价格(self, 文本):
         self.托盘.setToolTip(f"{self.当前合约} {state.标题前缀}: {文本}")
 
+    def _托盘提醒(self, 提醒):
+        self.托盘.showMessage("价格提醒", 提醒.文本, QtWidgets.QSystemTrayIcon.Warning)
+
     def 处理错误(self, 信息):
+        self._托盘限速.清空()
         self.托盘.setToolTip(f"{self.当前合约} 出错: {信息}")
 
 
+def 解析命令行(参数列表: list[str]) -> tuple[argparse.Namespace, list[str]]:
+    """返回 (本程序的参数, 留给 Qt 的其余参数)。"""
+
+    解析器 = argparse.ArgumentParser(
+        prog="tq_price_badge.py",
+        description="期货行情透明悬浮牌",
+        epilog="无界面输出价格流：tq_price_badge.py --headless 合约 [合约 ...]，详见 --headless --help",
+    )
+    解析器.add_argument("合约", nargs="?", default=state.合约代码, help="例如 KQ.m@SHFE.cu 或 SHFE.cu2501")
+    解析器.add_argument("--replay", metavar="文件", help="回放 capture_path 录制的行情文件，不连接天勤")
+    解析器.add_argument("--speed", type=float, default=1.0, help="回放倍速，0 表示不等待、尽快回放")
+    return 解析器.parse_known_args(参数列表)
+
+
 def main():
+    参数, qt参数 = 解析命令行(sys.argv[1:])
+    state.设置当前合约(参数.合约)
+    if 参数.replay:
+        设置行情源工厂(lambda: 回放行情源(参数.replay, 参数.speed))
     state.读取配置()
-    app = QtWidgets.QApplication(sys.argv)
+    全局延迟统计.启用 = bool(state.配置["latency_stats_enabled"])
+    app = QtWidgets.QApplication([sys.argv[0], *qt参数])
     app.setQuitOnLastWindowClosed(False)
+    app.aboutToQuit.connect(state.刷新配置)
     控制 = 主控制(app)
     sys.exit(app.exec())
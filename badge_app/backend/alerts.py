@@ -0,0 +1,216 @@
+# -*- coding: utf-8 -*-
+"""价格提醒：按合约配置的阈值、涨跌幅和穿越规则，在行情线程内批量判定。
+
+规则写在配置 price_alerts 中，键为合约代码，值为规则列表::
+
+    {"SHFE.cu2501": [
+        {"type": "above", "price": 72000},
+        {"type": "below", "price": 68000, "rearm": 50},
+        {"type": "move_pct", "pct": 1.5, "ref": 70000},
+        {"type": "cross", "price": 70000, "rearm": 20}
+    ]}
+
+rearm 为回差：高于/低于规则要回到阈值另一侧超过回差才重新生效，涨跌幅规则的回差
+单位是百分点，穿越规则要离开阈值至少回差后才会再次触发。move_pct 不写 ref 时以
+加载规则后收到的第一笔价格为参考价。
+"""
+import json
+import math
+import time
+
+import numpy as np
+
+规则类型 = ("above", "below", "move_pct", "cross")
+
+
+def _数字文本(值: float) -> str:
+    return f"{值:.10g}"
+
+
+class 触发提醒:
+    __slots__ = ("合约", "类型", "阈值", "价格", "参考价", "时间")
+
+    def __init__(self, 合约: str, 类型: str, 阈值: float, 价格: float, 参考价: float, 时间: float):
+        self.合约 = 合约
+        self.类型 = 类型
+        self.阈值 = 阈值
+        self.价格 = 价格
+        self.参考价 = 参考价
+        self.时间 = 时间
+
+    @property
+    def 文本(self) -> str:
+        价格 = _数字文本(self.价格)
+        if self.类型 == "above":
+            return f"{self.合约} 最新价 {价格} 高于 {_数字文本(self.阈值)}"
+        if self.类型 == "below":
+            return f"{self.合约} 最新价 {价格} 低于 {_数字文本(self.阈值)}"
+        if self.类型 == "move_pct":
+            涨跌 = (self.价格 / self.参考价 - 1) * 100
+            return f"{self.合约} 最新价 {价格} 较参考价 {_数字文本(self.参考价)} 变动 {涨跌:+.2f}%"
+        方向 = "上穿" if self.价格 >= self.阈值 else "下穿"
+        return f"{self.合约} 最新价 {价格} {方向} {_数字文本(self.阈值)}"
+
+    def 转为字典(self) -> dict:
+        return {
+            "symbol": self.合约,
+            "type": self.类型,
+            "threshold": self.阈值,
+            "price": self.价格,
+            "ref": None if math.isnan(self.参考价) else self.参考价,
+            "time": self.时间,
+            "text": self.文本,
+        }
+
+
+class 价格提醒引擎:
+    """所有合约的规则摊平成几组 numpy 数组，每批价格只做一次向量化判定。
+
+    规则触发后进入未武装状态，满足复位条件（见模块说明中的回差）之前不会再次触发。
+    非线程安全，由行情线程独占使用。
+    """
+
+    def __init__(self, 规则配置: dict | None = None):
+        self.设置规则(规则配置 or {})
+
+    def 设置规则(self, 规则配置: dict):
+        """替换全部规则并重置触发状态；无法解析的规则打印后跳过。合约代码需已规范化。"""
+
+        合约序号: dict[str, int] = {}
+        编号, 类型, 阈值, 回差, 参考 = [], [], [], [], []
+        for 合约, 规则列表 in (规则配置 or {}).items():
+            for 规则 in 规则列表 or []:
+                try:
+                    if 规则.get("type") not in 规则类型:
+                        raise ValueError(f"type 应为 {'/'.join(规则类型)}")
+                    类型编号 = 规则类型.index(规则["type"])
+                    数值 = float(规则["pct"] if 类型编号 == 2 else 规则["price"])
+                    规则回差 = abs(float(规则.get("rearm") or 0.0))
+                    规则参考 = float(规则["ref"]) if 类型编号 == 2 and 规则.get("ref") is not None else math.nan
+                except (KeyError, TypeError, ValueError, AttributeError) as e:
+                    print(f"忽略无效的价格提醒规则 {合约}: {规则!r} ({e})")
+                    continue
+                if not math.isfinite(数值) or (类型编号 == 2 and 规则参考 == 0):
+                    print(f"忽略无效的价格提醒规则 {合约}: {规则!r}")
+                    continue
+                编号.append(合约序号.setdefault(合约, len(合约序号)))
+                类型.append(类型编号)
+                阈值.append(abs(数值) if 类型编号 == 2 else 数值)
+                回差.append(规则回差)
+                参考.append(规则参考)
+
+        self._合约序号 = 合约序号
+        self._合约名 = list(合约序号)
+        self._编号 = np.asarray(编号, dtype=np.intp)
+        类型数组 = np.asarray(类型, dtype=np.int8)
+        self._类型 = 类型数组
+        self._是高于 = 类型数组 == 0
+        self._是低于 = 类型数组 == 1
+        self._是涨跌幅 = 类型数组 == 2
+        self._是穿越 = 类型数组 == 3
+        self._阈值 = np.asarray(阈值, dtype=np.float64)
+        self._回差 = np.asarray(回差, dtype=np.float64)
+        self._参考 = np.asarray(参考, dtype=np.float64)
+        self._已武装 = np.ones(len(编号), dtype=bool)
+        self._现价 = np.full(len(合约序号), math.nan)
+        self._本批更新 = np.zeros(len(合约序号), dtype=bool)
+
+    def __len__(self) -> int:
+        return len(self._编号)
+
+    def 包含合约(self, 合约: str) -> bool:
+        return 合约 in self._合约序号
+
+    @property
+    def 合约列表(self) -> list[str]:
+        return list(self._合约名)
+
+    def 评估(self, 价格表: dict[str, float], 时间: float | None = None) -> list[触发提醒]:
+        """输入本批 {合约: 最新价}，返回新触发的提醒。没有规则的合约直接忽略。"""
+
+        if not len(self._编号):
+            return []
+        前价 = self._现价.copy()
+        更新 = self._本批更新
+        更新.fill(False)
+        for 合约, 价格 in 价格表.items():
+            序号 = self._合约序号.get(合约)
+            if 序号 is not None and 价格 is not None and math.isfinite(价格):
+                self._现价[序号] = 价格
+                更新[序号] = True
+        if not 更新.any():
+            return []
+
+        有效 = 更新[self._编号]
+        价 = self._现价[self._编号]
+        前 = 前价[self._编号]
+        阈值 = self._阈值
+        回差 = self._回差
+        缺参考 = self._是涨跌幅 & 有效 & np.isnan(self._参考)
+        if 缺参考.any():
+            self._参考[缺参考] = 价[缺参考]
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            偏离 = np.abs(价 / self._参考 - 1) * 100
+            在上方 = 价 >= 阈值
+            条件 = (
+                (self._是高于 & 在上方)
+                | (self._是低于 & (价 <= 阈值))
+                | (self._是涨跌幅 & (偏离 >= 阈值))
+                | (self._是穿越 & (在上方 != (前 >= 阈值)) & ~np.isnan(前))
+            )
+            复位 = (
+                (self._是高于 & (价 < 阈值 - 回差))
+                | (self._是低于 & (价 > 阈值 + 回差))
+                | (self._是涨跌幅 & (偏离 < 阈值 - 回差))
+                | (self._是穿越 & (np.abs(价 - 阈值) >= 回差))
+            )
+        触发 = 条件 & 有效 & self._已武装
+        self._已武装 = (self._已武装 & ~触发) | (复位 & 有效 & ~触发)
+
+        序号列表 = np.flatnonzero(触发)
+        if not len(序号列表):
+            return []
+        时间 = time.time() if 时间 is None else 时间
+        return [
+            触发提醒(
+                self._合约名[self._编号[i]], 规则类型[self._类型[i]], float(阈值[i]),
+                float(价[i]), float(self._参考[i]), 时间,
+            )
+            for i in 序号列表.tolist()
+        ]
+
+
+_接收器列表: list = []
+
+
+def 添加提醒接收器(接收器):
+    """注册 接收器(提醒)，提醒触发后在界面线程依次调用。"""
+
+    if 接收器 not in _接收器列表:
+        _接收器列表.append(接收器)
+
+
+def 移除提醒接收器(接收器):
+    if 接收器 in _接收器列表:
+        _接收器列表.remove(接收器)
+
+
+def 分发提醒(提醒列表: list[触发提醒]):
+    for 提醒 in 提醒列表:
+        for 接收器 in list(_接收器列表):
+            try:
+                接收器(提醒)
+            except Exception as e:
+                print("价格提醒接收器出错:", e)
+
+
+class 提醒日志接收器:
+    """把提醒按 JSON Lines 追加到文件，供外部脚本或监控读取。"""
+
+    def __init__(self, 路径: str):
+        self.路径 = 路径
+
+    def __call__(self, 提醒: 触发提醒):
+        with open(self.路径, "a", encoding="utf-8") as f:
+            f.write(json.dumps(提醒.转为字典(), ensure_ascii=False) + "\n")
@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+"""基于 TqSdk 异步接口的行情引擎，与 行情循环 对外的回调和方法完全一致。
+
+行情循环 每 quote_poll_interval 秒从 wait_update(deadline) 醒来一次，检查停止标志和
+指令队列。这里的 wait_update 不带截止时间：行情处理放在 TqApi 事件循环里的一个
+register_update_notify 协程中，一个协程服务全部订阅；订阅、退订、停止等指令通过
+call_soon_threadsafe 叫醒事件循环，让 wait_update 立即返回，没有数据时线程完全阻塞。
+
+配置 market_engine 为 "asyncio" 时由 行情中心 选用。行情源不支持异步接口（例如
+回放行情源）时退回 行情循环 的轮询。
+"""
+import asyncio
+import threading
+import time
+
+from .market import 行情循环, _无价格提示秒数, _等待次数
+from .metrics import 全局指标
+
+_唤醒次数 = 全局指标.计数器("tq_badge_engine_wakeups_total", "异步引擎为处理指令叫醒事件循环的次数")
+# 只用于在没有新行情时提示无价格和刷新录制缓冲，不参与停止和切换
+_定时检查秒数 = _无价格提示秒数 / 12
+
+
+class _等待中断(Exception):
+    """由唤醒任务抛出，让阻塞中的 wait_update 返回。"""
+
+
+class 异步行情循环(行情循环):
+    def __init__(self, *参数, **关键字参数):
+        super().__init__(*参数, **关键字参数)
+        self._循环 = None
+        self._唤醒锁 = threading.Lock()
+        self._唤醒中 = False
+
+    def 停止(self):
+        super().停止()
+        self._唤醒()
+
+    def 订阅(self, 合约: str):
+        super().订阅(合约)
+        self._唤醒()
+
+    def 退订(self, 合约: str):
+        super().退订(合约)
+        self._唤醒()
+
+    def 提交任务(self, 任务):
+        super().提交任务(任务)
+        self._唤醒()
+
+    def 设置提醒规则(self, 规则配置: dict):
+        super().设置提醒规则(规则配置)
+        self._唤醒()
+
+    def _唤醒(self):
+        """可在任意线程调用；事件循环尚未建立时指令留在队列里，由 _主循环 开头处理。"""
+
+        with self._唤醒锁:
+            if self._唤醒中 or self._循环 is None:
+                return
+            self._唤醒中 = True
+            循环, api = self._循环
+        try:
+            循环.call_soon_threadsafe(self._请求中断, api)
+        except RuntimeError:
+            # 事件循环已关闭，线程正在退出
+            pass
+
+    @staticmethod
+    def _请求中断(api):
+        async def 中断():
+            raise _等待中断()
+
+        # 由 api 管理的任务抛出的异常会从 wait_update 里抛出
+        api.create_task(中断())
+
+    async def _监视行情(self, api):
+        async with api.register_update_notify() as 通道:
+            async for _ in 通道:
+                self._唤醒时刻 = time.perf_counter()
+                self._唤醒墙钟 = time.time()
+                _等待次数.增加()
+                self._推送变化(api, True)
+                if self._录制器 is not None:
+                    self._录制器.按需刷新()
+
+    async def _定时检查(self):
+        while True:
+            await asyncio.sleep(_定时检查秒数)
+            if self._无价格起点:
+                self._检查无价格()
+            if self._录制器 is not None:
+                self._录制器.按需刷新()
+
+    def _处理全部指令(self, api):
+        """处理到队列为空才清除唤醒标记。
+
+        处理期间不再投递唤醒任务，否则它可能在后台任务内部的 wait_update 里抛出。订阅由
+        行情循环 交给事件循环里的协程发出，这里不会阻塞，合约不存在也只报告给该合约。
+        """
+
+        while True:
+            self._唤醒时刻 = time.perf_counter()
+            self._处理指令(api)
+            self._推送变化(api, False)
+            with self._唤醒锁:
+                if self._指令队列.empty():
+                    self._唤醒中 = False
+                    return
+
+    def _主循环(self, api):
+        if not hasattr(api, "register_update_notify"):
+            super()._主循环(api)
+            return
+        # TqApi 没有公开的线程安全调度接口，这里和 TqSdk 内部一样用其事件循环的 call_soon_threadsafe
+        with self._唤醒锁:
+            self._循环 = (api._loop, api)
+            self._唤醒中 = True
+        try:
+            self._处理全部指令(api)
+            api.create_task(self._监视行情(api))
+            api.create_task(self._定时检查())
+            while not self._停止:
+                try:
+                    api.wait_update()
+                except _等待中断:
+                    _唤醒次数.增加()
+                    self._处理全部指令(api)
+        finally:
+            with self._唤醒锁:
+                self._循环 = None
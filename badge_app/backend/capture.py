@@ -0,0 +1,295 @@
+# -*- coding: utf-8 -*-
+"""逐笔行情录制与回放。
+
+录制文件只追加、由定长 48 字节记录组成，开头是一条文件头::
+
+    文件头  8s 标识 "TQTICKS\\0" | u4 版本 | 36 字节保留
+    合约    u1 类型=2 | 3 字节保留 | u4 编号 | 28s 代码 | i4 小数位(-1 未知) | f8 最小变动
+    行情    u1 类型=1 | 3 字节保留 | u4 编号 | f8 接收时间 | f8 最新价 | f8 成交量 | f8 买一价 | f8 卖一价
+
+合约记录总在该合约的第一笔行情之前写入。数值均为小端，缺失的价格为 NaN。
+进程中途退出最多丢失最后一批未写盘的记录，残留的半条记录在下次追加时截掉。
+"""
+import math
+import mmap
+import os
+import struct
+import time
+
+import numpy as np
+
+from .feed import 模拟Quote
+
+记录长度 = 48
+文件标识 = b"TQTICKS\x00"
+格式版本 = 1
+_文件头 = struct.Struct("<8sI36x")
+_合约记录 = struct.Struct("<B3xI28sid")
+_行情记录 = struct.Struct("<B3xIddddd")
+_行情类型 = 1
+_合约类型 = 2
+_行情dtype = np.dtype([
+    ("类型", "u1"), ("保留", "V3"), ("编号", "<u4"), ("时间", "<f8"),
+    ("最新价", "<f8"), ("成交量", "<f8"), ("买一价", "<f8"), ("卖一价", "<f8"),
+])
+_合约dtype = np.dtype([
+    ("类型", "u1"), ("保留", "V3"), ("编号", "<u4"), ("代码", "S28"), ("小数位", "<i4"), ("最小变动", "<f8"),
+])
+
+
+def _读取合约表(记录: np.ndarray) -> dict[int, tuple[str, int | None, float]]:
+    合约表 = {}
+    合约行 = 记录.view(_合约dtype)[记录["类型"] == _合约类型]
+    for 编号, 代码, 小数位, 最小变动 in zip(
+        合约行["编号"].tolist(), 合约行["代码"].tolist(), 合约行["小数位"].tolist(), 合约行["最小变动"].tolist()
+    ):
+        合约表[编号] = (代码.decode("utf-8"), None if 小数位 < 0 else 小数位, 最小变动)
+    return 合约表
+
+
+def _映射记录(文件) -> tuple[mmap.mmap | None, np.ndarray]:
+    """只读映射整个文件，校验文件头后返回 (映射, 记录视图)；末尾不完整的半条记录忽略。"""
+
+    大小 = os.fstat(文件.fileno()).st_size
+    if 大小 < 记录长度:
+        raise ValueError("不是行情录制文件：文件过短")
+    映射 = mmap.mmap(文件.fileno(), 0, access=mmap.ACCESS_READ)
+    标识, 版本 = _文件头.unpack_from(映射, 0)
+    if 标识 != 文件标识 or 版本 != 格式版本:
+        映射.close()
+        raise ValueError("不是行情录制文件或版本不支持")
+    数量 = 大小 // 记录长度 - 1
+    return 映射, np.frombuffer(映射, dtype=_行情dtype, count=数量, offset=记录长度)
+
+
+class 行情录制器:
+    """把收到的每笔行情追加到录制文件，先攒在内存里，按间隔或笔数批量写盘。
+
+    追加到已有文件时沿用其中的合约编号。非线程安全，由行情线程独占使用。
+    """
+
+    def __init__(self, 路径: str, 刷新间隔秒: float = 1.0, 缓冲笔数: int = 4096):
+        self.路径 = 路径
+        self.刷新间隔秒 = float(刷新间隔秒)
+        self.缓冲笔数 = max(1, int(缓冲笔数))
+        self._编号表: dict[str, int] = {}
+        self._跳过合约: set[str] = set()
+        self._缓冲 = bytearray()
+        self._缓冲笔数 = 0
+        self._上次刷新 = time.monotonic()
+        self.已写笔数 = 0
+        self._文件 = self._打开()
+
+    def _打开(self):
+        if os.path.exists(self.路径) and os.path.getsize(self.路径) >= 记录长度:
+            with open(self.路径, "rb") as f:
+                映射, 记录 = _映射记录(f)
+                try:
+                    self._编号表 = {代码: 编号 for 编号, (代码, _, _) in _读取合约表(记录).items()}
+                    完整长度 = (len(记录) + 1) * 记录长度
+                finally:
+                    del 记录
+                    映射.close()
+            文件 = open(self.路径, "r+b")
+            文件.truncate(完整长度)
+            文件.seek(0, os.SEEK_END)
+            return 文件
+        文件 = open(self.路径, "wb")
+        文件.write(_文件头.pack(文件标识, 格式版本))
+        return 文件
+
+    def 已登记(self, 合约: str) -> bool:
+        return 合约 in self._编号表 or 合约 in self._跳过合约
+
+    def 登记(self, 合约: str, 小数位: int | None = None, 最小变动: float = math.nan):
+        """写入合约记录；代码超过 28 字节的合约无法录制，打印一次后跳过。"""
+
+        if self.已登记(合约):
+            return
+        代码 = 合约.encode("utf-8")
+        if len(代码) > 28:
+            print(f"合约代码过长，不录制: {合约}")
+            self._跳过合约.add(合约)
+            return
+        编号 = self._编号表[合约] = len(self._编号表)
+        self._缓冲 += _合约记录.pack(_合约类型, 编号, 代码, -1 if 小数位 is None else int(小数位), 最小变动)
+
+    def 记录(self, 合约: str, 时间: float, 最新价: float, 成交量: float, 买一价: float, 卖一价: float):
+        编号 = self._编号表.get(合约)
+        if 编号 is None:
+            if 合约 in self._跳过合约:
+                return
+            self.登记(合约)
+            编号 = self._编号表.get(合约)
+            if 编号 is None:
+                return
+        self._缓冲 += _行情记录.pack(_行情类型, 编号, 时间, 最新价, 成交量, 买一价, 卖一价)
+        self._缓冲笔数 += 1
+        if self._缓冲笔数 >= self.缓冲笔数:
+            self.刷新()
+
+    def 按需刷新(self):
+        if self._缓冲 and time.monotonic() - self._上次刷新 >= self.刷新间隔秒:
+            self.刷新()
+
+    def 刷新(self):
+        self._上次刷新 = time.monotonic()
+        if not self._缓冲:
+            return
+        self._文件.write(self._缓冲)
+        self._文件.flush()
+        self.已写笔数 += self._缓冲笔数
+        self._缓冲.clear()
+        self._缓冲笔数 = 0
+
+    def 关闭(self):
+        if self._文件.closed:
+            return
+        self.刷新()
+        self._文件.close()
+
+
+class 回放行情源:
+    """内存映射录制文件，按原始节奏的 倍速 倍把行情重新送进行情线程（feed.行情源 协议）。
+
+    倍速 <= 0 时不等待，每次 wait_update 回放至多 每批笔数 笔。超过 跳过空档秒 的
+    行情间隔（例如午休、夜盘前）直接跳过。回放完毕后 wait_update 只等到 deadline。
+    """
+
+    def __init__(self, 路径: str, 倍速: float = 1.0, 每批笔数: int = 256, 跳过空档秒: float = 5.0):
+        self.路径 = 路径
+        self.倍速 = float(倍速)
+        self.每批笔数 = max(1, int(每批笔数))
+        self.跳过空档秒 = float(跳过空档秒)
+        self._文件 = open(路径, "rb")
+        self._映射, self._记录 = _映射记录(self._文件)
+        self._合约表 = _读取合约表(self._记录)
+        self._编号 = {代码: 编号 for 编号, (代码, _, _) in self._合约表.items()}
+        self._quotes: dict[int, 模拟Quote] = {}
+        self._位置 = 0
+        self._锚点 = None
+        self._变化: dict[int, frozenset[str]] = {}
+        self.已回放笔数 = 0
+
+    def __len__(self) -> int:
+        return len(self._记录)
+
+    @property
+    def 已结束(self) -> bool:
+        # 关闭后同样视为结束，可在其他线程安全读取
+        记录 = self._记录
+        return 记录 is None or self._位置 >= len(记录)
+
+    @property
+    def 合约列表(self) -> list[str]:
+        return list(self._编号)
+
+    def get_quote(self, symbol: str) -> 模拟Quote:
+        编号 = self._编号.get(symbol)
+        键 = 编号 if 编号 is not None else symbol
+        quote = self._quotes.get(键)
+        if quote is None:
+            _, 小数位, 最小变动 = self._合约表.get(编号, (symbol, None, math.nan))
+            quote = self._quotes[键] = 模拟Quote(
+                instrument_id=symbol, datetime="", last_price=math.nan, bid_price1=math.nan,
+                ask_price1=math.nan, volume=math.nan, price_tick=最小变动, price_decs=小数位,
+            )
+        return quote
+
+    def get_quote_list(self, symbols: list[str]) -> list[模拟Quote]:
+        return [self.get_quote(代码) for 代码 in symbols]
+
+    def query_quotes(self, **_条件) -> list[str]:
+        return self.合约列表
+
+    def _下一笔时间(self) -> float | None:
+        while self._位置 < len(self._记录):
+            块 = self._记录[self._位置:self._位置 + 4096]
+            行情位置 = np.flatnonzero(块["类型"] == _行情类型)
+            if len(行情位置):
+                return float(块["时间"][行情位置[0]])
+            self._位置 += len(块)
+        return None
+
+    def _回放(self, 截止时间: float, 最多笔数: int):
+        """回放时间不晚于 截止时间 的记录，至多 最多笔数 笔行情。"""
+
+        while 最多笔数 > 0 and self._位置 < len(self._记录):
+            块 = self._记录[self._位置:self._位置 + 4096]
+            是行情 = 块["类型"] == _行情类型
+            未到期 = 是行情 & (块["时间"] > 截止时间)
+            结束 = int(np.argmax(未到期)) if 未到期.any() else len(块)
+            行情序号 = np.flatnonzero(是行情[:结束])[:最多笔数]
+            if len(行情序号) == 最多笔数:
+                结束 = int(行情序号[-1]) + 1
+            self._应用(块[:结束][是行情[:结束]])
+            最多笔数 -= len(行情序号)
+            self._位置 += 结束
+            if 结束 < len(块):
+                return
+
+    def _应用(self, 行情: np.ndarray):
+        self.已回放笔数 += len(行情)
+        for 编号, 时间, 最新价, 成交量, 买一价, 卖一价 in zip(
+            行情["编号"].tolist(), 行情["时间"].tolist(), 行情["最新价"].tolist(),
+            行情["成交量"].tolist(), 行情["买一价"].tolist(), 行情["卖一价"].tolist(),
+        ):
+            quote = self._quotes.get(编号)
+            if quote is None:
+                continue
+            变化 = {"datetime"}
+            for 字段, 值 in (("last_price", 最新价), ("volume", 成交量), ("bid_price1", 买一价), ("ask_price1", 卖一价)):
+                旧值 = quote[字段]
+                if 值 != 旧值 and not (值 != 值 and 旧值 != 旧值):
+                    quote[字段] = 值
+                    变化.add(字段)
+            北京时间 = time.gmtime(时间 + 8 * 3600)
+            quote["datetime"] = time.strftime("%Y-%m-%d %H:%M:%S", 北京时间) + f".{int(时间 % 1 * 1e6):06d}"
+            self._变化[id(quote)] = self._变化.get(id(quote), frozenset()) | 变化
+
+    def wait_update(self, deadline: float | None = None) -> bool:
+        self._变化 = {}
+        下一笔 = self._下一笔时间()
+        if 下一笔 is None:
+            if deadline is not None:
+                time.sleep(max(0.0, deadline - time.time()))
+            return False
+        if self.倍速 <= 0:
+            self._回放(math.inf, self.每批笔数)
+            return bool(self._变化)
+
+        现在 = time.monotonic()
+        if self._锚点 is None:
+            self._锚点 = (现在, 下一笔)
+        墙钟起点, 行情起点 = self._锚点
+        当前行情时间 = 行情起点 + (现在 - 墙钟起点) * self.倍速
+        if 下一笔 - 当前行情时间 > self.跳过空档秒:
+            self._锚点 = (现在, 下一笔)
+            当前行情时间 = 下一笔
+        等待 = (下一笔 - 当前行情时间) / self.倍速
+        if 等待 > 0:
+            剩余 = None if deadline is None else deadline - time.time()
+            if 剩余 is not None and 等待 > 剩余:
+                time.sleep(max(0.0, 剩余))
+                return False
+            time.sleep(等待)
+            当前行情时间 = 下一笔
+        self._回放(当前行情时间, 1 << 30)
+        return bool(self._变化)
+
+    def is_changing(self, obj, key=None) -> bool:
+        变化 = self._变化.get(id(obj))
+        if not 变化:
+            return False
+        if key is None:
+            return True
+        if isinstance(key, str):
+            return key in 变化
+        return any(字段 in 变化 for 字段 in key)
+
+    def close(self):
+        self._quotes.clear()
+        # 先释放引用映射内存的数组，mmap 才能关闭
+        self._记录 = None
+        self._映射.close()
+        self._文件.close()
@@ -0,0 +1,201 @@
+# -*- coding: utf-8 -*-
+"""本地合约资料目录：交易所、品种、到期时间、最小变动、小数位、合约乘数。
+
+由在市期货合约刷新（universe 模块）顺带填充并写盘，启动时从磁盘加载，不需要
+行情会话。按合约代码和 (交易所, 品种) 各建一张哈希表，查询都是 O(1)：
+ - 已知()：输入框和命令行可以立即拒绝不存在或已到期的期货合约
+ - 获取()：行情线程不必从 quote 读小数位，悬浮牌可直接显示最小变动
+
+文件格式为 {"version": 1, "updated_at": Unix 时间, "contracts": [[代码, 交易所,
+品种, 到期时间, 最小变动, 小数位, 合约乘数], ...]}。
+"""
+import json
+import math
+import os
+import re
+import threading
+import time
+
+目录路径 = os.path.join(os.path.expanduser("~"), ".tq_price_tray_catalog.json")
+_格式版本 = 1
+_主连代码正则 = re.compile(r"KQ\.[mi]@([A-Z]+)\.([A-Za-z]+)")
+_普通代码正则 = re.compile(r"([A-Z]+)\.([A-Za-z0-9]+)")
+# 只有“字母品种 + 数字月份”形式的期货合约由目录判定，期权、组合等不在目录范围内
+_期货合约正则 = re.compile(r"([A-Za-z]+)([0-9]+)")
+
+
+def _读取字段(quote, 字段名: str):
+    try:
+        return quote[字段名]
+    except Exception:
+        return getattr(quote, 字段名, None)
+
+
+def _有限数字(值, 默认: float) -> float:
+    try:
+        数值 = float(值)
+    except (TypeError, ValueError):
+        return 默认
+    return 数值 if math.isfinite(数值) else 默认
+
+
+class 合约资料:
+    __slots__ = ("代码", "交易所", "品种", "到期时间", "最小变动", "小数位", "合约乘数")
+
+    def __init__(self, 代码: str, 交易所: str, 品种: str, 到期时间: float, 最小变动: float, 小数位: int, 合约乘数: float):
+        self.代码 = 代码
+        self.交易所 = 交易所
+        self.品种 = 品种
+        self.到期时间 = 到期时间
+        self.最小变动 = 最小变动
+        self.小数位 = 小数位
+        self.合约乘数 = 合约乘数
+
+    @classmethod
+    def 从quote(cls, 代码: str, quote) -> "合约资料 | None":
+        """从订阅到的 quote 读取资料；没有最小变动的（截面未到）返回 None。"""
+
+        最小变动 = _有限数字(_读取字段(quote, "price_tick"), 0.0)
+        if 最小变动 <= 0:
+            return None
+        try:
+            小数位 = max(0, int(_读取字段(quote, "price_decs")))
+        except (TypeError, ValueError, OverflowError):
+            # market 在模块级导入本模块，只能在这里导入
+            from .market import 由最小变动推算小数位
+
+            # 行情线程优先用目录里的小数位，这里不能把 0.5、0.02 这类最小变动的合约取整
+            小数位 = 由最小变动推算小数位(最小变动) or 0
+        交易所, _, 合约 = 代码.partition(".")
+        交易所 = str(_读取字段(quote, "exchange_id") or 交易所)
+        品种 = _读取字段(quote, "product_id")
+        if not 品种:
+            匹配 = _期货合约正则.fullmatch(合约)
+            品种 = 匹配.group(1) if 匹配 else 合约
+        return cls(
+            代码,
+            交易所,
+            str(品种),
+            _有限数字(_读取字段(quote, "expire_datetime"), 0.0),
+            最小变动,
+            小数位,
+            _有限数字(_读取字段(quote, "volume_multiple"), 0.0),
+        )
+
+    def 转为列表(self) -> list:
+        return [self.代码, self.交易所, self.品种, self.到期时间, self.最小变动, self.小数位, self.合约乘数]
+
+
+class 合约目录:
+    """可在任意线程查询；替换() 整体换掉两张表，读者总是看到完整的一版。"""
+
+    def __init__(self, 路径: str | None = None):
+        self.路径 = 路径 or 目录路径
+        self.更新时间 = 0.0
+        self._合约: dict[str, 合约资料] = {}
+        self._品种: dict[tuple[str, str], 合约资料] = {}
+        self._交易所: frozenset[str] = frozenset()
+        self._加载锁 = threading.Lock()
+        self._已加载 = False
+
+    def 加载(self):
+        """首次查询时自动调用；文件缺失或损坏时目录为空，不做任何判定。"""
+
+        with self._加载锁:
+            if self._已加载:
+                return
+            self._已加载 = True
+            try:
+                with open(self.路径, "r", encoding="utf-8") as f:
+                    数据 = json.load(f)
+            except FileNotFoundError:
+                return
+            except Exception as e:
+                print("读取合约目录失败:", e)
+                return
+            if not isinstance(数据, dict) or 数据.get("version") != _格式版本:
+                return
+            资料列表 = []
+            for 条目 in 数据.get("contracts") or []:
+                try:
+                    代码, 交易所, 品种, 到期时间, 最小变动, 小数位, 合约乘数 = 条目
+                    资料列表.append(合约资料(
+                        str(代码), str(交易所), str(品种), float(到期时间), float(最小变动), int(小数位), float(合约乘数)
+                    ))
+                except (TypeError, ValueError):
+                    continue
+            self._建表(资料列表, float(数据.get("updated_at") or 0.0))
+
+    def _建表(self, 资料列表: list[合约资料], 更新时间: float):
+        合约表 = {资料.代码: 资料 for 资料 in 资料列表}
+        品种表 = {}
+        for 资料 in 资料列表:
+            品种表.setdefault((资料.交易所, 资料.品种), 资料)
+        self._合约, self._品种, self._交易所 = 合约表, 品种表, frozenset(键[0] for 键 in 品种表)
+        self.更新时间 = 更新时间
+
+    def 替换(self, 资料列表: list[合约资料]):
+        with self._加载锁:
+            self._已加载 = True
+            self._建表(资料列表, time.time())
+
+    def __len__(self) -> int:
+        if not self._已加载:
+            self.加载()
+        return len(self._合约)
+
+    def 获取(self, 代码: str) -> 合约资料 | None:
+        """返回合约的资料；主连、指数返回该品种任一在市合约的资料（最小变动、小数位相同）。"""
+
+        if not self._已加载:
+            self.加载()
+        资料 = self._合约.get(代码)
+        if 资料 is not None:
+            return 资料
+        匹配 = _主连代码正则.fullmatch(代码)
+        if 匹配:
+            return self._品种.get(匹配.groups())
+        return None
+
+    def 已知(self, 代码: str) -> bool | None:
+        """True/False 表示目录确认存在/不存在；目录为空或代码不在目录覆盖范围内时返回 None。"""
+
+        if not self._已加载:
+            self.加载()
+        if not self._合约:
+            return None
+        if 代码 in self._合约:
+            return True
+        匹配 = _主连代码正则.fullmatch(代码)
+        if 匹配:
+            交易所, 品种 = 匹配.groups()
+        else:
+            匹配 = _普通代码正则.fullmatch(代码)
+            if not 匹配:
+                return None
+            交易所, 合约 = 匹配.groups()
+            匹配 = _期货合约正则.fullmatch(合约)
+            if not 匹配:
+                return None
+            品种 = None
+        if 交易所 not in self._交易所:
+            return None
+        return 品种 is not None and (交易所, 品种) in self._品种
+
+    def 导出文本(self) -> str:
+        数据 = {
+            "version": _格式版本,
+            "updated_at": self.更新时间,
+            "contracts": [资料.转为列表() for 资料 in self._合约.values()],
+        }
+        return json.dumps(数据, ensure_ascii=False, separators=(",", ":"))
+
+
+_全局目录: 合约目录 | None = None
+
+
+def 获取合约目录() -> 合约目录:
+    global _全局目录
+    if _全局目录 is None:
+        _全局目录 = 合约目录()
+    return _全局目录
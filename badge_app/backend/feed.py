@@ -0,0 +1,293 @@
+# -*- coding: utf-8 -*-
+"""行情源接口与确定性的进程内模拟行情。
+
+行情线程只用到 TqApi 的一小部分接口，凡是实现了 行情源 协议的对象都可以代替
+TqApi 注入（见 行情循环 / 行情中心 的 行情源工厂 参数）。模拟行情源 不需要网络和
+账号，同样的参数和调用顺序总是产生同样的价格序列，用于基准测试和离线演示。
+
+模拟行情源 也按 TqApi 的方式提供异步接口（create_task、register_update_notify），
+协程只在 wait_update 内运行，供 async_market.异步行情循环 使用。
+"""
+import asyncio
+import heapq
+import math
+import random
+import time
+import zlib
+from typing import Protocol
+
+
+class 行情源(Protocol):
+    def get_quote(self, symbol: str): ...
+
+    def wait_update(self, deadline: float | None = None) -> bool: ...
+
+    def is_changing(self, obj, key=None) -> bool: ...
+
+    def close(self) -> None: ...
+
+
+class 模拟Quote(dict):
+    """同时支持 quote["last_price"] 和 quote.last_price 两种读法，与 TqSdk 的 Quote 一致。"""
+
+    def __getattr__(self, 名称):
+        try:
+            return self[名称]
+        except KeyError:
+            raise AttributeError(名称) from None
+
+
+class _模拟通知通道:
+    """register_update_notify 返回的通道，与 TqChan(last_only=True) 一样只保留“有更新”。"""
+
+    def __init__(self, 源: "模拟行情源", 对象):
+        self._源 = 源
+        if 对象 is None:
+            self._关注 = None
+        else:
+            self._关注 = {id(项) for 项 in (对象 if isinstance(对象, list) else [对象])}
+        self._事件 = asyncio.Event()
+
+    def _通知(self, 变化编号: set[int]):
+        if self._关注 is None or not self._关注.isdisjoint(变化编号):
+            self._事件.set()
+
+    async def close(self):
+        self._源._通道.discard(self)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *异常):
+        await self.close()
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        await self._事件.wait()
+        self._事件.clear()
+        return True
+
+
+class 模拟行情源:
+    """按固定节奏为已订阅合约生成随机游走报价的 行情源。
+
+    每合约每秒笔数 > 0 时按真实时间节奏出价：订阅后的下一次 wait_update 先出一笔截面，
+    之后各合约的出价时刻错开；为 0 时每次
+    wait_update 立即让下 每批合约数 个合约（轮转）各出一笔，用于测量最大吞吐。
+    价格以 最小变动 为步长游走，每个合约的随机序列只由 种子 和合约代码决定。
+    """
+
+    def __init__(
+        self,
+        每合约每秒笔数: float = 2.0,
+        每批合约数: int = 1,
+        种子: int = 0,
+        最小变动: float = 1.0,
+        价格小数位: int = 0,
+        起始价: float = 1000.0,
+        合约列表: list[str] | None = None,
+    ):
+        self.每合约每秒笔数 = max(0.0, float(每合约每秒笔数))
+        self.每批合约数 = max(1, int(每批合约数))
+        self.种子 = int(种子)
+        self.最小变动 = float(最小变动)
+        self.价格小数位 = int(价格小数位)
+        self.起始价 = float(起始价)
+        self.合约列表 = list(合约列表 or [])
+        self.已关闭 = False
+        self.出价笔数 = 0
+        self._quotes: dict[str, 模拟Quote] = {}
+        self._随机: dict[str, random.Random] = {}
+        self._相位: dict[str, float] = {}
+        self._排程: list[tuple[float, int, str]] = []
+        self._轮转: list[str] = []
+        self._轮转位置 = 0
+        self._变化: dict[int, frozenset[str]] = {}
+        self._事件循环: asyncio.AbstractEventLoop | None = None
+        self._通道: set[_模拟通知通道] = set()
+        self._任务异常: list[BaseException] = []
+
+    @property
+    def _loop(self) -> asyncio.AbstractEventLoop:
+        """与 TqApi._loop 对应，第一次使用异步接口时创建。"""
+
+        if self._事件循环 is None:
+            self._事件循环 = asyncio.new_event_loop()
+        return self._事件循环
+
+    def create_task(self, coro) -> asyncio.Task:
+        任务 = self._loop.create_task(coro)
+        任务.add_done_callback(self._任务结束)
+        return 任务
+
+    def _任务结束(self, 任务: asyncio.Task):
+        # 与 TqApi 一致：任务抛出的异常从 wait_update 里抛出
+        if not 任务.cancelled() and 任务.exception() is not None:
+            self._任务异常.append(任务.exception())
+            self._事件循环.stop()
+
+    def register_update_notify(self, obj=None) -> _模拟通知通道:
+        通道 = _模拟通知通道(self, obj)
+        self._通道.add(通道)
+        return 通道
+
+    def _抛出任务异常(self):
+        if self._任务异常:
+            raise self._任务异常.pop(0)
+
+    def _运行到空闲(self):
+        """让已就绪的协程各跑到下一个 await。"""
+
+        for _ in range(2):
+            self._事件循环.call_soon(self._事件循环.stop)
+            self._事件循环.run_forever()
+            self._抛出任务异常()
+
+    def _睡眠(self, 秒: float | None):
+        """等待 秒 秒，None 表示一直等；用过异步接口后等待期间照常运行协程。"""
+
+        循环 = self._事件循环
+        if 循环 is None:
+            if 秒 is not None:
+                time.sleep(max(0.0, 秒))
+            return
+        截止 = None if 秒 is None else time.monotonic() + 秒
+        while True:
+            句柄 = None
+            if 截止 is not None:
+                剩余 = 截止 - time.monotonic()
+                if 剩余 <= 0:
+                    return
+                句柄 = 循环.call_later(剩余, 循环.stop)
+            try:
+                循环.run_forever()
+            finally:
+                if 句柄 is not None:
+                    句柄.cancel()
+            self._抛出任务异常()
+
+    def get_quote(self, symbol: str) -> 模拟Quote:
+        quote = self._quotes.get(symbol)
+        if quote is not None:
+            return quote
+        quote = 模拟Quote(
+            instrument_id=symbol,
+            datetime="",
+            last_price=math.nan,
+            bid_price1=math.nan,
+            ask_price1=math.nan,
+            volume=0,
+            price_tick=self.最小变动,
+            price_decs=self.价格小数位,
+            volume_multiple=10,
+        )
+        self._quotes[symbol] = quote
+        self._随机[symbol] = random.Random(self.种子 * 1_000_003 + zlib.crc32(symbol.encode("utf-8")))
+        self._轮转.append(symbol)
+        if self.每合约每秒笔数 > 0:
+            间隔 = 1.0 / self.每合约每秒笔数
+            # 与 TqSdk 一样订阅后很快收到截面（第一笔），之后各合约的出价时刻再错开
+            self._相位[symbol] = (len(self._轮转) - 1) % 97 / 97 * 间隔
+            heapq.heappush(self._排程, (time.monotonic(), len(self._轮转), symbol))
+        return quote
+
+    def get_quote_list(self, symbols: list[str]) -> list[模拟Quote]:
+        return [self.get_quote(代码) for 代码 in symbols]
+
+    def query_quotes(self, **_条件) -> list[str]:
+        return list(self.合约列表 or self._quotes)
+
+    def _出价(self, symbol: str, 现在: float) -> frozenset[str]:
+        quote = self._quotes[symbol]
+        随机 = self._随机[symbol]
+        旧价 = quote["last_price"]
+        if math.isnan(旧价):
+            新价 = self.起始价 + 随机.randint(-50, 50) * self.最小变动
+        else:
+            新价 = max(self.最小变动, 旧价 + 随机.choice((-1, 0, 0, 1)) * self.最小变动)
+        新价 = round(新价, self.价格小数位)
+        变化 = {"datetime", "volume"}
+        if 新价 != 旧价:
+            变化.update(("last_price", "bid_price1", "ask_price1"))
+            quote["last_price"] = 新价
+            quote["bid_price1"] = round(新价 - self.最小变动, self.价格小数位)
+            quote["ask_price1"] = round(新价 + self.最小变动, self.价格小数位)
+        quote["volume"] += 随机.randint(1, 20)
+        # 与 TqSdk 一致，datetime 为北京时间
+        北京时间 = time.gmtime(现在 + 8 * 3600)
+        quote["datetime"] = time.strftime("%Y-%m-%d %H:%M:%S", 北京时间) + f".{int(现在 % 1 * 1e6):06d}"
+        self.出价笔数 += 1
+        return frozenset(变化)
+
+    def wait_update(self, deadline: float | None = None) -> bool:
+        if self._事件循环 is not None:
+            # 先运行上一批更新唤醒的协程，此时 is_changing 仍对应上一批
+            self._运行到空闲()
+        self._变化 = {}
+        if self.每合约每秒笔数 <= 0:
+            if not self._轮转:
+                self._等待到(deadline)
+                return False
+            现在 = time.time()
+            for _ in range(min(self.每批合约数, len(self._轮转))):
+                symbol = self._轮转[self._轮转位置 % len(self._轮转)]
+                self._轮转位置 += 1
+                self._变化[id(self._quotes[symbol])] = self._出价(symbol, 现在)
+            self._通知通道()
+            return True
+
+        if not self._排程:
+            self._等待到(deadline)
+            return False
+        下次时刻 = self._排程[0][0]
+        剩余 = 下次时刻 - time.monotonic()
+        if deadline is not None and 剩余 > deadline - time.time():
+            self._等待到(deadline)
+            return False
+        if 剩余 > 0:
+            self._睡眠(剩余)
+        现在单调 = time.monotonic()
+        现在 = time.time()
+        间隔 = 1.0 / self.每合约每秒笔数
+        while self._排程 and self._排程[0][0] <= 现在单调:
+            时刻, 序号, symbol = heapq.heappop(self._排程)
+            self._变化[id(self._quotes[symbol])] = self._出价(symbol, 现在)
+            下次 = 时刻 + 间隔 + self._相位.pop(symbol, 0.0)
+            if 下次 <= 现在单调:
+                # 落后时不补发积压的笔数，从现在起重新排
+                下次 = 现在单调 + 间隔
+            heapq.heappush(self._排程, (下次, 序号, symbol))
+        self._通知通道()
+        return bool(self._变化)
+
+    def _通知通道(self):
+        if self._通道 and self._变化:
+            变化编号 = set(self._变化)
+            for 通道 in list(self._通道):
+                通道._通知(变化编号)
+
+    def _等待到(self, deadline: float | None):
+        self._睡眠(None if deadline is None else deadline - time.time())
+
+    def is_changing(self, obj, key=None) -> bool:
+        变化 = self._变化.get(id(obj))
+        if not 变化:
+            return False
+        if key is None:
+            return True
+        if isinstance(key, str):
+            return key in 变化
+        return any(字段 in 变化 for 字段 in key)
+
+    def close(self):
+        self.已关闭 = True
+        循环 = self._事件循环
+        if 循环 is not None and not 循环.is_closed():
+            任务列表 = asyncio.all_tasks(循环)
+            for 任务 in 任务列表:
+                任务.cancel()
+            if 任务列表:
+                循环.run_until_complete(asyncio.gather(*任务列表, return_exceptions=True))
+            循环.close()
@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+"""按合约保存最近若干笔行情的定长环形缓冲。"""
+import threading
+
+import numpy as np
+
+历史字段 = ("last_price", "volume", "bid_price1", "ask_price1")
+
+
+class 行情环形缓冲:
+    """定容量、按列存储的逐笔历史，追加 O(1)，读取最近 n 笔不复制数据。
+
+    每笔同时写入位置 i 和 i + 容量，任意不超过容量的最近窗口在底层数组里都是连续的，
+    因此 最近() 返回的是 numpy 视图。视图会被后续写入覆盖，需要长期保留时请 copy()；
+    其他线程读取用 读取新增()。
+    内存固定为 2 × 容量 × 每笔字节数。
+    """
+
+    列名 = ("时间", "最新价", "成交量", "买一价", "卖一价")
+    每笔字节数 = 8 * len(列名)
+
+    def __init__(self, 容量: int):
+        if 容量 <= 0:
+            raise ValueError("容量必须为正数")
+        self.容量 = int(容量)
+        self._数据 = np.full((len(self.列名), 2 * self.容量), np.nan, dtype=np.float64)
+        self._总数 = 0
+        self._锁 = threading.Lock()
+
+    def __len__(self) -> int:
+        return min(self._总数, self.容量)
+
+    @property
+    def 占用字节数(self) -> int:
+        return self._数据.nbytes
+
+    def 追加(self, 时间: float, 最新价: float, 成交量: float, 买一价: float, 卖一价: float):
+        with self._锁:
+            位置 = self._总数 % self.容量
+            列 = self._数据[:, 位置]
+            列[0] = 时间
+            列[1] = 最新价
+            列[2] = 成交量
+            列[3] = 买一价
+            列[4] = 卖一价
+            self._数据[:, 位置 + self.容量] = 列
+            self._总数 += 1
+
+    def 最近(self, 数量: int | None = None) -> dict[str, np.ndarray]:
+        """返回最近 数量 笔（默认全部）各列的只读视图，按时间从旧到新排列。"""
+
+        with self._锁:
+            已有 = min(self._总数, self.容量)
+            数量 = 已有 if 数量 is None else max(0, min(int(数量), 已有))
+            结束 = self._总数 % self.容量 + self.容量
+        视图 = self._数据[:, 结束 - 数量:结束]
+        视图.flags.writeable = False
+        return dict(zip(self.列名, 视图))
+
+    @property
+    def 总数(self) -> int:
+        """累计追加的笔数，只增不减。"""
+
+        return self._总数
+
+    def 读取新增(self, 已读总数: int) -> tuple[int, dict[str, np.ndarray]]:
+        """在锁内复制 总数 为 已读总数 之后追加的各笔，返回 (当前总数, 各列)。
+
+        供其他线程增量读取：只复制新增部分。新增超过容量时较早的已被覆盖，只返回最近
+        容量 笔。
+        """
+
+        with self._锁:
+            总数 = self._总数
+            数量 = min(max(0, 总数 - int(已读总数)), self.容量)
+            结束 = 总数 % self.容量 + self.容量
+            return 总数, dict(zip(self.列名, self._数据[:, 结束 - 数量:结束].copy()))
+
+    def 最新(self) -> dict[str, float] | None:
+        with self._锁:
+            if self._总数 == 0:
+                return None
+            位置 = (self._总数 - 1) % self.容量
+            值 = self._数据[:, 位置].tolist()
+        return dict(zip(self.列名, 值))
@@ -0,0 +1,242 @@
+# -*- coding: utf-8 -*-
+"""进程内共享的行情中心：一个 TqApi 会话，多个订阅者。"""
+import time
+
+from PySide6 import QtCore
+
+from . import state
+from .alerts import 分发提醒
+from .async_market import 异步行情循环
+from .latency import 全局延迟统计
+from .market import 行情循环, 规范化合约代码
+from .metrics import 全局指标
+
+_价格信号次数 = 全局指标.计数器("tq_badge_price_signals_total", "向订阅者发出的价格信号数")
+
+# 共享会话意外结束后隔多久重建并恢复订阅
+_重建会话间隔毫秒 = 5000
+
+
+class 行情线程(QtCore.QThread):
+    """在 QThread 里运行 行情循环，把它的回调转成信号，经排队连接送到界面线程。"""
+
+    价格就绪信号 = QtCore.Signal()
+    错误信号 = QtCore.Signal(str, str)
+    提醒信号 = QtCore.Signal(object)
+
+    def __init__(self, 循环类, 用户, 密码, 行情源工厂=None, 父=None):
+        super().__init__(父)
+        self.循环 = 循环类(
+            用户,
+            密码,
+            行情源工厂=行情源工厂,
+            价格就绪=self.价格就绪信号.emit,
+            错误=self.错误信号.emit,
+            提醒=self.提醒信号.emit,
+        )
+
+    def run(self):
+        self.循环.运行()
+
+
+class 行情订阅(QtCore.QObject):
+    """单个合约的订阅句柄，所有订阅同一合约的消费者共用一个实例。"""
+
+    价格信号 = QtCore.Signal(object)
+    错误信号 = QtCore.Signal(str)
+
+    def __init__(self, 合约: str, 父=None):
+        super().__init__(父)
+        self.合约 = 合约
+        self.最新文本 = None
+        # 最新文本的 (唤醒, 投递, 领取) perf_counter 时刻，见 latency 模块
+        self.最新时刻 = None
+        self.引用数 = 0
+
+
+class 行情中心(QtCore.QObject):
+    """按引用计数管理订阅，把行情线程的推送分发到各合约的订阅句柄。
+
+    行情线程在第一次订阅或提交任务时才启动；某合约的引用数降到 0 时通知行情线程
+    停止处理该合约。价格提醒规则涉及的合约由中心自己持有一份引用，界面隐藏后照常判定。
+    会话意外结束时丢弃旧线程、发出会话结束信号，稍后重建新线程并恢复全部订阅和提醒规则。
+    """
+
+    错误信号 = QtCore.Signal(str)
+    会话结束信号 = QtCore.Signal()
+
+    def __init__(self, 用户: str, 密码: str, 行情源工厂=None, 引擎: str | None = None, 父=None):
+        super().__init__(父)
+        self.用户 = 用户
+        self.密码 = 密码
+        self.行情源工厂 = 行情源工厂
+        # 两种引擎的回调和方法相同，见 state.默认配置 的 market_engine
+        self.引擎 = 引擎 or state.配置["market_engine"]
+        self._订阅表: dict[str, 行情订阅] = {}
+        self._线程: 行情线程 | None = None
+        self._循环: 行情循环 | None = None
+        self._提醒合约: list[str] = []
+        self._提醒规则: dict = {}
+        全局指标.仪表("tq_badge_subscribed_symbols", "行情中心已订阅的合约数", 读取=lambda: len(self._订阅表))
+
+    def _确保线程(self) -> 行情循环:
+        if self._线程 is None:
+            循环类 = 异步行情循环 if self.引擎 == "asyncio" else 行情循环
+            self._线程 = 行情线程(循环类, self.用户, self.密码, 行情源工厂=self.行情源工厂)
+            self._循环 = self._线程.循环
+            self._线程.价格就绪信号.connect(self._领取价格)
+            self._线程.错误信号.connect(self._分发错误)
+            self._线程.提醒信号.connect(self._分发提醒)
+            线程 = self._线程
+            线程.finished.connect(lambda: self._线程结束(线程))
+            # 重建时恢复旧会话的订阅和提醒规则，新线程启动后按顺序处理
+            for 合约 in self._订阅表:
+                self._循环.订阅(合约)
+            if self._提醒规则:
+                self._循环.设置提醒规则(self._提醒规则)
+            self._线程.start()
+        return self._循环
+
+    def _线程结束(self, 线程: 行情线程):
+        if 线程 is not self._线程:
+            # 关闭() 已经丢弃了这个线程
+            return
+        self._线程 = self._循环 = None
+        self.会话结束信号.emit()
+        QtCore.QTimer.singleShot(_重建会话间隔毫秒, self._重建会话)
+
+    def _重建会话(self):
+        if self._线程 is None and (self._订阅表 or self._提醒规则):
+            self._确保线程()
+
+    def 订阅(self, 合约: str) -> 行情订阅:
+        合约 = 规范化合约代码(合约)
+        句柄 = self._订阅表.get(合约)
+        if 句柄 is None:
+            循环 = self._确保线程()
+            句柄 = 行情订阅(合约, self)
+            self._订阅表[合约] = 句柄
+            循环.订阅(合约)
+        句柄.引用数 += 1
+        return 句柄
+
+    def 退订(self, 合约: str):
+        合约 = 规范化合约代码(合约)
+        句柄 = self._订阅表.get(合约)
+        if 句柄 is None:
+            return
+        句柄.引用数 -= 1
+        if 句柄.引用数 > 0:
+            return
+        del self._订阅表[合约]
+        if self._循环 is not None:
+            self._循环.退订(合约)
+        句柄.deleteLater()
+
+    def 切换订阅(self, 旧合约: str, 新合约: str) -> 行情订阅:
+        """在同一会话内把一个引用从旧合约挪到新合约，不重建连接。"""
+
+        句柄 = self.订阅(新合约)
+        if 旧合约:
+            self.退订(旧合约)
+        return 句柄
+
+    def 历史(self, 合约: str):
+        """返回已订阅合约的逐笔历史环形缓冲，见 history.行情环形缓冲。"""
+
+        if self._循环 is None:
+            return None
+        return self._循环.历史(规范化合约代码(合约))
+
+    def 最新价格(self) -> dict[str, tuple[float, int | None, float]]:
+        """本会话内各合约最近的 (最新价, 小数位, 时间)，用于写价格快照。"""
+
+        if self._循环 is None:
+            return {}
+        return self._循环.最新价格()
+
+    def 设置提醒规则(self, 规则配置: dict):
+        """替换价格提醒规则（格式见 alerts 模块说明），并订阅规则涉及的合约。"""
+
+        规则 = {}
+        for 合约, 规则列表 in (规则配置 or {}).items():
+            合约 = 规范化合约代码(合约)
+            if 合约 and 规则列表:
+                规则.setdefault(合约, []).extend(规则列表)
+        旧合约, self._提醒合约 = self._提醒合约, list(规则)
+        self._提醒规则 = 规则
+        for 合约 in self._提醒合约:
+            self.订阅(合约)
+        for 合约 in 旧合约:
+            self.退订(合约)
+        if 规则 or self._循环 is not None:
+            self._确保线程().设置提醒规则(规则)
+
+    def 已订阅合约(self) -> list[str]:
+        return list(self._订阅表)
+
+    def 提交任务(self, 任务):
+        """在共享会话所在线程执行 任务(api)，用于合约查询等一次性工作。"""
+
+        self._确保线程().提交任务(任务)
+
+    def 关闭(self, 等待毫秒: int = 2000):
+        线程, 循环 = self._线程, self._循环
+        self._线程 = self._循环 = None
+        if 线程 is not None:
+            循环.停止()
+            线程.wait(等待毫秒)
+
+    def _领取价格(self):
+        if self._循环 is None:
+            return
+        领取时刻 = time.perf_counter()
+        for 合约, (文本, (唤醒时刻, 投递时刻)) in self._循环.取出待发价格().items():
+            句柄 = self._订阅表.get(合约)
+            if 句柄 is None:
+                continue
+            全局延迟统计.记录("投递→领取", 领取时刻 - 投递时刻)
+            句柄.最新文本 = 文本
+            句柄.最新时刻 = (唤醒时刻, 投递时刻, 领取时刻)
+            _价格信号次数.增加()
+            句柄.价格信号.emit(文本)
+
+    def _分发提醒(self, 提醒列表):
+        分发提醒(提醒列表)
+
+    def _分发错误(self, 合约: str, 信息: str):
+        if not 合约:
+            self.错误信号.emit(信息)
+            for 句柄 in list(self._订阅表.values()):
+                句柄.错误信号.emit(信息)
+            return
+        句柄 = self._订阅表.get(合约)
+        if 句柄 is not None:
+            句柄.错误信号.emit(信息)
+
+
+_行情中心实例: 行情中心 | None = None
+_行情源工厂 = None
+
+
+def 设置行情源工厂(工厂):
+    """之后创建的行情中心改用 工厂() 返回的行情源，例如 feed.模拟行情源；None 恢复天勤。"""
+
+    global _行情源工厂
+    _行情源工厂 = 工厂
+
+
+def 获取行情中心() -> 行情中心:
+    """返回进程内唯一的行情中心，首次调用时按环境变量中的账号创建。"""
+
+    global _行情中心实例
+    if _行情中心实例 is None:
+        _行情中心实例 = 行情中心(state.TQ_USER, state.TQ_PASS, 行情源工厂=_行情源工厂)
+    return _行情中心实例
+
+
+def 关闭行情中心():
+    global _行情中心实例
+    if _行情中心实例 is not None:
+        _行情中心实例.关闭()
+        _行情中心实例 = None
@@ -0,0 +1,188 @@
+# -*- coding: utf-8 -*-
+"""行情到屏幕的分段延迟统计。
+
+一笔价格从交易所到悬浮牌依次经过：
+
+ - 行情→唤醒：quote.datetime（交易所时间，北京时间）到行情线程 wait_update 返回，
+   包含交易所、TqSdk 服务端与网络延迟，也包含本机时钟偏差
+ - 唤醒→投递：行情线程读取、格式化并写入待发表
+ - 投递→领取：跨线程信号排队，直到界面线程领走价格
+ - 领取→绘制：限速、布局与 悬浮牌窗口 重绘
+ - 唤醒→绘制：进程内端到端
+
+各阶段只保留最近若干个样本，按需计算分位数。除 行情→唤醒 外都用 perf_counter 计时。
+
+另有 启动计时 记录进程启动到首次绘制、tqsdk 导入完成、会话建立、首个实时价格
+画出的秒数，每个阶段只记第一次。没有 psutil 时改从本模块导入算起，写出的文件里
+startup_baseline 为 "import"。
+"""
+import datetime
+import json
+import os
+import threading
+import time
+
+import numpy as np
+
+from . import state
+from .metrics import 全局指标
+
+延迟统计路径 = os.path.join(os.path.expanduser("~"), ".tq_price_tray_latency.json")
+阶段列表 = ("行情→唤醒", "唤醒→投递", "投递→领取", "领取→绘制", "唤醒→绘制")
+启动阶段列表 = ("首次绘制", "tqsdk导入", "会话建立", "首个实时价格")
+_北京时间 = datetime.timezone(datetime.timedelta(hours=8))
+# 超过这个值的 行情→唤醒 多半是休市时的旧截面，不计入统计
+_行情延迟上限秒 = 60.0
+
+
+def 行情时间戳(文本) -> float | None:
+    """把 quote.datetime（如 2024-05-10 14:59:59.500000）转为 Unix 时间戳。"""
+
+    if not 文本:
+        return None
+    try:
+        return datetime.datetime.fromisoformat(str(文本)).replace(tzinfo=_北京时间).timestamp()
+    except ValueError:
+        return None
+
+
+def _进程启动时刻() -> tuple[float, str]:
+    """返回 (起点的 perf_counter 读数, 起点名称)。
+
+    有 psutil（TqSdk 的依赖）时起点是进程创建时刻，名称为 "process"；否则退回本模块的
+    导入时刻，名称为 "import"，此时各阶段耗时不含解释器启动和之前的导入。
+    """
+
+    现在 = time.perf_counter()
+    try:
+        import psutil
+
+        return 现在 - max(0.0, time.time() - psutil.Process().create_time()), "process"
+    except Exception:
+        return 现在, "import"
+
+
+class 启动计时:
+    """各启动阶段距起点的秒数，同一阶段只记第一次，可在任意线程标记。
+
+    基准 说明起点是什么："process" 为进程创建，"import" 为本模块导入，"custom" 为调用方给定。
+    """
+
+    def __init__(self, 起点: float | None = None):
+        if 起点 is None:
+            self.起点, self.基准 = _进程启动时刻()
+        else:
+            self.起点, self.基准 = 起点, "custom"
+        self._秒数: dict[str, float] = {}
+
+    def 标记(self, 阶段: str):
+        if 阶段 in self._秒数:
+            return
+        秒 = self._秒数.setdefault(阶段, time.perf_counter() - self.起点)
+        全局指标.仪表("tq_badge_startup_seconds", "进程启动到各启动阶段的秒数", {"stage": 阶段}).设置(秒)
+
+    def 已标记(self, 阶段: str) -> bool:
+        return 阶段 in self._秒数
+
+    def 汇总(self) -> dict[str, float]:
+        return {阶段: round(秒 * 1000, 1) for 阶段, 秒 in self._秒数.items()}
+
+    def 汇总文本(self) -> str:
+        毫秒 = self.汇总()
+        起点 = "启动" if self.基准 == "process" else "导入"
+        return "\n".join(
+            f"{起点}→{阶段}: {毫秒[阶段]:.0f}ms" if 阶段 in 毫秒 else f"{起点}→{阶段}: 尚未发生" for 阶段 in 启动阶段列表
+        )
+
+
+class 滚动分位数:
+    """定长样本环，新样本覆盖最旧的样本。"""
+
+    def __init__(self, 容量: int = 4096):
+        self._样本 = np.empty(max(1, int(容量)), dtype=np.float64)
+        self._总数 = 0
+
+    def 记录(self, 秒: float):
+        self._样本[self._总数 % len(self._样本)] = 秒
+        self._总数 += 1
+
+    def 汇总(self) -> dict:
+        样本 = self._样本[:min(self._总数, len(self._样本))]
+        if not len(样本):
+            return {"count": self._总数}
+        p50, p95, p99 = np.percentile(样本, (50, 95, 99)) * 1000
+        return {
+            "count": self._总数,
+            "p50_ms": round(float(p50), 3),
+            "p95_ms": round(float(p95), 3),
+            "p99_ms": round(float(p99), 3),
+            "max_ms": round(float(样本.max() * 1000), 3),
+        }
+
+
+class 延迟统计:
+    """各阶段的滚动分位数，行情线程和界面线程都会写入。"""
+
+    def __init__(self, 容量: int = 4096):
+        self.启用 = True
+        self._容量 = 容量
+        self._锁 = threading.Lock()
+        self.重置()
+
+    def 重置(self):
+        with self._锁:
+            self._阶段 = {阶段: 滚动分位数(self._容量) for 阶段 in 阶段列表}
+
+    def 记录(self, 阶段: str, 秒: float):
+        if not self.启用:
+            return
+        with self._锁:
+            self._阶段[阶段].记录(秒)
+
+    def 记录行情延迟(self, 行情时间文本, 唤醒墙钟: float):
+        行情时间 = 行情时间戳(行情时间文本)
+        if 行情时间 is None:
+            return
+        延迟 = 唤醒墙钟 - 行情时间
+        if 延迟 <= _行情延迟上限秒:
+            self.记录("行情→唤醒", 延迟)
+
+    def 记录绘制(self, 时刻: tuple[float, float, float]):
+        """时刻为 (唤醒, 投递, 领取) 的 perf_counter 读数。"""
+
+        现在 = time.perf_counter()
+        唤醒, _投递, 领取 = 时刻
+        self.记录("领取→绘制", 现在 - 领取)
+        self.记录("唤醒→绘制", 现在 - 唤醒)
+
+    def 汇总(self) -> dict[str, dict]:
+        with self._锁:
+            return {阶段: 统计.汇总() for 阶段, 统计 in self._阶段.items()}
+
+    def 汇总文本(self) -> str:
+        行列表 = []
+        for 阶段, 汇总 in self.汇总().items():
+            if "p50_ms" not in 汇总:
+                行列表.append(f"{阶段}: 暂无样本")
+                continue
+            行列表.append(
+                f"{阶段}: n={汇总['count']} p50={汇总['p50_ms']:.2f}ms "
+                f"p95={汇总['p95_ms']:.2f}ms p99={汇总['p99_ms']:.2f}ms max={汇总['max_ms']:.2f}ms"
+            )
+        return "\n".join(行列表)
+
+    def 写入文件(self, 路径: str | None = None):
+        数据 = {
+            "written_at": time.time(),
+            "stages": self.汇总(),
+            "startup_ms": 全局启动计时.汇总(),
+            "startup_baseline": 全局启动计时.基准,
+        }
+        try:
+            state.原子写入文本(路径 or 延迟统计路径, json.dumps(数据, ensure_ascii=False, indent=2))
+        except Exception as e:
+            print("写入延迟统计失败:", e)
+
+
+全局延迟统计 = 延迟统计()
+全局启动计时 = 启动计时()
@@ -1,30 +1,64 @@
 # -*- coding: utf-8 -*-
+import decimal
+import functools
 import math
+import queue
 import re
+import threading
 import time
 
-from PySide6 import QtCore
-from tqsdk import TqApi, TqAuth
-
 from . import state
+from .alerts import 价格提醒引擎
+from .capture import 回放行情源, 行情录制器
+from .catalog import 获取合约目录
+from .history import 历史字段, 行情环形缓冲
+from .latency import 全局启动计时, 全局延迟统计
+from .metrics import 全局指标
+from .subscription import 行情订阅管理
 
 合约代码正则 = re.compile(r"^(?:KQ\.(?:m|i)@[A-Z]+\.[A-Za-z0-9]+|[A-Z]+\.[A-Za-z0-9]+)$")
 小写品种交易所 = {"SHFE", "DCE", "INE", "GFEX"}
 大写品种交易所 = {"CZCE", "CFFEX"}
+_无价格提示秒数 = 60.0
+_未推送 = object()
+
+_等待次数 = 全局指标.计数器("tq_badge_wait_update_total", "wait_update 调用次数")
+_等待超时次数 = 全局指标.计数器("tq_badge_wait_update_timeouts_total", "wait_update 到期仍无更新的次数")
+_投递次数 = 全局指标.计数器("tq_badge_price_posts_total", "行情线程写入待发表的价格数")
+_合并次数 = 全局指标.计数器("tq_badge_price_coalesced_total", "界面线程领取前被同合约新价格覆盖的价格数")
+_会话创建次数 = 全局指标.计数器("tq_badge_tqapi_sessions_total", "TqApi 会话创建次数")
+_运行中线程 = 全局指标.仪表("tq_badge_worker_threads", "运行中的行情线程数")
+
+_主连代码正则 = re.compile(r"KQ\.([mMiI])@([A-Za-z]+)\.([A-Za-z0-9]+)")
+_普通代码正则 = re.compile(r"([A-Za-z]+)\.([A-Za-z0-9]+)")
+_品种代码正则 = re.compile(r"([A-Za-z]+)([0-9A-Za-z]*)")
+_品种大小写 = {**{x: str.lower for x in 小写品种交易所}, **{x: str.upper for x in 大写品种交易所}}
 
 
 def 规范化合约代码(原始: str) -> str:
     文本 = (原始 or "").strip()
     if not 文本:
         return ""
+    return _规范化非空代码(文本)
+
 
-    主连匹配 = re.fullmatch(r"KQ\.([mMiI])@([A-Za-z]+)\.([A-Za-z0-9]+)", 文本)
+def 批量规范化合约代码(代码列表) -> list[str]:
+    """逐个规范化后按首次出现的顺序去重，丢弃空代码。"""
+
+    结果 = dict.fromkeys(规范化合约代码(str(代码)) for 代码 in 代码列表 if 代码 is not None)
+    结果.pop("", None)
+    return list(结果)
+
+
+@functools.lru_cache(maxsize=16384)
+def _规范化非空代码(文本: str) -> str:
+    主连匹配 = _主连代码正则.fullmatch(文本)
     if 主连匹配:
         类型, 交易所, 品种 = 主连匹配.groups()
         交易所 = 交易所.upper()
         return f"KQ.{类型.lower()}@{交易所}.{_规范化品种代码(交易所, 品种)}"
 
-    普通匹配 = re.fullmatch(r"([A-Za-z]+)\.([A-Za-z0-9]+)", 文本)
+    普通匹配 = _普通代码正则.fullmatch(文本)
     if 普通匹配:
         交易所, 品种 = 普通匹配.groups()
         交易所 = 交易所.upper()
@@ -40,15 +74,14 @@ def _规范化品种代码(交易所: str, 品种代码: str) -> str:
     if not 品种代码:
         return ""
 
-    匹配 = re.fullmatch(r"([A-Za-z]+)([0-9A-Za-z]*)", 品种代码)
+    匹配 = _品种代码正则.fullmatch(品种代码)
     if not 匹配:
         return 品种代码
 
     品种前缀, 后缀 = 匹配.groups()
-    if 交易所 in 小写品种交易所:
-        品种前缀 = 品种前缀.lower()
-    elif 交易所 in 大写品种交易所:
-        品种前缀 = 品种前缀.upper()
+    转换 = _品种大小写.get(交易所)
+    if 转换 is not None:
+        品种前缀 = 转换(品种前缀)
     return f"{品种前缀}{后缀}"
 
 
@@ -60,9 +93,7 @@ def 写入最近合约(代码: str):
     代码 = 规范化合约代码(代码)
     if not 代码:
         return
-    历史 = [规范化合约代码(x) for x in state.配置.get("recent_symbols", []) if str(x).strip()]
-    新历史 = [代码] + [x for x in 历史 if x != 代码]
-    state.配置["recent_symbols"] = 新历史[:30]
+    state.配置["recent_symbols"] = 批量规范化合约代码([代码, *state.配置.get("recent_symbols", [])])[:30]
 
 
 def _读取quote字段(quote, 字段名: str):
@@ -84,6 +115,11 @@ def _转为有限数字(值):
     return 数值
 
 
+def _读取有限数字或nan(quote, 字段名: str) -> float:
+    数值 = _转为有限数字(_读取quote字段(quote, 字段名))
+    return math.nan if 数值 is None else 数值
+
+
 def 格式化价格(p, 小数位: int | None = None):
     价格 = _转为有限数字(p)
     if 价格 is None:
@@ -101,112 +137,403 @@ def 格式化价格(p, 小数位: int | None = None):
     return f"{价格:.10f}".rstrip("0").rstrip(".")
 
 
+@functools.lru_cache(maxsize=32)
+def 定点格式器(小数位: int):
+    """返回把定点整数（价格 × 10**小数位）格式化为文本的函数，同一小数位共用一个。
+
+    只做整数除法和拼接，结果总是恰好 小数位 位小数，不会出现二进制浮点的尾差。
+    传入 None 时返回 —。
+    """
+
+    小数位 = max(0, int(小数位))
+    if 小数位 == 0:
+        def 格式化(刻度: int | None) -> str:
+            return "—" if 刻度 is None else str(刻度)
+        return 格式化
+
+    基数 = 10 ** 小数位
+    模板 = f"%d.%0{小数位}d"
+
+    def 格式化(刻度: int | None) -> str:
+        if 刻度 is None:
+            return "—"
+        if 刻度 < 0:
+            return "-" + 模板 % divmod(-刻度, 基数)
+        return 模板 % divmod(刻度, 基数)
+
+    return 格式化
+
+
+def 由最小变动推算小数位(最小变动) -> int | None:
+    """按最小变动的最短十进制写法计算小数位：0.2 → 1，0.0005 → 4，5 → 0。"""
+
+    数值 = _转为有限数字(最小变动)
+    if 数值 is None or 数值 <= 0:
+        return None
+    指数 = decimal.Decimal(repr(数值)).normalize().as_tuple().exponent
+    return max(0, -指数)
+
+
 def 读取最新价(quote):
     return _转为有限数字(_读取quote字段(quote, "last_price"))
 
 
 def 读取价格小数位(quote) -> int | None:
+    """优先取 price_decs，没有时由 price_tick 推算。"""
+
     小数位 = _读取quote字段(quote, "price_decs")
     try:
         小数位 = int(小数位)
     except (TypeError, ValueError, OverflowError):
-        return None
+        return 由最小变动推算小数位(_读取quote字段(quote, "price_tick"))
     return max(0, 小数位)
 
 
-class 行情线程(QtCore.QThread):
-    价格信号 = QtCore.Signal(object)
-    错误信号 = QtCore.Signal(str)
+def _忽略(*_参数):
+    pass
+
 
-    def __init__(self, 合约, 用户, 密码, 父=None):
-        super().__init__(父)
-        self.合约 = 合约
+class 行情循环:
+    """持有进程内唯一的 TqApi 会话，按指令增减订阅并逐合约推送价格。
+
+    不依赖 Qt：运行() 在调用它的线程里阻塞执行，界面由 hub.行情线程 放进 QThread
+    并把三个回调转成信号，无界面模式（headless 模块）直接放进普通线程。
+
+    TqApi 不是线程安全的，所有对 api 的调用（订阅、退订、后台任务）都以指令形式
+    投递到本线程，在两次 wait_update 之间执行。订阅只发出请求、不等截面，某个合约
+    订阅失败只报告给该合约，不影响会话（见 subscription 模块）。每次唤醒只处理关注
+    字段确有变化的合约，空超时和无关数据包不会触发读取与格式化。
+
+    价格不逐笔跨线程排队：新价格写入待发表（同一合约只留最新值），只有待发表由空
+    变为非空时才调用一次 价格就绪()，由消费方用 取出待发价格() 一次领走。
+
+    待发表里每个价格附带 (唤醒, 投递) 两个 perf_counter 时刻，供 latency 模块统计
+    分段延迟。
+
+    价格提醒在本线程判定，每次唤醒把有规则合约的新价格攒成一批交给 价格提醒引擎，
+    触发的提醒经 提醒() 送出，与界面是否显示无关。错误经 错误(合约, 信息) 送出，
+    合约为空表示会话级错误。三个回调都在本线程调用。
+    """
+
+    def __init__(
+        self,
+        用户,
+        密码,
+        轮询间隔: float | None = None,
+        关注字段: list[str] | None = None,
+        行情源工厂=None,
+        价格就绪=None,
+        错误=None,
+        提醒=None,
+    ):
         self.用户 = 用户
         self.密码 = 密码
+        # 无参调用返回 feed.行情源，默认为登录天勤的 TqApi
+        self.行情源工厂 = 行情源工厂 or self._创建天勤会话
+        self._价格就绪 = 价格就绪 or _忽略
+        self._报告错误 = 错误 or _忽略
+        self._发出提醒 = 提醒 or _忽略
+        self.轮询间隔 = float(轮询间隔 if 轮询间隔 is not None else state.配置["quote_poll_interval"])
+        self.关注字段 = list(关注字段 if 关注字段 is not None else state.配置["quote_watch_fields"])
+        self.历史容量 = int(state.配置["history_capacity"])
+        需要逐笔字段 = self.历史容量 > 0 or bool(state.配置["capture_path"])
+        self._检查字段 = list(dict.fromkeys(self.关注字段 + (list(历史字段) if 需要逐笔字段 else [])))
+        self._历史: dict[str, 行情环形缓冲] = {}
+        self.录制路径 = state.配置["capture_path"] or ""
+        self._录制器: 行情录制器 | None = None
         self._停止 = False
+        self._指令队列: queue.SimpleQueue = queue.SimpleQueue()
+        self._quotes: dict = {}
+        # 会话建立后创建，订阅、退订都经它进行，见 subscription 模块
+        self._订阅管理: 行情订阅管理 | None = None
+        # 小数位已知时为定点整数（无价格为 None），否则为格式化后的文本
+        self._上次值: dict[str, int | str | None] = {}
+        self._小数位: dict[str, int] = {}
+        # {合约: (10**小数位, 定点格式器)}
+        self._定点: dict[str, tuple[int, object]] = {}
+        self._无价格起点: dict[str, float | None] = {}
+        self._等待首价: set[str] = set()
+        self._需要全量检查 = False
+        self._待发锁 = threading.Lock()
+        self._待发价格: dict[str, object] = {}
+        self._提醒引擎 = 价格提醒引擎()
+        self._本批价格: dict[str, float] = {}
+        self._唤醒时刻 = time.perf_counter()
+        self._唤醒墙钟 = time.time()
+        self._行情时间: dict[str, object] = {}
+        # 最近一次写入历史和录制文件的 quote.datetime，全量重读时不重复记录
+        self._逐笔时间: dict[str, object] = {}
+        # 退订后保留，供界面线程定期取走写入价格快照
+        self._最新价格: dict[str, tuple[float, int | None, float]] = {}
+
+    def _创建天勤会话(self):
+        if not self.用户 or not self.密码:
+            raise RuntimeError("请先在环境变量中设置 TQ_USER / TQ_PASS")
+        # 导入 tqsdk 要一两秒，放在行情线程里，悬浮牌不必等它就能先画出来
+        from tqsdk import TqApi, TqAuth
+
+        全局启动计时.标记("tqsdk导入")
+        api = TqApi(auth=TqAuth(self.用户, self.密码))
+        全局启动计时.标记("会话建立")
+        return api
 
     def 停止(self):
         self._停止 = True
 
-    def run(self):
-        api = None
-        try:
-            api = TqApi(auth=TqAuth(self.用户, self.密码))
-            quote = api.get_quote(self.合约)
-            上次文本 = None
-            连续无价格次数 = 0
-            while not self._停止:
-                价格 = 读取最新价(quote)
-                小数位 = 读取价格小数位(quote)
-                if 价格 is None and not state.当价格为空也更新:
-                    api.wait_update(deadline=time.time() + 1)
-                    continue
-                if 价格 is None:
-                    连续无价格次数 += 1
-                    if 连续无价格次数 == 200:
-                        self.错误信号.emit(
-                            f"合约 {self.合约} 暂无最新价，请确认合约是否可交易（建议使用主连如 KQ.m@SHFE.cu）"
-                        )
-                else:
-                    连续无价格次数 = 0
-                文本 = 格式化价格(价格, 小数位)
-                if 文本 != 上次文本:
-                    上次文本 = 文本
-                    self.价格信号.emit(文本)
-                api.wait_update(deadline=time.time() + 1)
-        except Exception as e:
-            self.错误信号.emit(str(e))
-        finally:
-            if api is not None:
-                try:
-                    api.close()
-                except Exception:
-                    pass
+    def 订阅(self, 合约: str):
+        self._指令队列.put(("订阅", 合约))
 
+    def 退订(self, 合约: str):
+        self._指令队列.put(("退订", 合约))
 
-class 在市期货合约加载线程(QtCore.QThread):
-    完成信号 = QtCore.Signal(list)
-    错误信号 = QtCore.Signal(str)
+    def 提交任务(self, 任务):
+        """在行情线程内执行 任务(api)，任务可自行调用 wait_update。"""
 
-    def __init__(self, 用户: str, 密码: str, 父=None):
-        super().__init__(父)
-        self.用户 = 用户
-        self.密码 = 密码
+        self._指令队列.put(("任务", 任务))
 
-    def run(self):
-        api = None
-        try:
-            api = TqApi(auth=TqAuth(self.用户, self.密码))
-            合约列表 = list(api.query_quotes(ins_class="FUTURE", expired=False))
-            if not 合约列表:
-                self.完成信号.emit([])
-                return
+    def 设置提醒规则(self, 规则配置: dict):
+        """替换价格提醒规则，键为已规范化的合约代码。规则合约需另行订阅才会收到价格。"""
+
+        self._指令队列.put(("提醒规则", 规则配置))
+
+    def 历史(self, 合约: str) -> 行情环形缓冲 | None:
+        """返回该合约的逐笔历史；未订阅或未开启历史时为 None。可在任意线程读取。"""
 
-            quote列表 = api.get_quote_list(合约列表)
-            for _ in range(3):
-                if self.isInterruptionRequested():
-                    return
-                api.wait_update(deadline=time.time() + 1)
+        return self._历史.get(合约)
 
-            def _成交量(q) -> float:
+    def 最新价格(self) -> dict[str, tuple[float, int | None, float]]:
+        """返回各合约最近一次推送的 (最新价, 小数位, 时间) 副本，可在任意线程调用。"""
+
+        return dict(self._最新价格)
+
+    def 取出待发价格(self) -> dict[str, tuple[object, tuple[float, float]]]:
+        """返回 {合约: (文本, (唤醒时刻, 投递时刻))}。"""
+
+        with self._待发锁:
+            待发, self._待发价格 = self._待发价格, {}
+        return 待发
+
+    def _投递价格(self, 合约: str, 文本):
+        投递时刻 = time.perf_counter()
+        全局延迟统计.记录("唤醒→投递", 投递时刻 - self._唤醒时刻)
+        _投递次数.增加()
+        with self._待发锁:
+            需要通知 = not self._待发价格
+            if 合约 in self._待发价格:
+                _合并次数.增加()
+            self._待发价格[合约] = (文本, (self._唤醒时刻, 投递时刻))
+        if 需要通知:
+            self._价格就绪()
+
+    def _处理指令(self, api):
+        while True:
+            try:
+                指令, 参数 = self._指令队列.get_nowait()
+            except queue.Empty:
+                return
+            if 指令 == "订阅":
+                # 只发出订阅，不等截面；合约不存在等错误由 _订阅出错 报告给该合约
+                self._订阅管理.订阅(参数, functools.partial(self._开始处理, 参数))
+            elif 指令 == "退订":
+                self._订阅管理.退订(参数)
+                self._移除合约(参数)
+            elif 指令 == "任务":
                 try:
-                    值 = q["volume"]
-                except Exception:
-                    值 = getattr(q, "volume", None)
-                if 值 is None:
-                    return -1.0
+                    参数(api)
+                except Exception as e:
+                    self._报告错误("", str(e))
+                # 任务内的 wait_update 会吞掉 is_changing 依据的变更，下一轮全部重读
+                self._需要全量检查 = True
+            elif 指令 == "提醒规则":
+                self._提醒引擎.设置规则(参数)
+                self._本批价格.clear()
+                # 新规则需要一笔当前价格作为穿越和涨跌幅的起点
+                self._需要全量检查 = True
+
+    def _开始处理(self, 合约: str, quote):
+        """订阅已发出：登记 quote，会话里已有截面（例如切回刚退订的合约）时立即推送。"""
+
+        self._quotes[合约] = quote
+        if self.历史容量 > 0:
+            self._历史[合约] = 行情环形缓冲(self.历史容量)
+        self._等待首价.add(合约)
+        self._处理变化(合约, quote)
+        # 不支持协程的行情源同步订阅，期间的数据包可能让其他合约的 is_changing 落空
+        self._需要全量检查 = True
+
+    def _订阅出错(self, 合约: str, 信息: str):
+        self._移除合约(合约)
+        self._报告错误(合约, f"订阅 {合约} 失败: {信息}")
+
+    def _移除合约(self, 合约: str):
+        self._quotes.pop(合约, None)
+        self._上次值.pop(合约, None)
+        self._小数位.pop(合约, None)
+        self._定点.pop(合约, None)
+        self._无价格起点.pop(合约, None)
+        self._等待首价.discard(合约)
+        self._历史.pop(合约, None)
+        self._行情时间.pop(合约, None)
+        self._逐笔时间.pop(合约, None)
+
+    def _读取小数位(self, 合约: str, quote) -> int | None:
+        小数位 = self._小数位.get(合约)
+        if 小数位 is None:
+            # 合约目录里有的不必等 quote 的截面
+            资料 = 获取合约目录().获取(合约)
+            小数位 = 资料.小数位 if 资料 is not None else 读取价格小数位(quote)
+            if 小数位 is not None:
+                self._小数位[合约] = 小数位
+        return 小数位
+
+    def _读取定点(self, 合约: str, quote) -> tuple[int, object] | None:
+        定点 = self._定点.get(合约)
+        if 定点 is None:
+            小数位 = self._读取小数位(合约, quote)
+            if 小数位 is None:
+                return None
+            定点 = self._定点[合约] = (10 ** 小数位, 定点格式器(小数位))
+        return 定点
+
+    def _记录逐笔(self, 合约: str, quote):
+        缓冲 = self._历史.get(合约)
+        录制器 = self._录制器
+        if 缓冲 is None and 录制器 is None:
+            return
+        # 任务、提醒规则后的全量重读和重复订阅都会再次经过这里，同一笔只记一次
+        行情时间 = _读取quote字段(quote, "datetime")
+        if 行情时间 and 行情时间 == self._逐笔时间.get(合约):
+            return
+        最新价, 成交量, 买一价, 卖一价 = (
+            _读取有限数字或nan(quote, 字段) for 字段 in 历史字段
+        )
+        if math.isnan(最新价) and math.isnan(买一价) and math.isnan(卖一价):
+            return
+        if 行情时间:
+            self._逐笔时间[合约] = 行情时间
+        现在 = time.time()
+        if 缓冲 is not None:
+            缓冲.追加(现在, 最新价, 成交量, 买一价, 卖一价)
+        if 录制器 is not None:
+            if not 录制器.已登记(合约):
+                录制器.登记(合约, self._读取小数位(合约, quote), _读取有限数字或nan(quote, "price_tick"))
+            录制器.记录(合约, 现在, 最新价, 成交量, 买一价, 卖一价)
+
+    def _记录行情延迟(self, 合约: str, quote):
+        行情时间 = _读取quote字段(quote, "datetime")
+        # 只统计新的一笔，任务后的全量重读不会重复计入
+        if 行情时间 and 行情时间 != self._行情时间.get(合约):
+            self._行情时间[合约] = 行情时间
+            全局延迟统计.记录行情延迟(行情时间, self._唤醒墙钟)
+
+    def _处理变化(self, 合约: str, quote):
+        self._记录逐笔(合约, quote)
+        if 全局延迟统计.启用:
+            self._记录行情延迟(合约, quote)
+        价格 = 读取最新价(quote)
+        if 价格 is not None and self._提醒引擎.包含合约(合约):
+            self._本批价格[合约] = 价格
+        self._推送价格(合约, quote, 价格)
+
+    def _推送价格(self, 合约: str, quote, 价格: float | None):
+        if 价格 is None and not state.当价格为空也更新:
+            return
+        if 价格 is None:
+            self._无价格起点.setdefault(合约, time.monotonic())
+            if 合约 in self._等待首价:
+                # 新订阅的合约在截面到达前不推送占位符，让界面保持“…”
+                return
+        else:
+            self._无价格起点.pop(合约, None)
+            self._等待首价.discard(合约)
+        定点 = self._读取定点(合约, quote)
+        if 定点 is None:
+            值 = 文本 = 格式化价格(价格)
+            if 值 == self._上次值.get(合约, _未推送):
+                return
+        else:
+            # 按整数刻度比较，价格没变时不必格式化
+            倍数, 格式器 = 定点
+            值 = None if 价格 is None else round(价格 * 倍数)
+            if 值 == self._上次值.get(合约, _未推送):
+                return
+            文本 = 格式器(值)
+        self._上次值[合约] = 值
+        if 价格 is not None:
+            self._最新价格[合约] = (价格, self._小数位.get(合约), self._唤醒墙钟)
+        self._投递价格(合约, 文本)
+
+    def _检查无价格(self):
+        现在 = time.monotonic()
+        for 合约, 起点 in list(self._无价格起点.items()):
+            if 起点 is None or 现在 - 起点 < _无价格提示秒数:
+                continue
+            self._无价格起点[合约] = None
+            self._报告错误(
+                合约, f"合约 {合约} 暂无最新价，请确认合约是否可交易（建议使用主连如 KQ.m@SHFE.cu）"
+            )
+            if 合约 in self._等待首价:
+                self._等待首价.discard(合约)
+                quote = self._quotes[合约]
+                self._推送价格(合约, quote, 读取最新价(quote))
+
+    def _推送变化(self, api, 有更新: bool):
+        if self._需要全量检查:
+            self._需要全量检查 = False
+            for 合约, quote in self._quotes.items():
+                self._处理变化(合约, quote)
+        elif 有更新:
+            for 合约, quote in self._quotes.items():
+                if api.is_changing(quote, self._检查字段):
+                    self._处理变化(合约, quote)
+        if self._本批价格:
+            提醒列表 = self._提醒引擎.评估(self._本批价格)
+            self._本批价格.clear()
+            if 提醒列表:
+                self._发出提醒(提醒列表)
+        if self._无价格起点:
+            self._检查无价格()
+
+    def _主循环(self, api):
+        while not self._停止:
+            self._唤醒时刻 = time.perf_counter()
+            self._处理指令(api)
+            # 订阅变更最多延迟一个轮询周期生效
+            有更新 = api.wait_update(deadline=time.time() + self.轮询间隔)
+            _等待次数.增加()
+            if not 有更新:
+                _等待超时次数.增加()
+            self._唤醒时刻 = time.perf_counter()
+            self._唤醒墙钟 = time.time()
+            self._推送变化(api, 有更新)
+            if self._录制器 is not None:
+                self._录制器.按需刷新()
+
+    def 运行(self):
+        api = None
+        _运行中线程.增加()
+        try:
+            api = self.行情源工厂()
+            _会话创建次数.增加()
+            self._订阅管理 = 行情订阅管理(api, self._订阅出错)
+            # 回放时不再录制，免得追加到正在回放的文件
+            if self.录制路径 and not isinstance(api, 回放行情源):
                 try:
-                    值 = float(值)
-                except Exception:
-                    return -1.0
-                return -1.0 if math.isnan(值) else 值
-
-            带成交量 = [(代码, _成交量(quote)) for 代码, quote in zip(合约列表, quote列表)]
-            带成交量.sort(key=lambda x: x[1], reverse=True)
-            self.完成信号.emit([代码 for 代码, _ in 带成交量])
+                    self._录制器 = 行情录制器(self.录制路径)
+                except Exception as e:
+                    # 录制文件损坏或不是录制格式时只放弃录制，行情照常推送
+                    self._报告错误("", f"打开行情录制文件失败，本次不录制: {e}")
+            self._主循环(api)
         except Exception as e:
-            self.错误信号.emit(str(e))
+            self._报告错误("", str(e))
         finally:
+            _运行中线程.减少()
+            if self._录制器 is not None:
+                try:
+                    self._录制器.关闭()
+                except Exception as e:
+                    print("关闭行情录制文件失败:", e)
+                self._录制器 = None
             if api is not None:
                 try:
                     api.close()
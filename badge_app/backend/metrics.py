@@ -0,0 +1,171 @@
+# -*- coding: utf-8 -*-
+"""运行指标：后端和界面共用的计数器与仪表，按 Prometheus 文本格式导出。
+
+默认不显示也不导出。配置 metrics_port 后在 127.0.0.1 上提供 /metrics，
+配置 metrics_file 后每 metrics_interval 秒原子重写一次该文件，两者可同时开启。
+"""
+import http.server
+import threading
+
+from . import state
+
+
+def _标签文本(标签: tuple[tuple[str, str], ...]) -> str:
+    if not 标签:
+        return ""
+    内容 = ",".join(f'{键}="{_转义标签值(值)}"' for 键, 值 in 标签)
+    return "{" + 内容 + "}"
+
+
+def _转义标签值(值) -> str:
+    return str(值).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class 计数器:
+    """只增不减的计数。"""
+
+    def __init__(self, 锁: threading.Lock):
+        self._锁 = 锁
+        self.值 = 0
+
+    def 增加(self, 数量: int = 1):
+        with self._锁:
+            self.值 += 数量
+
+
+class 仪表:
+    """可增可减的瞬时值；给出 读取 函数时导出时现取。"""
+
+    def __init__(self, 锁: threading.Lock, 读取=None):
+        self._锁 = 锁
+        self._读取 = 读取
+        self._值 = 0.0
+
+    @property
+    def 值(self) -> float:
+        if self._读取 is not None:
+            try:
+                return float(self._读取())
+            except Exception:
+                return float("nan")
+        return self._值
+
+    def 设置(self, 值: float):
+        self._值 = float(值)
+
+    def 增加(self, 数量: float = 1):
+        with self._锁:
+            self._值 += 数量
+
+    def 减少(self, 数量: float = 1):
+        self.增加(-数量)
+
+
+class 指标注册表:
+    """按名称和标签登记指标；同名同标签重复登记返回已有对象。"""
+
+    def __init__(self):
+        self._锁 = threading.Lock()
+        self._指标族: dict[str, tuple[str, str, dict]] = {}
+
+    def _登记(self, 类型: str, 名称: str, 说明: str, 标签: dict | None, 创建):
+        键 = tuple(sorted((标签 or {}).items()))
+        with self._锁:
+            族 = self._指标族.setdefault(名称, (类型, 说明, {}))
+            if 族[0] != 类型:
+                raise ValueError(f"指标 {名称} 已登记为 {族[0]}")
+            指标 = 族[2].get(键)
+            if 指标 is None:
+                指标 = 族[2][键] = 创建()
+            return 指标
+
+    def 计数器(self, 名称: str, 说明: str, 标签: dict | None = None) -> 计数器:
+        return self._登记("counter", 名称, 说明, 标签, lambda: 计数器(self._锁))
+
+    def 仪表(self, 名称: str, 说明: str, 标签: dict | None = None, 读取=None) -> 仪表:
+        指标 = self._登记("gauge", 名称, 说明, 标签, lambda: 仪表(self._锁, 读取))
+        if 读取 is not None:
+            # 重新登记（例如行情中心重建）时改读新的来源
+            指标._读取 = 读取
+        return 指标
+
+    def 导出文本(self) -> str:
+        with self._锁:
+            族列表 = [(名称, 类型, 说明, list(指标表.items())) for 名称, (类型, 说明, 指标表) in self._指标族.items()]
+        行列表 = []
+        for 名称, 类型, 说明, 指标表 in 族列表:
+            行列表.append(f"# HELP {名称} {说明}")
+            行列表.append(f"# TYPE {名称} {类型}")
+            for 标签, 指标 in 指标表:
+                行列表.append(f"{名称}{_标签文本(标签)} {指标.值:g}")
+        return "\n".join(行列表) + "\n"
+
+
+全局指标 = 指标注册表()
+
+
+class _指标请求处理(http.server.BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?", 1)[0] not in ("/", "/metrics"):
+            self.send_error(404)
+            return
+        内容 = 全局指标.导出文本().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(内容)))
+        self.end_headers()
+        self.wfile.write(内容)
+
+    def log_message(self, *参数):
+        pass
+
+
+class 指标导出器:
+    """后台线程导出 全局指标：HTTP 服务只监听 127.0.0.1，文件按固定间隔重写。"""
+
+    def __init__(self, 端口: int = 0, 文件路径: str = "", 间隔秒: float = 15.0):
+        self.端口 = int(端口 or 0)
+        self.文件路径 = 文件路径 or ""
+        self.间隔秒 = max(1.0, float(间隔秒))
+        self._服务 = None
+        self._停止事件 = threading.Event()
+        self._线程列表: list[threading.Thread] = []
+
+    def 启动(self):
+        if self.端口 > 0:
+            try:
+                self._服务 = http.server.ThreadingHTTPServer(("127.0.0.1", self.端口), _指标请求处理)
+            except OSError as e:
+                print(f"指标端口 {self.端口} 监听失败:", e)
+            else:
+                self._启动线程(self._服务.serve_forever, "metrics-http")
+        if self.文件路径:
+            self._启动线程(self._定期写文件, "metrics-file")
+
+    def _启动线程(self, 目标, 名称: str):
+        线程 = threading.Thread(target=目标, name=名称, daemon=True)
+        线程.start()
+        self._线程列表.append(线程)
+
+    def _写文件(self):
+        try:
+            state.原子写入文本(self.文件路径, 全局指标.导出文本())
+        except Exception as e:
+            print("写入指标文件失败:", e)
+
+    def _定期写文件(self):
+        while not self._停止事件.wait(self.间隔秒):
+            self._写文件()
+
+    def 停止(self):
+        self._停止事件.set()
+        if self._服务 is not None:
+            self._服务.shutdown()
+            self._服务.server_close()
+            self._服务 = None
+        if self.文件路径:
+            # 退出前留下最后一份
+            self._写文件()
+        for 线程 in self._线程列表:
+            线程.join(timeout=1.0)
+        self._线程列表.clear()
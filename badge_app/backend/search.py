@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+"""合约代码搜索索引：前缀 + 三元组匹配，按匹配程度、最近使用、成交量排序。"""
+import bisect
+import heapq
+import re
+
+_品种月份正则 = re.compile(r"([a-z]+)(\d*)")
+_未使用 = 1 << 30
+
+# 匹配层级，数值越小越靠前
+_完全相同 = 0
+_代码前缀 = 1
+_月份前缀 = 2
+_包含 = 3
+
+
+def _索引词(代码小写: str) -> list[tuple[str, int]]:
+    """拆出可被前缀匹配的词：完整代码、交易所.合约、合约、交割月份。"""
+
+    词 = [(代码小写, _代码前缀)]
+    主体 = 代码小写.split("@", 1)[-1]
+    if 主体 != 代码小写:
+        词.append((主体, _代码前缀))
+    _, _, 合约 = 主体.partition(".")
+    if 合约:
+        词.append((合约, _代码前缀))
+        匹配 = _品种月份正则.fullmatch(合约)
+        if 匹配 and 匹配.group(2):
+            词.append((匹配.group(2), _月份前缀))
+    return 词
+
+
+def _三元组(文本: str) -> set[str]:
+    return {文本[i:i + 3] for i in range(len(文本) - 2)}
+
+
+class 合约搜索索引:
+    """不可变索引，合约列表或最近使用记录变化时整体重建。
+
+    Args:
+        合约列表: [(代码, 成交量)]，代码应已规范化；重复代码保留第一次出现的成交量。
+        最近合约: 最近使用的代码，越靠前越新。
+    """
+
+    def __init__(self, 合约列表: list[tuple[str, float]], 最近合约: list[str] | None = None):
+        self.代码: list[str] = []
+        self._小写: list[str] = []
+        self._成交量: list[float] = []
+        位置: dict[str, int] = {}
+        for 代码, 成交量 in 合约列表:
+            if not 代码 or 代码 in 位置:
+                continue
+            位置[代码] = len(self.代码)
+            self.代码.append(代码)
+            self._小写.append(代码.lower())
+            self._成交量.append(float(成交量))
+
+        最近序号 = [_未使用] * len(self.代码)
+        for 序号, 代码 in enumerate(最近合约 or []):
+            编号 = 位置.get(代码)
+            if 编号 is not None and 最近序号[编号] == _未使用:
+                最近序号[编号] = 序号
+        # 同一匹配层级内的静态名次：最近使用优先，其次成交量大优先
+        名次顺序 = sorted(
+            range(len(self.代码)),
+            key=lambda 编号: (最近序号[编号], -self._成交量[编号], self._小写[编号]),
+        )
+        self._名次 = [0] * len(self.代码)
+        for 名次, 编号 in enumerate(名次顺序):
+            self._名次[编号] = 名次
+        self._名次编号 = 名次顺序
+        # 得分 = 层级 * 条目数 + 名次：越小越靠前，且能由得分反推出条目
+        self._层级权重 = max(1, len(self.代码))
+
+        词表 = []
+        self._三元组表: dict[str, set[int]] = {}
+        for 编号, 小写 in enumerate(self._小写):
+            for 词, 层级 in _索引词(小写):
+                词表.append((词, 层级, 编号))
+            for 片段 in _三元组(小写):
+                self._三元组表.setdefault(片段, set()).add(编号)
+        词表.sort()
+        self._词 = [词 for 词, _, _ in 词表]
+        self._词得分 = [层级 * self._层级权重 + self._名次[编号] for _, 层级, 编号 in 词表]
+
+    def __len__(self) -> int:
+        return len(self.代码)
+
+    def 搜索(self, 查询: str, 数量: int = 20) -> list[str]:
+        查询 = (查询 or "").strip().lower()
+        if not 查询:
+            return [self.代码[编号] for 编号 in self._名次编号[:数量]]
+
+        起点 = bisect.bisect_left(self._词, 查询)
+        终点 = bisect.bisect_left(self._词, 查询 + "\uffff", 起点)
+        得分列表 = []
+        # 与查询完全相同的代码词排在范围最前，提到最高层级
+        for i in range(起点, 终点):
+            if self._词[i] != 查询:
+                break
+            得分 = self._词得分[i]
+            if 得分 < _月份前缀 * self._层级权重:
+                得分列表.append(得分 % self._层级权重)
+        # 每个条目最多 4 个词，取 4 倍数量的最小得分足以覆盖前 N 个不同条目
+        得分列表.extend(heapq.nsmallest(数量 * 4, self._词得分[起点:终点]))
+
+        if len(查询) >= 3 and len(set(得分 % self._层级权重 for 得分 in 得分列表)) < 数量:
+            片段集 = [self._三元组表.get(片段) for 片段 in _三元组(查询)]
+            if all(片段集):
+                包含得分 = _包含 * self._层级权重
+                for 编号 in set.intersection(*片段集):
+                    if 查询 in self._小写[编号]:
+                        得分列表.append(包含得分 + self._名次[编号])
+
+        结果 = []
+        已有 = set()
+        for 得分 in sorted(得分列表):
+            编号 = self._名次编号[得分 % self._层级权重]
+            if 编号 in 已有:
+                continue
+            已有.add(编号)
+            结果.append(self.代码[编号])
+            if len(结果) >= 数量:
+                break
+        return 结果
@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+"""最近价格快照：启动或切换合约时先显示上次见到的价格，等实时行情确认。
+
+快照单独存放在一个小文件里，格式为
+{"version": 1, "quotes": {合约: [最新价, 小数位或 null, Unix 时间]}}。
+只保留最近更新的 容量 个合约，读写都与配置文件无关。
+"""
+import json
+import os
+
+快照路径 = os.path.join(os.path.expanduser("~"), ".tq_price_tray_snapshot.json")
+_格式版本 = 1
+
+
+class 价格快照:
+    """内存中的 {合约: (最新价, 小数位, 时间)}，由调用方决定何时、在哪个线程写盘。"""
+
+    def __init__(self, 路径: str | None = None, 容量: int = 200):
+        self.路径 = 路径 or 快照路径
+        self.容量 = max(1, int(容量))
+        self._条目: dict[str, tuple[float, int | None, float]] = {}
+        self._已修改 = False
+
+    def 加载(self):
+        try:
+            with open(self.路径, "r", encoding="utf-8") as f:
+                数据 = json.load(f)
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            print("读取价格快照失败:", e)
+            return
+        if not isinstance(数据, dict) or 数据.get("version") != _格式版本:
+            return
+        for 合约, 条目 in (数据.get("quotes") or {}).items():
+            try:
+                价格, 小数位, 时间 = 条目
+                self._条目[合约] = (float(价格), None if 小数位 is None else int(小数位), float(时间))
+            except (TypeError, ValueError):
+                continue
+
+    def 获取(self, 合约: str) -> tuple[float, int | None, float] | None:
+        return self._条目.get(合约)
+
+    def 合并(self, 最新价格: dict[str, tuple[float, int | None, float]]) -> bool:
+        """并入更新的条目，返回是否有变化。"""
+
+        for 合约, 条目 in 最新价格.items():
+            旧条目 = self._条目.get(合约)
+            if 旧条目 is None or (条目[2] > 旧条目[2] and 条目[:2] != 旧条目[:2]):
+                self._条目[合约] = 条目
+                self._已修改 = True
+        if len(self._条目) > self.容量:
+            保留 = sorted(self._条目.items(), key=lambda 项: 项[1][2], reverse=True)[:self.容量]
+            self._条目 = dict(保留)
+        return self._已修改
+
+    def 导出文本(self) -> str:
+        """序列化当前条目并清除修改标记。"""
+
+        self._已修改 = False
+        数据 = {"version": _格式版本, "quotes": {合约: list(条目) for 合约, 条目 in self._条目.items()}}
+        return json.dumps(数据, ensure_ascii=False, separators=(",", ":"))
@@ -2,16 +2,16 @@
 import json
 import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
 
-from PySide6 import QtCore, QtGui
+from . import metrics
 
+# 缺少账号时不在导入阶段报错，由行情线程创建会话时经错误信号提示
 TQ_USER = os.environ.get("TQ_USER")
 TQ_PASS = os.environ.get("TQ_PASS")
-if not TQ_USER or not TQ_PASS:
-    raise RuntimeError("请先在环境变量中设置 TQ_USER / TQ_PASS")
 
-# 兼容新版本 TqSdk: 默认使用主连合约，避免历史到期合约长时间无最新价
-合约代码 = sys.argv[1] if len(sys.argv) > 1 else "KQ.m@SHFE.cu"
+# 兼容新版本 TqSdk: 默认使用主连合约，避免历史到期合约长时间无最新价；命令行参数由 app.main 解析后覆盖
+合约代码 = "KQ.m@SHFE.cu"
 标题前缀 = "期货最新价"
 当价格为空也更新 = True
 
@@ -30,8 +30,47 @@ if not TQ_USER or not TQ_PASS:
     "badge_pos": None,
     "settings_pos": None,
     "recent_symbols": [],
+    "quote_poll_interval": 0.2,
+    # "thread"：market.行情循环 轮询；"asyncio"：async_market.异步行情循环 由唤醒驱动
+    "market_engine": "thread",
+    "quote_watch_fields": ["last_price"],
+    "badge_max_fps": 10,
+    "tooltip_max_fps": 1,
+    "contract_cache_ttl": 12 * 3600,
+    # 扫描在市合约成交量时每批订阅的合约数，以及每批最多等待截面的秒数（等待不阻塞行情线程）
+    "contract_scan_chunk": 200,
+    "contract_scan_timeout": 5,
+    "badge_fixed_digits": True,
+    # 合约目录里有该合约时，在备注后面显示最小变动价位
+    "badge_show_tick": True,
+    "badge_renderer": "widgets",
+    "board_symbols": [],
+    "board_columns": 4,
+    "board_font_size": 22,
+    "board_visible": False,
+    "board_pos": None,
+    "history_capacity": 4096,
+    "sparkline_enabled": False,
+    "sparkline_minutes": 10,
+    "sparkline_width": 180,
+    "sparkline_height": 32,
+    "price_alerts": {},
+    "alert_log_path": "",
+    "latency_stats_enabled": True,
+    "metrics_port": 0,
+    "metrics_file": "",
+    "metrics_interval": 15,
+    "capture_path": "",
+    "snapshot_interval": 30,
+    # 无界面模式（--headless）缓冲多少秒写出一次标准输出，0 为逐行写出
+    "headless_flush_interval": 1.0,
 }
 配置 = 默认配置.copy()
+_保存延迟毫秒 = 500
+_保存定时器 = None
+_已写入文本 = None
+# 单线程保证写入按提交顺序落盘
+_写入线程池 = ThreadPoolExecutor(max_workers=1, thread_name_prefix="config-writer")
 显示大号价格默认 = True
 默认锁定 = False
 
@@ -49,63 +88,82 @@ def 读取配置():
         print("读取配置失败:", e)
 
 
+def 原子写入文本(路径: str, 文本: str):
+    """先写临时文件并 fsync 再 os.replace，进程中途退出或断电也不会留下空文件或半截文件。"""
+
+    临时路径 = f"{路径}.tmp"
+    with open(临时路径, "w", encoding="utf-8") as f:
+        f.write(文本)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(临时路径, 路径)
+
+
 def 保存配置():
-    try:
-        with open(配置路径, "w", encoding="utf-8") as f:
-            json.dump(配置, f, ensure_ascii=False, indent=2)
-    except Exception as e:
-        print("保存配置失败:", e)
+    """标记配置已修改。静默 _保存延迟毫秒 后才序列化，并在后台线程写盘。
 
+    连续多次修改只写一次；内容与上次写入相同则跳过。没有 Qt 事件循环时立即写入。
+    本模块不导入 PySide6，无界面模式下不会加载 Qt。
+    """
 
-def 设置当前合约(代码: str):
-    global 合约代码
-    合约代码 = 代码
+    global _保存定时器
+    QtCore = sys.modules.get("PySide6.QtCore")
+    if QtCore is None or QtCore.QCoreApplication.instance() is None:
+        刷新配置()
+        return
+    if _保存定时器 is None:
+        _保存定时器 = QtCore.QTimer()
+        _保存定时器.setSingleShot(True)
+        _保存定时器.timeout.connect(_提交写入)
+    _保存定时器.start(_保存延迟毫秒)
 
 
-def 生效小字():
-    文本 = (配置.get("badge_subtitle") or "").strip()
-    return 文本 if 文本 else 合约代码
+def 刷新配置():
+    """立即写出尚未落盘的修改并等待写完，退出前调用。"""
+
+    if _保存定时器 is not None:
+        _保存定时器.stop()
+    任务 = _提交写入()
+    if 任务 is not None:
+        任务.result()
 
 
-def _点_from_config(记录: dict | None, 默认点: QtCore.QPoint) -> QtCore.QPoint:
-    记录 = 记录 or {}
-    return QtCore.QPoint(int(记录.get("x", 默认点.x())), int(记录.get("y", 默认点.y())))
+def _提交写入():
+    文本 = json.dumps(配置, ensure_ascii=False, indent=2)
+    if 文本 == _已写入文本:
+        return None
+    return _写入线程池.submit(_写入配置文件, 文本)
 
 
-def 读取组件位置配置() -> dict[str, QtCore.QPoint]:
-    """读取备注、按钮、价格的相对坐标，落在默认值上。"""
+def 后台写入文本(路径: str, 文本: str):
+    """在配置写盘线程上原子写入其他小文件，返回 Future。"""
 
-    备注默认 = QtCore.QPoint(6, 2)
-    锁定默认 = QtCore.QPoint(备注默认.x() + 120, 备注默认.y())
-    编辑默认 = QtCore.QPoint(锁定默认.x() + 28, 锁定默认.y())
-    价格默认 = QtCore.QPoint(6, 28)
+    return _写入线程池.submit(_写入文本文件, 路径, 文本)
 
-    旧头部 = 配置.get("badge_header_pos") or {}
-    if 旧头部:
-        备注默认 = QtCore.QPoint(int(旧头部.get("x", 备注默认.x())), int(旧头部.get("y", 备注默认.y())))
-        锁定默认 = QtCore.QPoint(备注默认.x() + 120, 备注默认.y())
-        编辑默认 = QtCore.QPoint(锁定默认.x() + 28, 锁定默认.y())
 
-    return {
-        "subtitle": _点_from_config(配置.get("badge_subtitle_pos"), 备注默认),
-        "lock": _点_from_config(配置.get("badge_lock_pos"), 锁定默认),
-        "edit": _点_from_config(配置.get("badge_edit_pos"), 编辑默认),
-        "price": _点_from_config(配置.get("badge_price_pos"), 价格默认),
-    }
+def _写入文本文件(路径: str, 文本: str):
+    try:
+        原子写入文本(路径, 文本)
+    except Exception as e:
+        print(f"写入 {路径} 失败:", e)
 
 
-def 计算安全坐标(目标点: QtCore.QPoint, 窗口大小: QtCore.QSize) -> QtCore.QPoint:
-    """在多屏、高分辨率环境下，确保窗口位置落在可见区域。"""
+def _写入配置文件(文本: str):
+    global _已写入文本
+    try:
+        原子写入文本(配置路径, 文本)
+        # 写成功才记下，失败的内容下次保存时会重试
+        _已写入文本 = 文本
+        metrics.全局指标.计数器("tq_badge_config_writes_total", "配置文件写盘次数").增加()
+    except Exception as e:
+        print("保存配置失败:", e)
 
-    屏幕 = QtGui.QGuiApplication.screenAt(目标点)
-    if 屏幕 is None:
-        屏幕 = QtGui.QGuiApplication.primaryScreen()
-    if 屏幕 is None:
-        return 目标点
 
-    可用 = 屏幕.availableGeometry()
-    最大偏移_x = max(0, 可用.width() - 窗口大小.width())
-    最大偏移_y = max(0, 可用.height() - 窗口大小.height())
-    x = min(max(目标点.x(), 可用.left()), 可用.left() + 最大偏移_x)
-    y = min(max(目标点.y(), 可用.top()), 可用.top() + 最大偏移_y)
-    return QtCore.QPoint(x, y)
+def 设置当前合约(代码: str):
+    global 合约代码
+    合约代码 = 代码
+
+
+def 生效小字():
+    文本 = (配置.get("badge_subtitle") or "").strip()
+    return 文本 if 文本 else 合约代码
@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+"""行情订阅的增减。TqApi 的私有成员只在本模块里访问。
+
+TqSdk 没有公开的退订接口：它把订阅过的合约累积在 api._requests["quotes"] 里，每次
+subscribe_quote 都发送完整集合，订阅主连、期权时还会顺带订阅标的合约。这里记录行情
+线程持有的合约及各自的标的，退订时只撤销不再被任何持有合约需要的部分，把剩余集合
+重发一次。
+
+订阅放在 TqApi 事件循环的协程里，由行情线程自己的 wait_update 推动：在事件循环内
+调用的 get_quote_list 只发出订阅、立即返回，不像在事件循环外那样阻塞最多 30 秒。
+它内部等待合约信息和截面的任务由 TqApi 托管，合约不存在、无行情权限等异常会从下一次
+wait_update 抛出、结束整个会话；发出订阅() 把这个任务接管过来，异常只交给等待它的
+调用方。
+
+以上按 TqSdk 3.8.9 的 TqApi.get_quote_list、QuoteList._ensure_quotes 与
+TqBaseApi._create_task / _on_task_done 核对，升级 TqSdk 时需要重新确认。
+不是 TqApi 的行情源没有这些私有成员，相应步骤直接跳过。
+"""
+import weakref
+
+# api → 行情订阅管理，供借用会话的后台任务（例如合约扫描）找到持有情况
+_管理器表 = weakref.WeakKeyDictionary()
+
+
+def 发出订阅(api, 合约列表: list[str]) -> tuple[list, object | None]:
+    """须在事件循环内调用：发出订阅并立即返回 (quote 列表, 完成任务)。
+
+    完成任务在合约信息和截面都到齐时结束，合约不存在等错误从它抛出。它已脱离 TqApi
+    托管，调用方须 await 它或在不需要时 cancel()。行情源没有这个任务时返回 None。
+    """
+
+    quote列表 = api.get_quote_list(合约列表)
+    任务 = getattr(quote列表, "_task", None)
+    if 任务 is None:
+        return list(quote列表), None
+    任务.remove_done_callback(api._on_task_done)
+    api._tasks.discard(任务)
+    return list(quote列表), 任务
+
+
+def _读取标的(quote) -> str:
+    try:
+        标的 = quote["underlying_symbol"]
+    except Exception:
+        标的 = getattr(quote, "underlying_symbol", "")
+    return 标的 if isinstance(标的, str) else ""
+
+
+class 行情订阅管理:
+    """记录一个会话里行情线程持有的合约及其标的，所有方法都须在行情线程调用。
+
+    出错(合约, 信息) 在订阅失败时调用，此时该合约已不再持有。
+    """
+
+    def __init__(self, api, 出错):
+        self.api = api
+        self._出错 = 出错
+        self._持有: dict[str, object] = {}
+        # 主动订阅的合约 → TqSdk 随之订阅的标的合约；主连换月后 quote 上的标的会变，
+        # 这里记的是订阅时实际附带订阅的那个
+        self._标的: dict[str, str] = {}
+        self._待订阅: set[str] = set()
+        # 合约 → 尚未等到合约信息和截面的完成任务
+        self._等待: dict[str, object] = {}
+        try:
+            _管理器表[api] = self
+        except TypeError:
+            pass
+
+    @staticmethod
+    def 查找(api) -> "行情订阅管理 | None":
+        """返回该会话的管理器，供借用会话的后台任务撤销临时订阅。"""
+
+        try:
+            return _管理器表.get(api)
+        except TypeError:
+            return None
+
+    def 已持有(self, 合约: str) -> bool:
+        return 合约 in self._持有 or 合约 in self._待订阅
+
+    def 订阅(self, 合约: str, 就绪):
+        """发出订阅后调用 就绪(quote)，不等合约信息和截面；行情源不支持协程时同步订阅。"""
+
+        if self.已持有(合约):
+            return
+        if not hasattr(self.api, "create_task"):
+            try:
+                quote = self.api.get_quote(合约)
+            except Exception as e:
+                self._出错(合约, str(e))
+                return
+            self._持有[合约] = quote
+            就绪(quote)
+            return
+        self._待订阅.add(合约)
+        self.api.create_task(self._订阅协程(合约, 就绪))
+
+    async def _订阅协程(self, 合约: str, 就绪):
+        if 合约 not in self._待订阅:
+            # 协程开始前已经退订
+            return
+        self._待订阅.discard(合约)
+        try:
+            quote列表, 任务 = 发出订阅(self.api, [合约])
+        except Exception as e:
+            self._出错(合约, str(e))
+            return
+        quote = quote列表[0]
+        self._持有[合约] = quote
+        就绪(quote)
+        if 任务 is None:
+            return
+        self._等待[合约] = 任务
+        try:
+            # 退订时 任务 被取消，CancelledError 直接结束本协程
+            await 任务
+        except Exception as e:
+            if self._持有.get(合约) is quote:
+                del self._持有[合约]
+                self._出错(合约, str(e))
+            return
+        finally:
+            if self._等待.get(合约) is 任务:
+                del self._等待[合约]
+        标的 = _读取标的(quote)
+        if 标的:
+            self._标的[合约] = 标的
+
+    def 退订(self, 合约: str):
+        self._待订阅.discard(合约)
+        任务 = self._等待.pop(合约, None)
+        if 任务 is not None:
+            # 不让 TqSdk 在退订之后再把合约和标的加进订阅集合
+            任务.cancel()
+        quote = self._持有.pop(合约, None)
+        if quote is None:
+            return
+        标的 = self._标的.pop(合约, "") or _读取标的(quote)
+        self.释放({合约, 标的} - {""})
+
+    def 释放(self, 合约集合: set[str]):
+        """撤销这些合约的订阅，仍被持有或作为持有合约标的的除外。"""
+
+        需要 = set(self._持有) | self._待订阅 | set(self._标的.values())
+        需要.update(_读取标的(quote) for quote in self._持有.values())
+        self._重发订阅(合约集合 - 需要)
+
+    def _重发订阅(self, 移除: set[str]):
+        请求 = getattr(self.api, "_requests", None)
+        if not 移除 or not isinstance(请求, dict) or not isinstance(请求.get("quotes"), set):
+            return
+        剩余 = 请求["quotes"] - 移除
+        if 剩余 == 请求["quotes"]:
+            return
+        请求["quotes"] = 剩余
+        self.api._send_pack({"aid": "subscribe_quote", "ins_list": ",".join(sorted(剩余))})
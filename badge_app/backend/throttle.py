@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+from PySide6 import QtCore
+
+from .metrics import 全局指标
+
+
+class 限速投递器(QtCore.QObject):
+    """最新值优先的限速器：两次输出之间至少间隔 1/最大频率 秒。
+
+    间隔内提交的值只保留最后一个，过期的中间值直接丢弃，不会在事件循环里堆积。
+    最大频率 <= 0 表示不限速，每次提交都立即输出。给出 名称 时丢弃数同时计入运行指标。
+    """
+
+    输出信号 = QtCore.Signal(object)
+
+    def __init__(self, 最大频率: float, 父=None, 名称: str | None = None):
+        super().__init__(父)
+        self._定时器 = QtCore.QTimer(self)
+        self._定时器.setSingleShot(True)
+        self._定时器.timeout.connect(self._输出待发值)
+        self._计时 = QtCore.QElapsedTimer()
+        self._有待发值 = False
+        self._待发值 = None
+        self.丢弃数 = 0
+        self._丢弃指标 = None
+        if 名称:
+            self._丢弃指标 = 全局指标.计数器(
+                "tq_badge_throttle_dropped_total", "限速器丢弃的过期值", {"throttle": 名称}
+            )
+        self.设置最大频率(最大频率)
+
+    def 设置最大频率(self, 最大频率: float):
+        try:
+            最大频率 = float(最大频率)
+        except (TypeError, ValueError):
+            最大频率 = 0.0
+        self._最小间隔毫秒 = int(1000 / 最大频率) if 最大频率 > 0 else 0
+
+    def 提交(self, 值):
+        if self._有待发值:
+            self.丢弃数 += 1
+            if self._丢弃指标 is not None:
+                self._丢弃指标.增加()
+        self._待发值 = 值
+        self._有待发值 = True
+        if self._定时器.isActive():
+            return
+        已过毫秒 = self._计时.elapsed() if self._计时.isValid() else self._最小间隔毫秒
+        if 已过毫秒 >= self._最小间隔毫秒:
+            self._输出待发值()
+        else:
+            self._定时器.start(self._最小间隔毫秒 - 已过毫秒)
+
+    def 清空(self):
+        """丢弃尚未输出的值，例如切换合约时旧合约的最后一笔。"""
+
+        self._定时器.stop()
+        self._有待发值 = False
+        self._待发值 = None
+
+    def _输出待发值(self):
+        if not self._有待发值:
+            return
+        值 = self._待发值
+        self._有待发值 = False
+        self._待发值 = None
+        self._计时.start()
+        self.输出信号.emit(值)
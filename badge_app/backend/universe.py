@@ -0,0 +1,213 @@
+# -*- coding: utf-8 -*-
+"""在市期货合约列表：本地缓存 + 借用共享会话的后台刷新。"""
+import asyncio
+import json
+import math
+import os
+import time
+
+from PySide6 import QtCore
+
+from . import state
+from .catalog import 合约资料, 获取合约目录
+from .subscription import 发出订阅, 行情订阅管理
+
+合约缓存路径 = os.path.join(os.path.expanduser("~"), ".tq_price_tray_contracts.json")
+# 等待一批截面时检查是否到齐的间隔
+_截面检查秒数 = 0.1
+
+
+def 读取合约缓存(路径: str | None = None) -> tuple[list[tuple[str, float]], bool]:
+    """返回 (按成交量降序的 [(代码, 成交量)], 是否已过期)；没有缓存时返回 ([], True)。"""
+
+    try:
+        with open(路径 or 合约缓存路径, "r", encoding="utf-8") as f:
+            数据 = json.load(f)
+        更新时间 = float(数据["updated_at"])
+        合约列表 = [(str(代码), float(成交量)) for 代码, 成交量 in 数据["contracts"]]
+    except FileNotFoundError:
+        return [], True
+    except Exception as e:
+        print("读取合约缓存失败:", e)
+        return [], True
+    已过期 = time.time() - 更新时间 > float(state.配置["contract_cache_ttl"])
+    return 合约列表, 已过期
+
+
+def 写入合约缓存(合约列表: list[tuple[str, float]], 路径: str | None = None):
+    """在配置写盘线程上写入，扫描结束时行情线程不必等磁盘。"""
+
+    数据 = {"updated_at": time.time(), "contracts": [[代码, 成交量] for 代码, 成交量 in 合约列表]}
+    return state.后台写入文本(路径 or 合约缓存路径, json.dumps(数据, ensure_ascii=False, separators=(",", ":")))
+
+
+def 写入合约目录(资料列表: list[合约资料]):
+    """替换进程内的合约目录并在后台写盘；没有取到任何资料时保留旧目录。"""
+
+    if not 资料列表:
+        return None
+    目录 = 获取合约目录()
+    目录.替换(资料列表)
+    return state.后台写入文本(目录.路径, 目录.导出文本())
+
+
+def _成交量(q) -> float:
+    try:
+        值 = q["volume"]
+    except Exception:
+        值 = getattr(q, "volume", None)
+    if 值 is None:
+        return -1.0
+    try:
+        值 = float(值)
+    except Exception:
+        return -1.0
+    return -1.0 if math.isnan(值) else 值
+
+
+def _已到截面(q) -> bool:
+    """收到过行情截面后 datetime 才非空；不活跃合约的成交量可能一直是 0。"""
+
+    try:
+        return bool(q["datetime"])
+    except Exception:
+        return bool(getattr(q, "datetime", ""))
+
+
+class 在市期货合约加载任务(QtCore.QObject):
+    """借用行情中心的会话查询在市期货合约，按成交量排序后写入本地缓存，同时刷新合约目录。
+
+    合约按 contract_scan_chunk 个一批订阅，每批截面到齐（或等满 contract_scan_timeout
+    秒）就记下成交量、撤销这批订阅，并通过部分结果信号送出这一批按成交量降序的
+    [(代码, 成交量)]。等待截面的是 TqApi 事件循环里的协程，由行情循环自己的
+    wait_update 推动，扫描期间悬浮牌的行情、提醒和切换都不受影响。全部扫完后完成
+    信号携带完整的降序列表。
+    """
+
+    部分结果信号 = QtCore.Signal(list)
+    完成信号 = QtCore.Signal(list)
+    错误信号 = QtCore.Signal(str)
+    结束信号 = QtCore.Signal()
+
+    def __init__(self, 父=None):
+        super().__init__(父)
+        self.运行中 = False
+        self._中心 = None
+        self._待扫描: list[str] = []
+        self._结果: list[tuple[str, float]] = []
+        self._资料: list[合约资料] = []
+
+    def start(self):
+        from .hub import 获取行情中心
+
+        self.运行中 = True
+        self._中心 = 获取行情中心()
+        # 会话建立失败或中途断开时，排队中的批次不会再执行
+        self._中心.会话结束信号.connect(self._会话结束)
+        self._中心.提交任务(self._查询合约)
+
+    def _会话结束(self):
+        self._结束("行情会话已断开，合约列表未能刷新")
+
+    def _查询合约(self, api):
+        try:
+            self._待扫描 = list(api.query_quotes(ins_class="FUTURE", expired=False))
+            self._结果 = []
+            self._资料 = []
+        except Exception as e:
+            self._结束(str(e))
+            return
+        if not self._待扫描:
+            self._结束()
+            return
+        self._扫描下一批(api)
+
+    def _扫描下一批(self, api):
+        批量 = max(1, int(state.配置["contract_scan_chunk"]))
+        本批, self._待扫描 = self._待扫描[:批量], self._待扫描[批量:]
+        if not hasattr(api, "create_task"):
+            # 不支持协程的行情源（例如回放）不等待截面，直接读取现有数据
+            try:
+                quote列表 = api.get_quote_list(本批)
+            except Exception as e:
+                self._结束(str(e))
+                return
+            self._收尾本批(api, 本批, quote列表)
+            return
+        api.create_task(self._等待本批(api, 本批))
+
+    async def _等待本批(self, api, 本批: list[str]):
+        """在行情线程的 wait_update 里运行，等待期间行情循环照常推送已订阅合约。
+
+        异常必须在这里吞掉，否则会从行情循环的 wait_update 里抛出，结束整个会话。
+        """
+
+        try:
+            quote列表, 任务 = 发出订阅(api, 本批)
+            截止 = time.monotonic() + float(state.配置["contract_scan_timeout"])
+            while not all(_已到截面(q) for q in quote列表) and time.monotonic() < 截止:
+                if 任务 is not None and 任务.done():
+                    break
+                await asyncio.sleep(_截面检查秒数)
+            if 任务 is not None:
+                if not 任务.done():
+                    任务.cancel()
+                elif not 任务.cancelled() and 任务.exception() is not None:
+                    raise 任务.exception()
+            self._收尾本批(api, 本批, quote列表)
+        except Exception as e:
+            self._结束(str(e))
+
+    def _收尾本批(self, api, 本批: list[str], quote列表):
+        try:
+            带成交量 = [(代码, _成交量(quote)) for 代码, quote in zip(本批, quote列表)]
+            for 代码, quote in zip(本批, quote列表):
+                资料 = 合约资料.从quote(代码, quote)
+                if 资料 is not None:
+                    self._资料.append(资料)
+            # 行情线程持有的合约（包括扫描期间界面新订阅的）及其标的不会被撤销
+            管理器 = 行情订阅管理.查找(api)
+            if 管理器 is not None:
+                管理器.释放(set(本批))
+        except Exception as e:
+            self._结束(str(e))
+            return
+
+        带成交量.sort(key=lambda x: x[1], reverse=True)
+        self._结果.extend(带成交量)
+        self.部分结果信号.emit(带成交量)
+        if self._待扫描:
+            self._中心.提交任务(self._扫描下一批)
+        else:
+            self._结束()
+
+    def _结束(self, 错误信息: str | None = None):
+        if not self.运行中:
+            return
+        self._中心.会话结束信号.disconnect(self._会话结束)
+        if 错误信息 is not None:
+            self.错误信号.emit(错误信息)
+        else:
+            self._结果.sort(key=lambda x: x[1], reverse=True)
+            写入合约缓存(self._结果)
+            写入合约目录(self._资料)
+            self.完成信号.emit(self._结果)
+        self._结果 = []
+        self._资料 = []
+        self._待扫描 = []
+        self._中心 = None
+        self.运行中 = False
+        self.结束信号.emit()
+
+
+_刷新任务: 在市期货合约加载任务 | None = None
+
+
+def 刷新在市期货合约() -> 在市期货合约加载任务:
+    """启动后台刷新；已有刷新在进行时直接返回那个任务，避免重复查询。"""
+
+    global _刷新任务
+    if _刷新任务 is None or not _刷新任务.运行中:
+        _刷新任务 = 在市期货合约加载任务()
+        _刷新任务.start()
+    return _刷新任务
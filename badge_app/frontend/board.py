@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+from PySide6 import QtWidgets, QtGui, QtCore
+
+from ..backend import state
+from ..backend.hub import 获取行情中心
+from ..backend.market import 批量规范化合约代码
+from .layout import 计算安全坐标
+from .painted import 字形价格标签, 静态文本标签
+
+
+class 看板单元(QtWidgets.QWidget):
+    """看板中的一格：合约代码 + 价格。改价只重绘本格的价格部件。"""
+
+    def __init__(self, 合约: str, 父=None):
+        super().__init__(父)
+        self.合约 = 合约
+        self.订阅 = None
+
+        self.代码标签 = 静态文本标签(合约, self)
+        代码字体 = QtGui.QFont(state.默认字体族, state.配置["subtitle_font_size"])
+        代码字体.setBold(True)
+        self.代码标签.setFont(代码字体)
+        self.代码标签.设置颜色(state.配置["subtitle_font_color"])
+
+        self.价格标签 = 字形价格标签("…", self)
+        价格字体 = QtGui.QFont(state.默认字体族, state.配置["board_font_size"])
+        价格字体.setBold(True)
+        价格字体.setFeature(QtGui.QFont.Tag("tnum"), 1)
+        self.价格标签.setFont(价格字体)
+        self.价格标签.设置颜色(state.配置["badge_font_color"])
+        # 预留常见价格宽度，跳价时不触发布局
+        self.价格标签.setMinimumSize(QtGui.QFontMetrics(价格字体).horizontalAdvance("888888.8"), 0)
+
+        布局 = QtWidgets.QVBoxLayout(self)
+        布局.setContentsMargins(6, 2, 6, 2)
+        布局.setSpacing(0)
+        布局.addWidget(self.代码标签)
+        布局.addWidget(self.价格标签)
+
+    def 接入(self):
+        if self.订阅 is not None:
+            return
+        self.订阅 = 获取行情中心().订阅(self.合约)
+        self.订阅.价格信号.connect(self.更新价格文本)
+        if self.订阅.最新文本 is not None:
+            self.更新价格文本(self.订阅.最新文本)
+
+    def 断开(self):
+        订阅 = self.订阅
+        self.订阅 = None
+        if 订阅 is None:
+            return
+        订阅.价格信号.disconnect(self.更新价格文本)
+        获取行情中心().退订(订阅.合约)
+
+    def 更新价格文本(self, 文本: str):
+        self.价格标签.setText(文本)
+        if self.价格标签.sizeHint().width() > self.价格标签.minimumWidth():
+            self.价格标签.setMinimumWidth(self.价格标签.sizeHint().width())
+
+
+class 行情看板窗口(QtWidgets.QWidget):
+    """多合约网格看板，所有格子共用行情中心的一个会话。
+
+    窗口可见时才订阅，隐藏后全部退订，资源只随可见格子数增长。
+    """
+
+    def __init__(self, 合约列表: list[str], 列数: int = 4, 父=None):
+        super().__init__(父)
+        self.setWindowFlags(QtCore.Qt.WindowStaysOnTopHint | QtCore.Qt.FramelessWindowHint | QtCore.Qt.Tool)
+        self.setAttribute(QtCore.Qt.WA_TranslucentBackground, True)
+        self._拖动中 = False
+        self._拖动起点 = QtCore.QPoint()
+        self._窗口起点 = QtCore.QPoint()
+        self._背景色 = QtGui.QColor(20, 20, 20, 160)
+
+        布局 = QtWidgets.QGridLayout(self)
+        布局.setContentsMargins(6, 6, 6, 6)
+        布局.setSpacing(4)
+        布局.setSizeConstraint(QtWidgets.QLayout.SetFixedSize)
+        列数 = max(1, int(列数))
+        self.单元列表 = [看板单元(合约, self) for 合约 in 批量规范化合约代码(合约列表)]
+        for 序号, 单元 in enumerate(self.单元列表):
+            布局.addWidget(单元, 序号 // 列数, 序号 % 列数)
+        布局.activate()
+        self._恢复位置()
+
+    def showEvent(self, 事件: QtGui.QShowEvent):
+        for 单元 in self.单元列表:
+            单元.接入()
+        super().showEvent(事件)
+
+    def hideEvent(self, 事件: QtGui.QHideEvent):
+        for 单元 in self.单元列表:
+            单元.断开()
+        super().hideEvent(事件)
+
+    def paintEvent(self, 事件: QtGui.QPaintEvent):
+        画笔 = QtGui.QPainter(self)
+        画笔.setRenderHint(QtGui.QPainter.Antialiasing, True)
+        画笔.setPen(QtCore.Qt.NoPen)
+        画笔.setBrush(self._背景色)
+        画笔.drawRoundedRect(QtCore.QRectF(self.rect()), 6, 6)
+
+    def _恢复位置(self):
+        记录 = state.配置.get("board_pos") or {}
+        if "x" in 记录 and "y" in 记录:
+            self.move(计算安全坐标(QtCore.QPoint(int(记录["x"]), int(记录["y"])), self.size()))
+            return
+        屏幕 = QtGui.QGuiApplication.primaryScreen()
+        if 屏幕 is not None:
+            可用区域 = 屏幕.availableGeometry()
+            self.move(可用区域.right() - self.width() - 12, 可用区域.top() + 40)
+
+    def _保存位置(self):
+        state.配置["board_pos"] = {"x": int(self.x()), "y": int(self.y())}
+        state.保存配置()
+
+    def mousePressEvent(self, 事件):
+        if 事件.button() == QtCore.Qt.LeftButton:
+            self._拖动中 = True
+            self._拖动起点 = 事件.globalPosition().toPoint()
+            self._窗口起点 = self.frameGeometry().topLeft()
+        super().mousePressEvent(事件)
+
+    def mouseMoveEvent(self, 事件):
+        if self._拖动中:
+            位移 = 事件.globalPosition().toPoint() - self._拖动起点
+            self.move(计算安全坐标(self._窗口起点 + 位移, self.size()))
+        super().mouseMoveEvent(事件)
+
+    def mouseReleaseEvent(self, 事件):
+        if self._拖动中:
+            self._保存位置()
+        self._拖动中 = False
+        super().mouseReleaseEvent(事件)
@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+from PySide6 import QtCore
+
+from ..backend.search import 合约搜索索引
+
+
+class 合约补全模型(QtCore.QAbstractListModel):
+    """只装载当前输入的前 N 个搜索结果，过滤和排序交给 合约搜索索引。
+
+    配合 QCompleter.UnfilteredPopupCompletion 使用，QCompleter 不再自行扫描全部代码。
+    """
+
+    def __init__(self, 数量: int = 20, 父=None):
+        super().__init__(父)
+        self.数量 = 数量
+        self._索引 = 合约搜索索引([])
+        self._查询 = ""
+        self._结果: list[str] = []
+
+    def 设置索引(self, 索引: 合约搜索索引):
+        self._索引 = 索引
+        self.设置查询(self._查询)
+
+    def 设置查询(self, 文本: str):
+        self._查询 = 文本
+        结果 = self._索引.搜索(文本, self.数量)
+        if 结果 == self._结果:
+            return
+        self.beginResetModel()
+        self._结果 = 结果
+        self.endResetModel()
+
+    def rowCount(self, 父=QtCore.QModelIndex()) -> int:
+        return 0 if 父.isValid() else len(self._结果)
+
+    def data(self, 索引: QtCore.QModelIndex, 角色: int = QtCore.Qt.DisplayRole):
+        if not 索引.isValid() or not 0 <= 索引.row() < len(self._结果):
+            return None
+        if 角色 in (QtCore.Qt.DisplayRole, QtCore.Qt.EditRole):
+            return self._结果[索引.row()]
+        return None
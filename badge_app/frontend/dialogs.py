@@ -2,7 +2,12 @@
 from PySide6 import QtWidgets, QtGui, QtCore
 
 from ..backend import state
-from ..backend.market import 规范化合约代码, 合约代码合法, 在市期货合约加载线程
+from ..backend.catalog import 获取合约目录
+from ..backend.market import 规范化合约代码, 批量规范化合约代码, 合约代码合法
+from ..backend.search import 合约搜索索引
+from ..backend.universe import 刷新在市期货合约, 读取合约缓存
+from .completer import 合约补全模型
+from .layout import 计算安全坐标, 读取组件位置配置
 from .widgets import 悬浮牌预览
 
 
@@ -15,9 +20,9 @@ class 设置对话框(QtWidgets.QDialog):
         self.setWindowTitle("设置 - 悬浮牌样式")
         self.setModal(True)
         self.setFixedSize(520, 560)
-        self._预览组件位置 = state.读取组件位置配置()
-        self._在市期货合约: list[str] = []
-        self._合约加载线程 = None
+        self._预览组件位置 = 读取组件位置配置()
+        self._在市期货合约: list[tuple[str, float]] = []
+        self._合约加载任务 = None
         self._初始化界面()
         self._恢复位置()
 
@@ -59,12 +64,11 @@ class 设置对话框(QtWidgets.QDialog):
         self.合约输入 = QtWidgets.QLineEdit(self.当前合约, self)
         self.合约输入.setPlaceholderText("输入关键字模糊搜索在市期货合约（示例：SHFE.rb2501）")
         self.合约输入.editingFinished.connect(self._规范化合约输入)
-        self.合约补全模型 = QtCore.QStringListModel(self)
+        self.合约补全模型 = 合约补全模型(父=self)
         self.合约补全 = QtWidgets.QCompleter(self.合约补全模型, self)
-        self.合约补全.setCaseSensitivity(QtCore.Qt.CaseInsensitive)
-        self.合约补全.setFilterMode(QtCore.Qt.MatchContains)
-        self.合约补全.setCompletionMode(QtWidgets.QCompleter.PopupCompletion)
+        self.合约补全.setCompletionMode(QtWidgets.QCompleter.UnfilteredPopupCompletion)
         self.合约输入.setCompleter(self.合约补全)
+        self.合约输入.textEdited.connect(self.合约补全模型.设置查询)
         self._刷新合约补全()
         self._加载在市期货合约()
         布局.addWidget(self.合约输入, 行, 1, QtCore.Qt.AlignLeft)
@@ -103,36 +107,51 @@ class 设置对话框(QtWidgets.QDialog):
 
         self._预览()
 
-    def _候选合约列表(self) -> list[str]:
-        候选 = [self.当前合约]
-        候选.extend(self._在市期货合约)
-        候选.extend(state.配置.get("recent_symbols", []))
-        结果 = []
-        for 项 in 候选:
-            代码 = 规范化合约代码(str(项))
-            if 代码 and 代码 not in 结果:
-                结果.append(代码)
-        return 结果
+    def _最近合约列表(self) -> list[str]:
+        return 批量规范化合约代码([self.当前合约, *state.配置.get("recent_symbols", [])])
 
     def _刷新合约补全(self):
-        self.合约补全模型.setStringList(self._候选合约列表())
+        最近 = self._最近合约列表()
+        合约列表 = self._在市期货合约 + [(代码, 0.0) for 代码 in 最近]
+        self.合约补全模型.设置索引(合约搜索索引(合约列表, 最近))
 
     def _加载在市期货合约(self):
-        self._合约加载线程 = 在市期货合约加载线程(state.TQ_USER, state.TQ_PASS, self)
-        self._合约加载线程.完成信号.connect(self._应用在市期货合约)
-        self._合约加载线程.错误信号.connect(self._处理合约加载失败)
-        self._合约加载线程.finished.connect(self._合约加载结束)
-        self._合约加载线程.start()
-
-    def _应用在市期货合约(self, 合约列表: list[str]):
-        self._在市期货合约 = [规范化合约代码(x) for x in 合约列表 if str(x).strip()]
+        缓存, 已过期 = 读取合约缓存()
+        if 缓存:
+            self._应用在市期货合约(缓存)
+        if not 已过期:
+            return
+        # 缓存过期或缺失时先用旧列表，后台借用共享会话刷新
+        self._合约加载任务 = 刷新在市期货合约()
+        self._合约加载任务.部分结果信号.connect(self._并入在市期货合约)
+        self._合约加载任务.完成信号.connect(self._应用在市期货合约)
+        self._合约加载任务.错误信号.connect(self._处理合约加载失败)
+        self._合约加载任务.结束信号.connect(self._合约加载结束)
+
+    def _应用在市期货合约(self, 合约列表: list[tuple[str, float]]):
+        成交量表 = {}
+        for 代码, 成交量 in 合约列表:
+            成交量表.setdefault(规范化合约代码(str(代码)), 成交量)
+        成交量表.pop("", None)
+        self._在市期货合约 = list(成交量表.items())
+        self._刷新合约补全()
+
+    def _并入在市期货合约(self, 合约列表: list[tuple[str, float]]):
+        """逐批扫描时更新这一批的成交量，其余合约沿用旧列表，扫完后由完整结果替换。"""
+
+        成交量表 = dict(self._在市期货合约)
+        for 代码, 成交量 in 合约列表:
+            代码 = 规范化合约代码(str(代码))
+            if 代码:
+                成交量表[代码] = 成交量
+        self._在市期货合约 = list(成交量表.items())
         self._刷新合约补全()
 
     def _处理合约加载失败(self, 错误信息: str):
         print("加载在市期货合约失败:", 错误信息)
 
     def _合约加载结束(self):
-        self._合约加载线程 = None
+        self._合约加载任务 = None
 
     def _规范化合约输入(self):
         self.合约输入.setText(规范化合约代码(self.合约输入.text()))
@@ -149,6 +168,11 @@ class 设置对话框(QtWidgets.QDialog):
                 "- SHFE.rb2501（具体合约）",
             )
             return
+        if 获取合约目录().已知(代码) is False:
+            QtWidgets.QMessageBox.warning(
+                self, "合约不存在", f"在市合约中没有 {代码}，请检查品种和月份，或确认合约是否已到期。"
+            )
+            return
         self.合约切换请求.emit(代码)
         QtWidgets.QMessageBox.information(self, "已切换", f"已切换到合约：{代码}")
         self.当前合约 = 代码
@@ -216,7 +240,7 @@ class 设置对话框(QtWidgets.QDialog):
         else:
             目标 = self._默认位置()
 
-        安全点 = state.计算安全坐标(目标, self.size())
+        安全点 = 计算安全坐标(目标, self.size())
         self.move(安全点)
 
     def _默认位置(self) -> QtCore.QPoint:
@@ -235,13 +259,17 @@ class 设置对话框(QtWidgets.QDialog):
         state.配置["settings_pos"] = {"x": int(self.x()), "y": int(self.y())}
         state.保存配置()
 
-    def _停止合约加载线程(self):
-        线程 = self._合约加载线程
-        if 线程 and 线程.isRunning():
-            线程.requestInterruption()
-            线程.wait(1200)
+    def _停止合约加载任务(self):
+        # 刷新结果仍会写入缓存，对话框关闭后只需不再接收
+        任务 = self._合约加载任务
+        self._合约加载任务 = None
+        if 任务 is not None:
+            任务.部分结果信号.disconnect(self._并入在市期货合约)
+            任务.完成信号.disconnect(self._应用在市期货合约)
+            任务.错误信号.disconnect(self._处理合约加载失败)
+            任务.结束信号.disconnect(self._合约加载结束)
 
     def closeEvent(self, 事件: QtGui.QCloseEvent):
-        self._停止合约加载线程()
+        self._停止合约加载任务()
         self._保存位置()
         super().closeEvent(事件)
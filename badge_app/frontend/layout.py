@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+"""悬浮牌组件的相对坐标和窗口的安全摆放位置，位置记录保存在 state.配置 中。"""
+from PySide6 import QtCore, QtGui
+
+from ..backend import state
+
+
+def _点_from_config(记录: dict | None, 默认点: QtCore.QPoint) -> QtCore.QPoint:
+    记录 = 记录 or {}
+    return QtCore.QPoint(int(记录.get("x", 默认点.x())), int(记录.get("y", 默认点.y())))
+
+
+def 读取组件位置配置() -> dict[str, QtCore.QPoint]:
+    """读取备注、按钮、价格的相对坐标，落在默认值上。"""
+
+    备注默认 = QtCore.QPoint(6, 2)
+    锁定默认 = QtCore.QPoint(备注默认.x() + 120, 备注默认.y())
+    编辑默认 = QtCore.QPoint(锁定默认.x() + 28, 锁定默认.y())
+    价格默认 = QtCore.QPoint(6, 28)
+
+    旧头部 = state.配置.get("badge_header_pos") or {}
+    if 旧头部:
+        备注默认 = QtCore.QPoint(int(旧头部.get("x", 备注默认.x())), int(旧头部.get("y", 备注默认.y())))
+        锁定默认 = QtCore.QPoint(备注默认.x() + 120, 备注默认.y())
+        编辑默认 = QtCore.QPoint(锁定默认.x() + 28, 锁定默认.y())
+
+    return {
+        "subtitle": _点_from_config(state.配置.get("badge_subtitle_pos"), 备注默认),
+        "lock": _点_from_config(state.配置.get("badge_lock_pos"), 锁定默认),
+        "edit": _点_from_config(state.配置.get("badge_edit_pos"), 编辑默认),
+        "price": _点_from_config(state.配置.get("badge_price_pos"), 价格默认),
+    }
+
+
+def 计算安全坐标(目标点: QtCore.QPoint, 窗口大小: QtCore.QSize) -> QtCore.QPoint:
+    """在多屏、高分辨率环境下，确保窗口位置落在可见区域。"""
+
+    屏幕 = QtGui.QGuiApplication.screenAt(目标点)
+    if 屏幕 is None:
+        屏幕 = QtGui.QGuiApplication.primaryScreen()
+    if 屏幕 is None:
+        return 目标点
+
+    可用 = 屏幕.availableGeometry()
+    最大偏移_x = max(0, 可用.width() - 窗口大小.width())
+    最大偏移_y = max(0, 可用.height() - 窗口大小.height())
+    x = min(max(目标点.x(), 可用.left()), 可用.left() + 最大偏移_x)
+    y = min(max(目标点.y(), 可用.top()), 可用.top() + 最大偏移_y)
+    return QtCore.QPoint(x, y)
@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+"""自绘文本部件：不解析样式表，直接用 QPainter 画缓存好的文字。"""
+import math
+
+from PySide6 import QtWidgets, QtGui, QtCore
+
+
+class 字形缓存:
+    """按字符缓存已渲染好的字形位图，价格只由少量字符组成，缓存很快就会命中。"""
+
+    def __init__(self, 字体: QtGui.QFont, 颜色: QtGui.QColor, 像素比: float):
+        self.字体 = QtGui.QFont(字体)
+        self.颜色 = QtGui.QColor(颜色)
+        self.像素比 = 像素比
+        self._度量 = QtGui.QFontMetricsF(self.字体)
+        self.高度 = math.ceil(self._度量.height())
+        self._字形: dict[str, tuple[QtGui.QPixmap, float]] = {}
+
+    def 匹配(self, 字体: QtGui.QFont, 颜色: QtGui.QColor, 像素比: float) -> bool:
+        return self.字体 == 字体 and self.颜色 == 颜色 and self.像素比 == 像素比
+
+    def 字形(self, 字符: str) -> tuple[QtGui.QPixmap, float]:
+        已有 = self._字形.get(字符)
+        if 已有 is not None:
+            return 已有
+        前进 = self._度量.horizontalAdvance(字符)
+        # 粗体字形可能略微越过前进宽度，位图多留一点余量
+        宽 = math.ceil(self._度量.boundingRect(字符).right() + 2)
+        位图 = QtGui.QPixmap(max(1, math.ceil(max(宽, 前进) * self.像素比)), max(1, math.ceil(self.高度 * self.像素比)))
+        位图.setDevicePixelRatio(self.像素比)
+        位图.fill(QtCore.Qt.transparent)
+        画笔 = QtGui.QPainter(位图)
+        画笔.setRenderHint(QtGui.QPainter.TextAntialiasing, True)
+        画笔.setFont(self.字体)
+        画笔.setPen(self.颜色)
+        画笔.drawText(QtCore.QPointF(0, self._度量.ascent()), 字符)
+        画笔.end()
+        self._字形[字符] = (位图, 前进)
+        return 位图, 前进
+
+    def 文本宽度(self, 文本: str) -> float:
+        return sum(self.字形(字符)[1] for 字符 in 文本)
+
+
+class _自绘文本基类(QtWidgets.QWidget):
+    def __init__(self, 文本: str = "", 父=None):
+        super().__init__(父)
+        self.setAttribute(QtCore.Qt.WA_TranslucentBackground, True)
+        self._文本 = 文本
+        self._颜色 = QtGui.QColor("#FFFFFF")
+
+    def text(self) -> str:
+        return self._文本
+
+    def 设置颜色(self, 颜色: str):
+        新颜色 = QtGui.QColor(颜色)
+        if 新颜色 != self._颜色:
+            self._颜色 = 新颜色
+            self._样式变化()
+
+    def changeEvent(self, 事件: QtCore.QEvent):
+        if 事件.type() == QtCore.QEvent.FontChange:
+            self._样式变化()
+        super().changeEvent(事件)
+
+    def _样式变化(self):
+        self.updateGeometry()
+        self.update()
+
+    def adjustSize(self):
+        self.resize(self.sizeHint())
+
+
+class 静态文本标签(_自绘文本基类):
+    """用 QStaticText 绘制的单行文字，适合很少变化的备注小字。"""
+
+    def __init__(self, 文本: str = "", 父=None):
+        super().__init__(文本, 父)
+        self._静态文本 = QtGui.QStaticText(文本)
+        self._静态文本.setTextFormat(QtCore.Qt.PlainText)
+
+    def setText(self, 文本: str):
+        if 文本 == self._文本:
+            return
+        self._文本 = 文本
+        self._静态文本.setText(文本)
+        self._样式变化()
+
+    def _样式变化(self):
+        self._静态文本.prepare(QtGui.QTransform(), self.font())
+        super()._样式变化()
+
+    def sizeHint(self) -> QtCore.QSize:
+        度量 = QtGui.QFontMetrics(self.font())
+        return QtCore.QSize(度量.horizontalAdvance(self._文本) + 2, 度量.height())
+
+    def paintEvent(self, 事件: QtGui.QPaintEvent):
+        画笔 = QtGui.QPainter(self)
+        画笔.setFont(self.font())
+        画笔.setPen(self._颜色)
+        画笔.drawStaticText(0, 0, self._静态文本)
+
+
+class 字形价格标签(_自绘文本基类):
+    """逐字符贴缓存位图的价格文字，右对齐；改价只重绘本部件所在的矩形。"""
+
+    def __init__(self, 文本: str = "", 父=None):
+        super().__init__(文本, 父)
+        self._缓存 = None
+
+    def setText(self, 文本: str):
+        if 文本 == self._文本:
+            return
+        self._文本 = 文本
+        self.update()
+
+    def setAlignment(self, 对齐):
+        # 价格固定右对齐，保留该接口以便与 QLabel 互换
+        pass
+
+    def _字形缓存(self) -> 字形缓存:
+        像素比 = self.devicePixelRatioF()
+        if self._缓存 is None or not self._缓存.匹配(self.font(), self._颜色, 像素比):
+            self._缓存 = 字形缓存(self.font(), self._颜色, 像素比)
+        return self._缓存
+
+    def sizeHint(self) -> QtCore.QSize:
+        缓存 = self._字形缓存()
+        return QtCore.QSize(math.ceil(缓存.文本宽度(self._文本)) + 2, 缓存.高度)
+
+    def paintEvent(self, 事件: QtGui.QPaintEvent):
+        缓存 = self._字形缓存()
+        x = self.width() - 缓存.文本宽度(self._文本) - 2
+        画笔 = QtGui.QPainter(self)
+        for 字符 in self._文本:
+            位图, 前进 = 缓存.字形(字符)
+            画笔.drawPixmap(QtCore.QPointF(x, 0), 位图)
+            x += 前进
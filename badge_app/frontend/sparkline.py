@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+import math
+
+import numpy as np
+from PySide6 import QtWidgets, QtGui, QtCore
+
+
+class 迷你走势图(QtWidgets.QWidget):
+    """最近若干分钟的逐笔走势，按屏幕像素抽稀后增量绘制。
+
+    每个像素列对应一段时间，只保存该段的最低、最高和最后价格。已经结束的列画在缓存
+    位图里，新列出现时把位图左移并只补画新列；正在累积的最右一列在 paintEvent 里现画。
+    纵轴超出范围时按额外留白一次性扩大并整体重画，数据跨度明显收窄时才收紧，
+    重画次数因此被摊薄。
+    """
+
+    _留白比例 = 0.25
+
+    def __init__(self, 宽: int, 高: int, 分钟: float, 颜色: str, 父=None):
+        super().__init__(父)
+        self.setAttribute(QtCore.Qt.WA_TranslucentBackground, True)
+        self.setFixedSize(宽, 高)
+        self._列数 = 宽
+        self._秒每列 = max(0.001, float(分钟) * 60 / 宽)
+        self._画笔 = QtGui.QPen(QtGui.QColor(颜色), 1)
+        self._最低 = np.full(宽, np.nan)
+        self._最高 = np.full(宽, np.nan)
+        self._末值 = np.full(宽, np.nan)
+        self._当前列号 = None
+        self._上次时间 = 0.0
+        # 上次同步的缓冲及当时的累计笔数，只复制之后新增的部分
+        self._已读缓冲 = None
+        self._已读总数 = 0
+        self._下限 = self._上限 = None
+        self._位图 = None
+        self.重画次数 = 0
+
+    def 清空(self):
+        for 数组 in (self._最低, self._最高, self._末值):
+            数组.fill(np.nan)
+        self._当前列号 = None
+        self._上次时间 = 0.0
+        self._已读缓冲 = None
+        self._已读总数 = 0
+        self._下限 = self._上限 = None
+        self._位图 = None
+        self.update()
+
+    def 同步(self, 缓冲):
+        """从 行情环形缓冲 读出上次同步之后的新笔数并追加。"""
+
+        if 缓冲 is None:
+            return
+        if 缓冲 is not self._已读缓冲:
+            self._已读缓冲, self._已读总数 = 缓冲, 0
+        # 行情线程在同时追加，在锁内复制新增部分，不能直接读视图
+        self._已读总数, 数据 = 缓冲.读取新增(self._已读总数)
+        时间 = 数据["时间"]
+        起点 = int(np.searchsorted(时间, self._上次时间, side="right"))
+        if 起点 < len(时间):
+            self.追加(时间[起点:], 数据["最新价"][起点:])
+
+    def 追加(self, 时间, 价格):
+        需要重画 = self._位图 is None
+        for t, p in zip(np.asarray(时间, dtype=float).tolist(), np.asarray(价格, dtype=float).tolist()):
+            self._上次时间 = max(self._上次时间, t)
+            if math.isnan(p):
+                continue
+            列号 = int(t // self._秒每列)
+            if self._当前列号 is None:
+                self._当前列号 = 列号
+            elif 列号 > self._当前列号:
+                需要重画 |= self._推进(列号 - self._当前列号)
+                self._当前列号 = 列号
+            elif 列号 < self._当前列号:
+                continue
+            if math.isnan(self._最低[-1]) or p < self._最低[-1]:
+                self._最低[-1] = p
+            if math.isnan(self._最高[-1]) or p > self._最高[-1]:
+                self._最高[-1] = p
+            self._末值[-1] = p
+            if self._下限 is None or p < self._下限 or p > self._上限:
+                需要重画 = True
+        if 需要重画:
+            self._重新定标()
+            self._重画位图()
+        self.update()
+
+    def _推进(self, 列数: int) -> bool:
+        """把最右列封存并左移 列数 列，返回是否需要整体重画。"""
+
+        列数 = min(列数, self._列数)
+        for 数组 in (self._最低, self._最高, self._末值):
+            数组[:-列数] = 数组[列数:].copy()
+            数组[-列数:] = np.nan
+        if self._位图 is None:
+            return True
+        self._位图.scroll(-round(列数 * self._位图.devicePixelRatio()), 0, self._位图.rect())
+        画笔 = QtGui.QPainter(self._位图)
+        画笔.setCompositionMode(QtGui.QPainter.CompositionMode_Clear)
+        画笔.fillRect(QtCore.QRectF(self._列数 - 列数 - 1, 0, 列数 + 1, self.height()), QtCore.Qt.transparent)
+        画笔.setCompositionMode(QtGui.QPainter.CompositionMode_SourceOver)
+        画笔.setPen(self._画笔)
+        self._画列(画笔, self._列数 - 列数 - 1)
+        画笔.end()
+        # 旧的极值滚出画面后跨度明显收窄时才收紧纵轴
+        有效 = self._最低[~np.isnan(self._最低)]
+        if len(有效) and self._上限 is not None:
+            跨度 = float(np.nanmax(self._最高) - 有效.min())
+            return 跨度 < (self._上限 - self._下限) * 0.4
+        return False
+
+    def _重新定标(self):
+        有效 = ~np.isnan(self._最低)
+        if not 有效.any():
+            self._下限 = self._上限 = None
+            return
+        低 = float(self._最低[有效].min())
+        高 = float(self._最高[有效].max())
+        留白 = max((高 - 低) * self._留白比例, abs(高) * 1e-4, 1e-9)
+        self._下限, self._上限 = 低 - 留白, 高 + 留白
+
+    def _y(self, 价格: float) -> float:
+        return (self._上限 - 价格) / (self._上限 - self._下限) * (self.height() - 1)
+
+    def _画列(self, 画笔: QtGui.QPainter, 列: int):
+        if 列 < 0 or self._下限 is None or math.isnan(self._末值[列]):
+            return
+        if 列 > 0 and not math.isnan(self._末值[列 - 1]):
+            画笔.drawLine(QtCore.QPointF(列 - 1, self._y(self._末值[列 - 1])), QtCore.QPointF(列, self._y(self._末值[列])))
+        画笔.drawLine(QtCore.QPointF(列, self._y(self._最高[列])), QtCore.QPointF(列, self._y(self._最低[列])))
+
+    def _重画位图(self):
+        self.重画次数 += 1
+        像素比 = self.devicePixelRatioF()
+        self._位图 = QtGui.QPixmap(math.ceil(self.width() * 像素比), math.ceil(self.height() * 像素比))
+        self._位图.setDevicePixelRatio(像素比)
+        self._位图.fill(QtCore.Qt.transparent)
+        画笔 = QtGui.QPainter(self._位图)
+        画笔.setPen(self._画笔)
+        for 列 in range(self._列数 - 1):
+            self._画列(画笔, 列)
+        画笔.end()
+
+    def paintEvent(self, 事件: QtGui.QPaintEvent):
+        if self._位图 is None:
+            return
+        画笔 = QtGui.QPainter(self)
+        画笔.drawPixmap(0, 0, self._位图)
+        画笔.setPen(self._画笔)
+        self._画列(画笔, self._列数 - 1)
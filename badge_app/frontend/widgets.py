@@ -2,6 +2,19 @@
 from PySide6 import QtWidgets, QtGui, QtCore
 
 from ..backend import state
+from ..backend.latency import 全局启动计时, 全局延迟统计
+from ..backend.metrics import 全局指标
+from .layout import 计算安全坐标, 读取组件位置配置
+from .painted import 字形价格标签, 静态文本标签
+from .sparkline import 迷你走势图
+
+_重绘次数 = 全局指标.计数器("tq_badge_repaints_total", "悬浮牌窗口重绘次数")
+
+
+def _价格形状(文本: str) -> tuple[int, int]:
+    """(字符数, 小数点位置)，用于判断价格位数或小数位是否变化。"""
+
+    return len(文本), 文本.find(".")
 
 
 class 悬浮牌窗口(QtWidgets.QWidget):
@@ -11,9 +24,16 @@ class 悬浮牌窗口(QtWidgets.QWidget):
         super().__init__(父)
         self.当前价格文本 = "…"
         self.已锁定 = state.默认锁定
+        self._组件位置 = 读取组件位置配置()
+        self._固定宽度数字 = bool(state.配置["badge_fixed_digits"])
+        self._价格形状 = _价格形状(self.当前价格文本)
+        # "painter" 用自绘部件显示备注和价格，"widgets" 用带样式表的 QLabel
+        self._自绘模式 = state.配置["badge_renderer"] == "painter"
         self._拖动中 = False
         self._拖动起点 = QtCore.QPoint()
         self._窗口起点 = QtCore.QPoint()
+        self._待统计时刻 = None
+        self.价格已过期 = False
 
         self._初始化窗口标志()
         self._初始化界面()
@@ -32,10 +52,11 @@ class 悬浮牌窗口(QtWidgets.QWidget):
     def _初始化界面(self):
         self.setAttribute(QtCore.Qt.WA_StyledBackground, True)
 
-        self.小字标签 = QtWidgets.QLabel(state.生效小字(), self)
-        self.小字标签.setStyleSheet(
-            f"color: {state.配置['subtitle_font_color']}; background: transparent;"
-        )
+        if self._自绘模式:
+            self.小字标签 = 静态文本标签(state.生效小字(), self)
+        else:
+            self.小字标签 = QtWidgets.QLabel(state.生效小字(), self)
+        self._设置文字颜色(self.小字标签, state.配置["subtitle_font_color"])
         小字字体 = QtGui.QFont(state.默认字体族, state.配置["subtitle_font_size"])
         小字字体.setBold(True)
         self.小字标签.setFont(小字字体)
@@ -60,18 +81,42 @@ class 悬浮牌窗口(QtWidgets.QWidget):
         self.编辑按钮.setGraphicsEffect(self._编辑按钮透明效果)
         self.编辑按钮.installEventFilter(self)
 
-        self.价格标签 = QtWidgets.QLabel(self)
-        self.价格标签.setText(self.当前价格文本)
-        self.价格标签.setAlignment(QtCore.Qt.AlignRight | QtCore.Qt.AlignVCenter)
-        self.价格标签.setStyleSheet(
-            f"color: {state.配置['badge_font_color']}; background: transparent;"
-        )
+        if self._自绘模式:
+            self.价格标签 = 字形价格标签(self.当前价格文本, self)
+        else:
+            self.价格标签 = QtWidgets.QLabel(self)
+            self.价格标签.setText(self.当前价格文本)
+            self.价格标签.setAlignment(QtCore.Qt.AlignRight | QtCore.Qt.AlignVCenter)
+        self._设置文字颜色(self.价格标签, state.配置["badge_font_color"])
         价格字体 = QtGui.QFont(state.默认字体族, state.配置["badge_font_size"])
         价格字体.setBold(True)
+        if self._固定宽度数字:
+            # 等宽数字 + 价格区只增不减，多数跳价不再引起几何变化
+            价格字体.setFeature(QtGui.QFont.Tag("tnum"), 1)
         self.价格标签.setFont(价格字体)
+        self._过期透明效果 = QtWidgets.QGraphicsOpacityEffect()
+        self._过期透明效果.setOpacity(0.45)
+        self._过期透明效果.setEnabled(False)
+        self.价格标签.setGraphicsEffect(self._过期透明效果)
+
+        self.走势图 = None
+        if state.配置["sparkline_enabled"]:
+            self.走势图 = 迷你走势图(
+                state.配置["sparkline_width"],
+                state.配置["sparkline_height"],
+                state.配置["sparkline_minutes"],
+                state.配置["badge_font_color"],
+                self,
+            )
 
         self._应用组件位置()
 
+    def _设置文字颜色(self, 标签: QtWidgets.QWidget, 颜色: str):
+        if self._自绘模式:
+            标签.设置颜色(颜色)
+        else:
+            标签.setStyleSheet(f"color: {颜色}; background: transparent;")
+
     def _按钮样式(self) -> str:
         return """
             QToolButton {
@@ -86,7 +131,7 @@ class 悬浮牌窗口(QtWidgets.QWidget):
         """
 
     def _读取组件位置(self) -> dict[str, QtCore.QPoint]:
-        return state.读取组件位置配置()
+        return dict(self._组件位置)
 
     def _保存组件位置(self, 位置: dict[str, QtCore.QPoint]):
         state.配置["badge_subtitle_pos"] = {"x": int(位置["subtitle"].x()), "y": int(位置["subtitle"].y())}
@@ -96,9 +141,9 @@ class 悬浮牌窗口(QtWidgets.QWidget):
         state.保存配置()
 
     def _应用组件位置(self, 覆盖: dict[str, QtCore.QPoint] | None = None):
-        位置 = self._读取组件位置()
         if 覆盖:
-            位置.update(覆盖)
+            self._组件位置.update(覆盖)
+        位置 = self._组件位置
 
         self.小字标签.adjustSize()
         self.锁按钮.adjustSize()
@@ -109,20 +154,18 @@ class 悬浮牌窗口(QtWidgets.QWidget):
         self.锁按钮.move(位置["lock"])
         self.编辑按钮.move(位置["edit"])
         self.价格标签.move(位置["price"])
-
-        宽度 = max(
-            self.小字标签.x() + self.小字标签.width(),
-            self.锁按钮.x() + self.锁按钮.width(),
-            self.编辑按钮.x() + self.编辑按钮.width(),
-            self.价格标签.x() + self.价格标签.width(),
-        ) + 6
-        高度 = max(
-            self.小字标签.y() + self.小字标签.height(),
-            self.锁按钮.y() + self.锁按钮.height(),
-            self.编辑按钮.y() + self.编辑按钮.height(),
-            self.价格标签.y() + self.价格标签.height(),
-        ) + 6
-        self.setFixedSize(宽度, 高度)
+        if self.走势图 is not None:
+            self.走势图.move(self.价格标签.x(), self.价格标签.y() + self.价格标签.height())
+        self._更新窗口尺寸()
+
+    def _更新窗口尺寸(self):
+        部件列表 = [self.小字标签, self.锁按钮, self.编辑按钮, self.价格标签]
+        if self.走势图 is not None:
+            部件列表.append(self.走势图)
+        宽度 = max(部件.x() + 部件.width() for 部件 in 部件列表) + 6
+        高度 = max(部件.y() + 部件.height() for 部件 in 部件列表) + 6
+        if 宽度 != self.width() or 高度 != self.height():
+            self.setFixedSize(宽度, 高度)
 
     def eventFilter(self, obj, event):
         if obj in (self.锁按钮, self.编辑按钮):
@@ -153,15 +196,68 @@ class 悬浮牌窗口(QtWidgets.QWidget):
         记录 = state.配置.get("badge_pos") or {}
         if "x" in 记录 and "y" in 记录:
             目标 = QtCore.QPoint(int(记录["x"]), int(记录["y"]))
-            安全点 = state.计算安全坐标(目标, self.size())
+            安全点 = 计算安全坐标(目标, self.size())
             self.move(安全点)
         else:
             self._放到底部右侧()
 
-    def 更新价格文本(self, 文本: str):
+    def 更新价格文本(self, 文本: str, 时刻: tuple[float, float, float] | None = None):
+        """时刻为该价格的 (唤醒, 投递, 领取) 时刻，真正画出后计入延迟统计。"""
+
+        if 文本 == self.当前价格文本:
+            return
         self.当前价格文本 = 文本
+        self._待统计时刻 = 时刻
         self.价格标签.setText(文本)
-        self._应用组件位置()
+        # 只量价格标签，尺寸没变就不动窗口几何
+        尺寸 = self.价格标签.sizeHint()
+        形状 = _价格形状(文本)
+        if self._固定宽度数字 and 形状 == self._价格形状:
+            # 位数和小数位不变时只增不减；位数变了（或 … 换成价格）按新文本重新量
+            尺寸 = 尺寸.expandedTo(self.价格标签.size())
+        self._价格形状 = 形状
+        self._设置价格尺寸(尺寸)
+
+    def 重置价格宽度(self):
+        """切换合约后按当前文本重新量宽，不沿用上一个合约撑大的价格区。"""
+
+        self._设置价格尺寸(self.价格标签.sizeHint())
+
+    def _设置价格尺寸(self, 尺寸: QtCore.QSize):
+        if 尺寸 != self.价格标签.size():
+            self.价格标签.resize(尺寸)
+            self._更新窗口尺寸()
+
+    def 设置过期(self, 过期: bool, 时刻: tuple[float, float, float] | None = None):
+        """过期价格（例如启动时恢复的快照）半透明显示，直到实时行情确认。
+
+        确认时价格可能与快照相同、文本不变，这次重绘同样按 时刻 计入延迟统计。
+        """
+
+        if 过期 == self.价格已过期:
+            return
+        self.价格已过期 = 过期
+        self._过期透明效果.setEnabled(过期)
+        if not 过期 and 时刻 is not None:
+            self._待统计时刻 = 时刻
+
+    def paintEvent(self, 事件: QtGui.QPaintEvent):
+        super().paintEvent(事件)
+        _重绘次数.增加()
+        全局启动计时.标记("首次绘制")
+        if self._待统计时刻 is not None:
+            # 只有实时价格带时刻
+            全局启动计时.标记("首个实时价格")
+            全局延迟统计.记录绘制(self._待统计时刻)
+            self._待统计时刻 = None
+
+    def 同步走势(self, 缓冲):
+        if self.走势图 is not None:
+            self.走势图.同步(缓冲)
+
+    def 清空走势(self):
+        if self.走势图 is not None:
+            self.走势图.清空()
 
     def 切换锁定(self):
         self.已锁定 = not self.已锁定
@@ -173,13 +269,13 @@ class 悬浮牌窗口(QtWidgets.QWidget):
             字体.setPointSize(字号)
             self.价格标签.setFont(字体)
         if 颜色 is not None:
-            self.价格标签.setStyleSheet(f"color: {颜色}; background: transparent;")
+            self._设置文字颜色(self.价格标签, 颜色)
         if 小字字号 is not None:
             字体 = self.小字标签.font()
             字体.setPointSize(小字字号)
             self.小字标签.setFont(字体)
         if 小字颜色 is not None:
-            self.小字标签.setStyleSheet(f"color: {小字颜色}; background: transparent;")
+            self._设置文字颜色(self.小字标签, 小字颜色)
         if 小字 is not None:
             self.小字标签.setText(小字)
         self._应用组件位置()
@@ -210,7 +306,7 @@ class 悬浮牌窗口(QtWidgets.QWidget):
         super().mouseDoubleClickEvent(事件)
 
     def _移动到安全位置(self, 目标点: QtCore.QPoint):
-        self.move(state.计算安全坐标(目标点, self.size()))
+        self.move(计算安全坐标(目标点, self.size()))
 
     def _保存位置(self):
         state.配置["badge_pos"] = {"x": int(self.x()), "y": int(self.y())}
@@ -261,7 +357,7 @@ class 悬浮牌预览(QtWidgets.QFrame):
         for 部件 in (self.锁按钮, self.编辑按钮, self.小字标签, self.价格标签):
             部件.installEventFilter(self)
 
-        self._应用位置(state.读取组件位置配置())
+        self._应用位置(读取组件位置配置())
 
     def _边界内(self, 位置: QtCore.QPoint, 部件: QtWidgets.QWidget) -> QtCore.QPoint:
         x = max(0, min(位置.x(), self.width() - 部件.width()))
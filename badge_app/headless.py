@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+"""无界面模式：把规范化、去重后的价格流以 JSON Lines 或 CSV 写到标准输出。
+
+    python tq_price_badge.py --headless KQ.m@SHFE.cu SHFE.rb2501 --format csv
+
+不导入 PySide6：行情循环 在普通线程里运行，价格就绪时由该线程取出待发价格写入
+缓冲，主线程每 flush 间隔秒把缓冲一次写出并 flush。每行一个价格变化：
+
+    {"ts":1712345678.123,"symbol":"SHFE.rb2501","price":3521}
+    ts,symbol,price
+
+ts 为行情线程被这笔行情唤醒的 Unix 时间；暂无最新价时 price 为 null（CSV 为空）。
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+
+from .backend import state
+from .backend.async_market import 异步行情循环
+from .backend.capture import 回放行情源
+from .backend.market import 批量规范化合约代码, 行情循环
+
+
+class 价格输出:
+    """缓冲价格行，按需批量写出。写入() 和 写出() 可在不同线程调用。"""
+
+    def __init__(self, 流, 格式: str = "jsonl"):
+        self.流 = 流
+        self.格式 = 格式
+        self.已断开 = False
+        self._锁 = threading.Lock()
+        self._缓冲: list[str] = ["ts,symbol,price\n"] if 格式 == "csv" else []
+
+    def 写入(self, 时间: float, 合约: str, 文本: str):
+        价格 = None if 文本 == "—" else 文本
+        if self.格式 == "csv":
+            行 = f"{时间:.3f},{合约},{价格 or ''}\n"
+        else:
+            # 价格文本已按小数位格式化，原样作为 JSON 数字写出，不再经过 float
+            行 = f'{{"ts":{时间:.3f},"symbol":{json.dumps(合约, ensure_ascii=False)},"price":{价格 or "null"}}}\n'
+        with self._锁:
+            self._缓冲.append(行)
+
+    def 写出(self):
+        with self._锁:
+            if not self._缓冲 or self.已断开:
+                return
+            文本 = "".join(self._缓冲)
+            self._缓冲.clear()
+            try:
+                self.流.write(文本)
+                self.流.flush()
+            except BrokenPipeError:
+                # 下游（例如 head）已退出；把标准输出指向 devnull，免得解释器退出时再报错
+                self.已断开 = True
+                os.dup2(os.open(os.devnull, os.O_WRONLY), self.流.fileno())
+
+
+def 解析命令行(参数列表: list[str]) -> argparse.Namespace:
+    解析器 = argparse.ArgumentParser(
+        prog="tq_price_badge.py", description="无界面模式：把价格流写到标准输出，不启动 Qt"
+    )
+    # nargs="*"，让 --headless --help 也能显示帮助
+    解析器.add_argument("--headless", nargs="*", metavar="合约", required=True, help="要输出的合约，可写多个")
+    解析器.add_argument("--format", choices=("jsonl", "csv"), default="jsonl", help="输出格式，默认 jsonl")
+    解析器.add_argument(
+        "--flush-interval", type=float, default=None, metavar="秒",
+        help="缓冲多久写出一次，0 表示每个价格都立即写出；默认取配置 headless_flush_interval",
+    )
+    解析器.add_argument("--replay", metavar="文件", help="回放 capture_path 录制的行情文件，回放完毕后退出")
+    解析器.add_argument("--speed", type=float, default=1.0, help="回放倍速，0 表示不等待、尽快回放")
+    参数 = 解析器.parse_args(参数列表)
+    if not 批量规范化合约代码(参数.headless):
+        解析器.error("--headless 后至少需要一个合约")
+    return 参数
+
+
+def main(参数列表: list[str] | None = None) -> int:
+    参数 = 解析命令行(sys.argv[1:] if 参数列表 is None else 参数列表)
+    state.读取配置()
+    合约列表 = 批量规范化合约代码(参数.headless)
+    刷新间隔 = 参数.flush_interval if 参数.flush_interval is not None else state.配置["headless_flush_interval"]
+    刷新间隔 = max(0.0, float(刷新间隔))
+    输出 = 价格输出(sys.stdout, 参数.format)
+    会话错误 = []
+
+    def 价格就绪():
+        墙钟, 现在 = time.time(), time.perf_counter()
+        for 合约, (文本, (唤醒时刻, _投递时刻)) in 循环.取出待发价格().items():
+            输出.写入(墙钟 - (现在 - 唤醒时刻), 合约, 文本)
+        if 刷新间隔 == 0:
+            输出.写出()
+
+    def 报告错误(合约: str, 信息: str):
+        if not 合约:
+            会话错误.append(信息)
+        print(f"{合约 or '行情会话'} 出错: {信息}", file=sys.stderr, flush=True)
+
+    回放源 = None
+    行情源工厂 = None
+    if 参数.replay:
+        回放源 = 回放行情源(参数.replay, 参数.speed)
+        行情源工厂 = lambda: 回放源
+
+    循环类 = 异步行情循环 if state.配置["market_engine"] == "asyncio" else 行情循环
+    循环 = 循环类(state.TQ_USER, state.TQ_PASS, 行情源工厂=行情源工厂, 价格就绪=价格就绪, 错误=报告错误)
+    for 合约 in 合约列表:
+        循环.订阅(合约)
+    线程 = threading.Thread(target=循环.运行, name="market", daemon=True)
+    线程.start()
+    已请求停止 = False
+    try:
+        while 线程.is_alive() and not 输出.已断开:
+            线程.join(刷新间隔 or state.配置["quote_poll_interval"])
+            输出.写出()
+            if 回放源 is not None and 回放源.已结束:
+                # 最后一批行情在本轮推送完才会检查停止标志
+                已请求停止 = True
+                循环.停止()
+    except KeyboardInterrupt:
+        已请求停止 = True
+    finally:
+        循环.停止()
+        线程.join(5)
+        输出.写出()
+    # 录制文件打不开等不影响行情的错误同样不带合约，只有会话因错误自行退出才算失败
+    return 1 if 会话错误 and not (已请求停止 or 输出.已断开) else 0
@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+"""价格提醒判定耗时：价格提醒引擎（numpy 向量化）vs 逐条规则的 Python 循环。
+
+不需要网络和 Qt::
+
+    python benchmarks/bench_alerts.py --rules 1000 --symbols 50 --batch 10
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from badge_app.backend.alerts import 价格提醒引擎, 规则类型
+
+
+def 生成规则(规则数: int, 合约数: int, 随机: random.Random) -> dict:
+    配置 = {}
+    for i in range(规则数):
+        合约 = f"SHFE.cu{2501 + i % 合约数}"
+        类型 = 规则类型[i % len(规则类型)]
+        if 类型 == "move_pct":
+            规则 = {"type": 类型, "pct": 随机.uniform(0.1, 2.0), "ref": 70000, "rearm": 0.05}
+        else:
+            规则 = {"type": 类型, "price": 随机.uniform(69000, 71000), "rearm": 10}
+        配置.setdefault(合约, []).append(规则)
+    return 配置
+
+
+class 逐条规则引擎:
+    """与 价格提醒引擎 同语义的朴素实现，仅作对照。"""
+
+    def __init__(self, 规则配置: dict):
+        self.规则 = [
+            {"合约": 合约, **规则, "armed": True, "ref": 规则.get("ref")}
+            for 合约, 列表 in 规则配置.items() for 规则 in 列表
+        ]
+        self.现价 = {}
+
+    def 评估(self, 价格表: dict[str, float]) -> list:
+        前价 = dict(self.现价)
+        self.现价.update(价格表)
+        触发 = []
+        for 规则 in self.规则:
+            价 = 价格表.get(规则["合约"])
+            if 价 is None:
+                continue
+            类型, 回差 = 规则["type"], 规则["rearm"]
+            if 类型 == "move_pct":
+                if 规则["ref"] is None:
+                    规则["ref"] = 价
+                偏离 = abs(价 / 规则["ref"] - 1) * 100
+                条件, 复位 = 偏离 >= 规则["pct"], 偏离 < 规则["pct"] - 回差
+            else:
+                阈值 = 规则["price"]
+                if 类型 == "above":
+                    条件, 复位 = 价 >= 阈值, 价 < 阈值 - 回差
+                elif 类型 == "below":
+                    条件, 复位 = 价 <= 阈值, 价 > 阈值 + 回差
+                else:
+                    前 = 前价.get(规则["合约"])
+                    条件 = 前 is not None and (价 >= 阈值) != (前 >= 阈值)
+                    复位 = abs(价 - 阈值) >= 回差
+            if 条件 and 规则["armed"]:
+                规则["armed"] = False
+                触发.append(规则)
+            elif 复位:
+                规则["armed"] = True
+        return 触发
+
+
+def 生成批次(合约数: int, 批大小: int, 批数: int, 随机: random.Random) -> list[dict[str, float]]:
+    价格 = {f"SHFE.cu{2501 + i}": 70000.0 for i in range(合约数)}
+    批次 = []
+    for _ in range(批数):
+        本批 = {}
+        for 合约 in 随机.sample(list(价格), min(批大小, 合约数)):
+            价格[合约] += 随机.choice((-10, 0, 10))
+            本批[合约] = 价格[合约]
+        批次.append(本批)
+    return 批次
+
+
+def 计时(引擎, 批次: list[dict[str, float]]) -> tuple[list[float], int]:
+    耗时, 触发数 = [], 0
+    for 本批 in 批次:
+        起点 = time.perf_counter()
+        触发数 += len(引擎.评估(本批))
+        耗时.append(time.perf_counter() - 起点)
+    return 耗时, 触发数
+
+
+def main():
+    解析器 = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    解析器.add_argument("--rules", type=int, default=1000)
+    解析器.add_argument("--symbols", type=int, default=50)
+    解析器.add_argument("--batch", type=int, default=10, help="每批有价格变化的合约数")
+    解析器.add_argument("--batches", type=int, default=5000)
+    参数 = 解析器.parse_args()
+
+    规则配置 = 生成规则(参数.rules, 参数.symbols, random.Random(3))
+    批次 = 生成批次(参数.symbols, 参数.batch, 参数.batches, random.Random(5))
+
+    起点 = time.perf_counter()
+    引擎 = 价格提醒引擎(规则配置)
+    print(f"build: rules={len(引擎)} symbols={len(引擎.合约列表)} {(time.perf_counter() - 起点) * 1000:.2f} ms")
+
+    for 名称, 实现 in (("vectorized", 引擎), ("python_loop", 逐条规则引擎(规则配置))):
+        耗时, 触发数 = 计时(实现, 批次)
+        耗时.sort()
+        print(
+            f"{名称:<12} p50={statistics.median(耗时) * 1e6:.1f} us "
+            f"p99={耗时[int(len(耗时) * 0.99)] * 1e6:.1f} us fired={触发数}"
+        )
+
+
+if __name__ == "__main__":
+    main()
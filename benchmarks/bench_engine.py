@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+"""对比两种行情引擎（market_engine = thread / asyncio）的空闲 CPU、停止延迟和切换延迟。
+
+使用模拟行情源，不需要网络和账号::
+
+    python benchmarks/bench_engine.py --output engine.json
+
+ - idle：订阅若干合约但行情静止时，进程 CPU 占用和每秒唤醒次数
+ - stop：行情中心.关闭() 到行情线程退出的耗时
+ - switch：切换合约到收到新合约首个价格的耗时（新合约会立即出价）
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PySide6 import QtCore, QtWidgets
+
+from badge_app.backend import state
+from badge_app.backend.feed import 模拟行情源
+from badge_app.backend.hub import 行情中心
+from badge_app.backend.metrics import 全局指标
+
+引擎列表 = ("thread", "asyncio")
+
+
+def _运行事件循环(秒: float):
+    循环 = QtCore.QEventLoop()
+    QtCore.QTimer.singleShot(int(秒 * 1000), 循环.quit)
+    循环.exec()
+
+
+def _等待首价(订阅, 超时秒: float = 5.0) -> bool:
+    if 订阅.最新文本 is not None:
+        return True
+    循环 = QtCore.QEventLoop()
+    订阅.价格信号.connect(循环.quit)
+    QtCore.QTimer.singleShot(int(超时秒 * 1000), 循环.quit)
+    循环.exec()
+    订阅.价格信号.disconnect(循环.quit)
+    return 订阅.最新文本 is not None
+
+
+def _毫秒分位(样本: list[float]) -> dict:
+    有序 = sorted(样本)
+    return {
+        "count": len(有序),
+        "p50_ms": round(statistics.median(有序) * 1000, 3),
+        "max_ms": round(有序[-1] * 1000, 3),
+    }
+
+
+def 测量空闲(引擎: str, 参数) -> dict:
+    # 每个合约先出一笔价，之后上千秒才有下一笔，相当于收盘后的静止行情
+    中心 = 行情中心("", "", 行情源工厂=lambda: 模拟行情源(每合约每秒笔数=0.001), 引擎=引擎)
+    订阅列表 = [中心.订阅(f"SHFE.cu{2501 + i}") for i in range(参数.symbols)]
+    for 订阅 in 订阅列表:
+        _等待首价(订阅)
+    _运行事件循环(0.3)
+    唤醒计数 = 全局指标.计数器("tq_badge_wait_update_total", "")
+    唤醒前 = 唤醒计数.值
+    CPU前, 墙钟前 = time.process_time(), time.perf_counter()
+    _运行事件循环(参数.idle_seconds)
+    CPU秒, 墙钟秒 = time.process_time() - CPU前, time.perf_counter() - 墙钟前
+    唤醒数 = 唤醒计数.值 - 唤醒前
+    中心.关闭()
+    return {
+        "symbols": 参数.symbols,
+        "seconds": round(墙钟秒, 2),
+        "cpu_percent": round(CPU秒 / 墙钟秒 * 100, 3),
+        "wakeups_per_s": round(唤醒数 / 墙钟秒, 2),
+    }
+
+
+def 测量停止(引擎: str, 参数) -> dict:
+    样本 = []
+    for _ in range(参数.rounds):
+        中心 = 行情中心("", "", 行情源工厂=lambda: 模拟行情源(每合约每秒笔数=0.001), 引擎=引擎)
+        _等待首价(中心.订阅("SHFE.cu2501"))
+        # 随机落在轮询周期的不同位置
+        _运行事件循环(0.05 + (len(样本) % 7) * 0.03)
+        起点 = time.perf_counter()
+        中心.关闭(等待毫秒=5000)
+        样本.append(time.perf_counter() - 起点)
+    return _毫秒分位(样本)
+
+
+def 测量切换(引擎: str, 参数) -> dict:
+    中心 = 行情中心("", "", 行情源工厂=lambda: 模拟行情源(每合约每秒笔数=0.001), 引擎=引擎)
+    订阅 = 中心.订阅("SHFE.cu2501")
+    _等待首价(订阅)
+    样本, 超时数 = [], 0
+    for 序号 in range(参数.rounds):
+        _运行事件循环(0.05 + (序号 % 7) * 0.03)
+        起点 = time.perf_counter()
+        订阅 = 中心.切换订阅(订阅.合约, f"DCE.m{2601 + 序号}")
+        if _等待首价(订阅):
+            样本.append(time.perf_counter() - 起点)
+        else:
+            超时数 += 1
+    中心.关闭()
+    return {**_毫秒分位(样本), "timeouts": 超时数}
+
+
+def main():
+    解析器 = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    解析器.add_argument("--output", help="结果 JSON 写入该文件，默认只打印到标准输出")
+    解析器.add_argument("--symbols", type=int, default=20, help="idle 订阅的合约数")
+    解析器.add_argument("--idle-seconds", type=float, default=5.0)
+    解析器.add_argument("--rounds", type=int, default=20, help="stop / switch 的测量次数")
+    参数 = 解析器.parse_args()
+
+    应用 = QtWidgets.QApplication(sys.argv[:1])
+    state.配置路径 = os.path.join(tempfile.mkdtemp(prefix="tq_badge_bench_"), "config.json")
+    结果 = {"poll_interval_s": state.配置["quote_poll_interval"], "results": {}}
+    for 引擎 in 引擎列表:
+        结果["results"][引擎] = {
+            "idle": 测量空闲(引擎, 参数),
+            "stop": 测量停止(引擎, 参数),
+            "switch": 测量切换(引擎, 参数),
+        }
+        print(f"{引擎}: {结果['results'][引擎]}", file=sys.stderr)
+    del 应用
+
+    文本 = json.dumps(结果, ensure_ascii=False, indent=2)
+    if 参数.output:
+        with open(参数.output, "w", encoding="utf-8") as f:
+            f.write(文本 + "\n")
+    print(文本)
+
+
+if __name__ == "__main__":
+    main()
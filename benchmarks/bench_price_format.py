@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+"""对比行情线程两种价格去重与格式化方式的单笔耗时，并核对输出是否一致。
+
+不需要网络和账号::
+
+    python benchmarks/bench_price_format.py --ticks 200000
+
+ - string：每笔都调用 格式化价格，再与上次文本比较（改为定点前的做法）
+ - fixed_point：换算成定点整数后与上次比较，价格变了才用 定点格式器 格式化
+
+各品种按真实最小变动随机游走，价格由十进制文本解析成 float，与 TqSdk 收到的一样。
+mismatches 统计 fixed_point 与 格式化价格（已知小数位）输出不同的笔数，应为 0。
+"""
+import argparse
+import decimal
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from badge_app.backend.market import 定点格式器, 格式化价格, 由最小变动推算小数位
+
+# 品种: (最小变动, 起始价)
+品种表 = {
+    "SHFE.cu": ("10", 71230),
+    "SHFE.au": ("0.02", 561.3),
+    "INE.sc": ("0.1", 532.4),
+    "DCE.i": ("0.5", 812.5),
+    "CZCE.SR": ("1", 5423),
+    "CFFEX.IF": ("0.2", 3901.2),
+    "CFFEX.T": ("0.005", 108.365),
+}
+
+
+def _生成价格(最小变动: str, 起始价: float, 笔数: int, 种子: int) -> list[float]:
+    随机 = random.Random(种子)
+    步长 = decimal.Decimal(最小变动)
+    刻度 = int(decimal.Decimal(str(起始价)) / 步长)
+    价格 = []
+    for _ in range(笔数):
+        # 一半的笔数价格不变，只有成交量等字段更新
+        刻度 += 随机.choice((-1, 0, 0, 1))
+        价格.append(float(刻度 * 步长))
+    return 价格
+
+
+def _字符串方式(价格列表: list[float], 小数位: int) -> int:
+    上次 = None
+    推送 = 0
+    for 价格 in 价格列表:
+        文本 = 格式化价格(价格, 小数位)
+        if 文本 != 上次:
+            上次 = 文本
+            推送 += 1
+    return 推送
+
+
+def _定点方式(价格列表: list[float], 小数位: int) -> int:
+    倍数, 格式器 = 10 ** 小数位, 定点格式器(小数位)
+    上次 = None
+    推送 = 0
+    for 价格 in 价格列表:
+        值 = round(价格 * 倍数)
+        if 值 != 上次:
+            上次 = 值
+            格式器(值)
+            推送 += 1
+    return 推送
+
+
+def _计时(函数, 价格列表: list[float], 小数位: int, 重复: int) -> tuple[float, int]:
+    最短 = float("inf")
+    for _ in range(重复):
+        起点 = time.perf_counter()
+        推送 = 函数(价格列表, 小数位)
+        最短 = min(最短, time.perf_counter() - 起点)
+    return 最短, 推送
+
+
+def main():
+    解析器 = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    解析器.add_argument("--ticks", type=int, default=200000, help="每个品种的笔数")
+    解析器.add_argument("--repeat", type=int, default=5)
+    解析器.add_argument("--output", help="结果 JSON 写入该文件，默认只打印到标准输出")
+    参数 = 解析器.parse_args()
+
+    结果 = {}
+    for 序号, (品种, (最小变动, 起始价)) in enumerate(品种表.items()):
+        价格列表 = _生成价格(最小变动, 起始价, 参数.ticks, 序号)
+        小数位 = 由最小变动推算小数位(float(最小变动))
+        字符串秒, 字符串推送 = _计时(_字符串方式, 价格列表, 小数位, 参数.repeat)
+        定点秒, 定点推送 = _计时(_定点方式, 价格列表, 小数位, 参数.repeat)
+        倍数, 格式器 = 10 ** 小数位, 定点格式器(小数位)
+        不一致 = sum(格式器(round(价格 * 倍数)) != 格式化价格(价格, 小数位) for 价格 in 价格列表)
+        结果[品种] = {
+            "price_tick": 最小变动,
+            "decs": 小数位,
+            "string_ns_per_tick": round(字符串秒 / 参数.ticks * 1e9, 1),
+            "fixed_point_ns_per_tick": round(定点秒 / 参数.ticks * 1e9, 1),
+            "speedup": round(字符串秒 / 定点秒, 2),
+            "posts_equal": 字符串推送 == 定点推送,
+            "mismatches": 不一致,
+        }
+        print(f"{品种}: {结果[品种]}", file=sys.stderr)
+
+    文本 = json.dumps({"ticks": 参数.ticks, "results": 结果}, ensure_ascii=False, indent=2)
+    if 参数.output:
+        with open(参数.output, "w", encoding="utf-8") as f:
+            f.write(文本 + "\n")
+    print(文本)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+"""逐键输入的合约搜索延迟：合约搜索索引 vs 旧的 MatchContains 线性扫描，以及批量规范化耗时。
+
+不需要网络和 Qt::
+
+    python benchmarks/bench_search.py --symbols 10000
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from badge_app.backend.market import 批量规范化合约代码
+from badge_app.backend.search import 合约搜索索引
+
+交易所品种 = {
+    "SHFE": ["cu", "al", "zn", "pb", "ni", "sn", "au", "ag", "rb", "wr", "hc", "ss", "fu", "bu", "ru", "sp"],
+    "DCE": ["a", "b", "m", "y", "p", "c", "cs", "jd", "l", "v", "pp", "j", "jm", "i", "eg", "eb", "pg", "lh"],
+    "CZCE": ["SR", "CF", "TA", "MA", "FG", "RM", "OI", "ZC", "SF", "SM", "AP", "CJ", "UR", "SA", "PF", "PK"],
+    "CFFEX": ["IF", "IC", "IH", "IM", "T", "TF", "TS", "TL"],
+    "INE": ["sc", "lu", "nr", "bc", "ec"],
+    "GFEX": ["si", "lc", "ps"],
+}
+
+输入序列 = ["r", "rb", "rb2", "rb25", "rb250", "rb2501", "S", "SH", "SHF", "SHFE", "SHFE.", "SHFE.c", "SHFE.cu",
+           "KQ", "KQ.m", "KQ.m@", "KQ.m@D", "KQ.m@DCE.", "2501", "cu25", "x"]
+
+
+def 生成合约(数量: int, 种子: int = 7) -> list[tuple[str, float]]:
+    随机 = random.Random(种子)
+    全部 = []
+    for 交易所, 品种列表 in 交易所品种.items():
+        for 品种 in 品种列表:
+            全部.append(f"KQ.m@{交易所}.{品种}")
+    年月 = 2401
+    while len(全部) < 数量:
+        for 交易所, 品种列表 in 交易所品种.items():
+            for 品种 in 品种列表:
+                全部.append(f"{交易所}.{品种}{年月}")
+        年月 = 年月 + 1 if 年月 % 100 < 12 else 年月 + 89
+    return [(代码, 随机.uniform(0, 1e6)) for 代码 in 全部[:数量]]
+
+
+def 线性扫描(代码列表: list[str], 查询: str) -> list[str]:
+    查询 = 查询.lower()
+    return [代码 for 代码 in 代码列表 if 查询 in 代码.lower()]
+
+
+def 计时(函数, 重复: int) -> list[float]:
+    耗时 = []
+    for _ in range(重复):
+        起点 = time.perf_counter()
+        函数()
+        耗时.append(time.perf_counter() - 起点)
+    return 耗时
+
+
+def main():
+    解析器 = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    解析器.add_argument("--symbols", type=int, default=10000)
+    解析器.add_argument("--repeat", type=int, default=50)
+    解析器.add_argument("--top", type=int, default=20)
+    参数 = 解析器.parse_args()
+
+    合约列表 = 生成合约(参数.symbols)
+    代码列表 = [代码 for 代码, _ in 合约列表]
+    最近 = random.Random(1).sample(代码列表, 30)
+
+    原始代码 = [代码.lower() for 代码 in 代码列表]
+    for 轮次 in ("cold", "warm"):
+        起点 = time.perf_counter()
+        批量规范化合约代码(原始代码)
+        print(f"normalize_batch_{轮次}: symbols={len(原始代码)} {(time.perf_counter() - 起点) * 1000:.1f} ms")
+
+    起点 = time.perf_counter()
+    索引 = 合约搜索索引(合约列表, 最近)
+    print(f"build_index: symbols={len(索引)} {(time.perf_counter() - 起点) * 1000:.1f} ms")
+
+    全部索引耗时, 全部扫描耗时 = [], []
+    print(f"{'query':<12}{'index_p50_us':>14}{'index_max_us':>14}{'scan_p50_us':>14}{'hits':>8}")
+    for 查询 in 输入序列:
+        索引耗时 = 计时(lambda: 索引.搜索(查询, 参数.top), 参数.repeat)
+        扫描耗时 = 计时(lambda: 线性扫描(代码列表, 查询), 参数.repeat)
+        全部索引耗时.extend(索引耗时)
+        全部扫描耗时.extend(扫描耗时)
+        print(
+            f"{查询:<12}{statistics.median(索引耗时) * 1e6:>14.1f}{max(索引耗时) * 1e6:>14.1f}"
+            f"{statistics.median(扫描耗时) * 1e6:>14.1f}{len(线性扫描(代码列表, 查询)):>8}"
+        )
+    print(
+        f"keystroke: index_p50={statistics.median(全部索引耗时) * 1e6:.1f} us "
+        f"scan_p50={statistics.median(全部扫描耗时) * 1e6:.1f} us"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+"""测量冷启动：进程启动到悬浮牌首次绘制、到画出首个实时价格的耗时。
+
+每次测量都新开一个进程，用模拟行情源代替天勤会话，不需要网络和账号::
+
+    python benchmarks/bench_startup.py --runs 5
+
+lazy 为当前做法：tqsdk 在行情线程里导入；eager 在创建 QApplication 之前于主线程
+导入 tqsdk，对应改动前的启动顺序，用作对照。
+"""
+import argparse
+import importlib
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+_项目根 = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _子进程(模式: str, 超时秒: float):
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    sys.path.insert(0, _项目根)
+    if 模式 == "eager":
+        importlib.import_module("tqsdk")
+
+    from PySide6 import QtCore, QtWidgets
+
+    from badge_app.app import 主控制
+    from badge_app.backend import state
+    from badge_app.backend.feed import 模拟行情源
+    from badge_app.backend.hub import 设置行情源工厂
+    from badge_app.backend.latency import 全局启动计时
+
+    def 工厂():
+        # 与 _创建天勤会话 相同：在行情线程内导入 tqsdk 后再建会话
+        importlib.import_module("tqsdk")
+
+        全局启动计时.标记("tqsdk导入")
+        源 = 模拟行情源(每合约每秒笔数=20)
+        全局启动计时.标记("会话建立")
+        return 源
+
+    state.配置路径 = os.path.join(tempfile.mkdtemp(prefix="tq_badge_bench_"), "config.json")
+    设置行情源工厂(工厂)
+    应用 = QtWidgets.QApplication(sys.argv[:1])
+    控制 = 主控制(应用)
+
+    def 检查():
+        if 全局启动计时.已标记("首个实时价格"):
+            控制.退出()
+
+    定时器 = QtCore.QTimer()
+    定时器.timeout.connect(检查)
+    定时器.start(5)
+    QtCore.QTimer.singleShot(int(超时秒 * 1000), 控制.退出)
+    应用.exec()
+    print(json.dumps(全局启动计时.汇总(), ensure_ascii=False))
+
+
+def _测量一次(模式: str, 超时秒: float) -> dict[str, float]:
+    结果 = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--child", 模式, "--timeout", str(超时秒)],
+        capture_output=True, text=True, timeout=超时秒 + 30,
+    )
+    for 行 in reversed(结果.stdout.splitlines()):
+        if 行.startswith("{"):
+            return json.loads(行)
+    raise RuntimeError(f"子进程没有输出结果: {结果.stderr.strip()[-500:]}")
+
+
+def main():
+    解析器 = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    解析器.add_argument("--runs", type=int, default=5)
+    解析器.add_argument("--modes", nargs="+", default=["lazy", "eager"], choices=["lazy", "eager"])
+    解析器.add_argument("--timeout", type=float, default=20.0)
+    解析器.add_argument("--child", choices=["lazy", "eager"], help=argparse.SUPPRESS)
+    参数 = 解析器.parse_args()
+    if 参数.child:
+        _子进程(参数.child, 参数.timeout)
+        return
+
+    汇总 = {}
+    for 模式 in 参数.modes:
+        样本 = [_测量一次(模式, 参数.timeout) for _ in range(参数.runs)]
+        阶段列表 = dict.fromkeys(阶段 for 单次 in 样本 for 阶段 in 单次)
+        汇总[模式] = {
+            f"{阶段}_median_ms": round(statistics.median(单次[阶段] for 单次 in 样本 if 阶段 in 单次), 1)
+            for 阶段 in 阶段列表
+        }
+        print(f"{模式}: {汇总[模式]}", file=sys.stderr)
+    print(json.dumps(汇总, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
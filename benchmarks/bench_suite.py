@@ -0,0 +1,222 @@
+# -*- coding: utf-8 -*-
+"""基于模拟行情源的基准测试套件，输出 JSON 便于跨版本对比。
+
+不需要网络和账号，Qt 默认使用 offscreen 平台::
+
+    python benchmarks/bench_suite.py --output bench.json
+    python benchmarks/bench_suite.py --only format_price worker_loop --quick
+
+包含：
+ - format_price：格式化价格 单次耗时
+ - worker_loop：行情线程 在最大出价速度下每秒处理的唤醒数和价格数
+ - signal_to_paint：价格信号驱动 悬浮牌窗口 重绘的吞吐和延迟（两种渲染方式）
+ - switch_latency：共享会话内切换合约到收到首个价格的延迟
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import timeit
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import PySide6
+from PySide6 import QtCore, QtWidgets
+
+from badge_app.backend import state
+from badge_app.backend.feed import 模拟行情源
+from badge_app.backend.hub import 行情中心
+from badge_app.backend.latency import 全局延迟统计
+from badge_app.backend.market import 格式化价格
+from badge_app.backend.metrics import 全局指标
+
+结果格式版本 = 1
+
+
+def _计数(名称: str) -> float:
+    return 全局指标.计数器(名称, "").值
+
+
+def _运行事件循环(秒: float):
+    循环 = QtCore.QEventLoop()
+    QtCore.QTimer.singleShot(int(秒 * 1000), 循环.quit)
+    循环.exec()
+
+
+def _分位(样本: list[float]) -> dict:
+    if not 样本:
+        return {"count": 0}
+    有序 = sorted(样本)
+    return {
+        "count": len(有序),
+        "p50_ms": round(statistics.median(有序) * 1000, 3),
+        "p95_ms": round(有序[int((len(有序) - 1) * 0.95)] * 1000, 3),
+        "max_ms": round(有序[-1] * 1000, 3),
+    }
+
+
+def _合约列表(数量: int) -> list[str]:
+    return [f"SHFE.cu{2501 + i}" for i in range(数量)]
+
+
+def 测量格式化价格(参数) -> dict:
+    用例 = {"decs_known": (71230.0, 0), "decs_2": (4123.46, 2), "decs_unknown": (4123.46, None), "nan": (float("nan"), 1)}
+    结果 = {}
+    次数 = 20000 if 参数.quick else 200000
+    for 名称, (价格, 小数位) in 用例.items():
+        秒 = min(timeit.repeat(lambda: 格式化价格(价格, 小数位), number=次数, repeat=3))
+        结果[f"{名称}_ns"] = round(秒 / 次数 * 1e9, 1)
+    return 结果
+
+
+def 测量行情循环(参数) -> dict:
+    合约 = _合约列表(参数.symbols)
+    中心 = 行情中心("", "", 行情源工厂=lambda: 模拟行情源(每合约每秒笔数=0, 每批合约数=参数.batch))
+    for 代码 in 合约:
+        中心.订阅(代码)
+    _运行事件循环(0.3)
+    等待前, 投递前, 信号前 = (_计数(名) for 名 in (
+        "tq_badge_wait_update_total", "tq_badge_price_posts_total", "tq_badge_price_signals_total"))
+    起点 = time.perf_counter()
+    _运行事件循环(参数.duration)
+    耗时 = time.perf_counter() - 起点
+    中心.关闭()
+    return {
+        "symbols": len(合约),
+        "batch": 参数.batch,
+        "wakeups_per_s": round((_计数("tq_badge_wait_update_total") - 等待前) / 耗时, 1),
+        "prices_posted_per_s": round((_计数("tq_badge_price_posts_total") - 投递前) / 耗时, 1),
+        "price_signals_per_s": round((_计数("tq_badge_price_signals_total") - 信号前) / 耗时, 1),
+    }
+
+
+def 测量信号到重绘(参数) -> dict:
+    from badge_app.frontend.widgets import 悬浮牌窗口
+
+    结果 = {}
+    for 渲染方式 in ("widgets", "painter"):
+        state.配置["badge_renderer"] = 渲染方式
+        窗口 = 悬浮牌窗口()
+        窗口.show()
+        中心 = 行情中心("", "", 行情源工厂=lambda: 模拟行情源(每合约每秒笔数=参数.paint_rate, 最小变动=0.5, 价格小数位=1))
+        订阅 = 中心.订阅("SHFE.cu2501")
+        订阅.价格信号.connect(lambda 文本, 订阅=订阅, 窗口=窗口: 窗口.更新价格文本(文本, 订阅.最新时刻))
+        _运行事件循环(0.5)
+        全局延迟统计.重置()
+        重绘前, 信号前 = _计数("tq_badge_repaints_total"), _计数("tq_badge_price_signals_total")
+        起点 = time.perf_counter()
+        _运行事件循环(参数.duration)
+        耗时 = time.perf_counter() - 起点
+        中心.关闭()
+        窗口.close()
+        汇总 = 全局延迟统计.汇总()
+        结果[渲染方式] = {
+            "feed_ticks_per_s": 参数.paint_rate,
+            "price_signals_per_s": round((_计数("tq_badge_price_signals_total") - 信号前) / 耗时, 1),
+            "repaints_per_s": round((_计数("tq_badge_repaints_total") - 重绘前) / 耗时, 1),
+            "wake_to_paint": 汇总["唤醒→绘制"],
+            "pickup_to_paint": 汇总["领取→绘制"],
+        }
+    state.配置["badge_renderer"] = state.默认配置["badge_renderer"]
+    return 结果
+
+
+def 测量切换延迟(参数) -> dict:
+    合约 = _合约列表(参数.switch_symbols)
+    中心 = 行情中心("", "", 行情源工厂=lambda: 模拟行情源(每合约每秒笔数=参数.switch_rate))
+    订阅 = 中心.订阅(合约[0])
+    冷切换, 热切换, 超时数 = [], [], 0
+    for 轮次 in range(参数.rounds):
+        for 代码 in 合约[1:] + 合约[:1]:
+            循环 = QtCore.QEventLoop()
+            起点 = time.perf_counter()
+            新订阅 = 中心.切换订阅(订阅.合约, 代码)
+            if 新订阅.最新文本 in (None, "—"):
+                新订阅.价格信号.connect(循环.quit)
+                QtCore.QTimer.singleShot(5000, 循环.quit)
+                循环.exec()
+                新订阅.价格信号.disconnect(循环.quit)
+            秒 = time.perf_counter() - 起点
+            if 新订阅.最新文本 in (None, "—"):
+                超时数 += 1
+            else:
+                # 第一轮是冷订阅；之后切回的合约会话里已有截面，只差指令被行情线程取走
+                (冷切换 if 轮次 == 0 else 热切换).append(秒)
+            订阅 = 新订阅
+    中心.关闭()
+    return {
+        "symbols": len(合约),
+        "feed_ticks_per_symbol_per_s": 参数.switch_rate,
+        "poll_interval_s": state.配置["quote_poll_interval"],
+        "cold_switch": _分位(冷切换),
+        "warm_switch": _分位(热切换),
+        "timeouts": 超时数,
+    }
+
+
+基准列表 = {
+    "format_price": 测量格式化价格,
+    "worker_loop": 测量行情循环,
+    "signal_to_paint": 测量信号到重绘,
+    "switch_latency": 测量切换延迟,
+}
+
+
+def _版本信息() -> dict:
+    try:
+        提交 = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__)), capture_output=True, text=True, timeout=5,
+        ).stdout.strip()
+    except Exception:
+        提交 = ""
+    return {
+        "git_commit": 提交 or None,
+        "python": platform.python_version(),
+        "pyside6": PySide6.__version__,
+        "platform": platform.platform(),
+        "qt_platform": os.environ.get("QT_QPA_PLATFORM"),
+    }
+
+
+def main():
+    解析器 = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    解析器.add_argument("--only", nargs="+", choices=list(基准列表), help="只运行指定的基准")
+    解析器.add_argument("--output", help="结果 JSON 写入该文件，默认只打印到标准输出")
+    解析器.add_argument("--quick", action="store_true", help="缩短每项的运行时间")
+    解析器.add_argument("--duration", type=float, default=3.0, help="吞吐类基准的测量秒数")
+    解析器.add_argument("--symbols", type=int, default=50, help="worker_loop 订阅的合约数")
+    解析器.add_argument("--batch", type=int, default=10, help="worker_loop 每次唤醒出价的合约数")
+    解析器.add_argument("--paint-rate", type=float, default=200.0, help="signal_to_paint 的每秒出价笔数")
+    解析器.add_argument("--switch-symbols", type=int, default=6)
+    解析器.add_argument("--switch-rate", type=float, default=4.0, help="switch_latency 每合约每秒出价笔数")
+    解析器.add_argument("--rounds", type=int, default=2)
+    参数 = 解析器.parse_args()
+    if 参数.quick:
+        参数.duration = min(参数.duration, 1.0)
+
+    应用 = QtWidgets.QApplication(sys.argv[:1])
+    # 悬浮牌初次摆放会保存位置，不要碰用户自己的配置文件
+    state.配置路径 = os.path.join(tempfile.mkdtemp(prefix="tq_badge_bench_"), "config.json")
+    结果 = {"schema": 结果格式版本, "created_at": time.time(), "environment": _版本信息(), "results": {}}
+    for 名称 in 参数.only or list(基准列表):
+        起点 = time.perf_counter()
+        结果["results"][名称] = 基准列表[名称](参数)
+        print(f"{名称}: {time.perf_counter() - 起点:.1f}s", file=sys.stderr)
+    del 应用
+
+    文本 = json.dumps(结果, ensure_ascii=False, indent=2)
+    if 参数.output:
+        with open(参数.output, "w", encoding="utf-8") as f:
+            f.write(文本 + "\n")
+    print(文本)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+"""测量在共享会话内切换合约到收到新合约首个价格的延迟。
+
+需要真实的天勤账号（环境变量 TQ_USER / TQ_PASS）::
+
+    python benchmarks/bench_switch.py KQ.m@SHFE.cu KQ.m@SHFE.rb KQ.m@DCE.m --rounds 3
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PySide6 import QtCore
+
+from badge_app.backend.hub import 获取行情中心, 关闭行情中心
+
+
+class 切换测量(QtCore.QObject):
+    def __init__(self, 合约列表: list[str], 轮数: int, 超时秒: float):
+        super().__init__()
+        self.序列 = 合约列表 * 轮数
+        self.超时秒 = 超时秒
+        self.结果: list[tuple[str, float | None]] = []
+        self._订阅 = None
+        self._起点 = 0.0
+        self._超时 = QtCore.QTimer(self)
+        self._超时.setSingleShot(True)
+        self._超时.timeout.connect(self._记录超时)
+
+    def 开始(self):
+        # 第一个合约只用于建立会话，不计入结果
+        self._订阅 = 获取行情中心().订阅(self.序列[0])
+        self._订阅.价格信号.connect(self._预热完成)
+
+    def _预热完成(self, 文本):
+        self._订阅.价格信号.disconnect(self._预热完成)
+        self._下一个(1)
+
+    def _下一个(self, 序号: int):
+        if 序号 >= len(self.序列):
+            QtCore.QCoreApplication.quit()
+            return
+        旧 = self._订阅
+        self._序号 = 序号
+        self._起点 = time.perf_counter()
+        self._订阅 = 获取行情中心().切换订阅(旧.合约, self.序列[序号])
+        if self._订阅.最新文本 not in (None, "—"):
+            self._记录(self._订阅.最新文本)
+            return
+        self._订阅.价格信号.connect(self._记录)
+        self._超时.start(int(self.超时秒 * 1000))
+
+    def _记录(self, 文本):
+        if 文本 == "—":
+            return
+        self._超时.stop()
+        try:
+            self._订阅.价格信号.disconnect(self._记录)
+        except (RuntimeError, TypeError):
+            pass
+        self.结果.append((self._订阅.合约, time.perf_counter() - self._起点))
+        self._下一个(self._序号 + 1)
+
+    def _记录超时(self):
+        self._订阅.价格信号.disconnect(self._记录)
+        self.结果.append((self._订阅.合约, None))
+        self._下一个(self._序号 + 1)
+
+
+def main():
+    解析器 = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    解析器.add_argument("合约", nargs="+")
+    解析器.add_argument("--rounds", type=int, default=3)
+    解析器.add_argument("--timeout", type=float, default=10.0)
+    参数 = 解析器.parse_args()
+    if len(参数.合约) < 2:
+        解析器.error("至少需要两个合约才能测量切换")
+
+    应用 = QtCore.QCoreApplication(sys.argv)
+    测量 = 切换测量(参数.合约, 参数.rounds, 参数.timeout)
+    QtCore.QTimer.singleShot(0, 测量.开始)
+    应用.exec()
+    关闭行情中心()
+
+    耗时 = [秒 for _, 秒 in 测量.结果 if 秒 is not None]
+    for 合约, 秒 in 测量.结果:
+        print(f"{合约}\t{'timeout' if 秒 is None else f'{秒 * 1000:.1f} ms'}")
+    if 耗时:
+        print(
+            f"switch_to_first_price: n={len(耗时)} "
+            f"median={statistics.median(耗时) * 1000:.1f} ms max={max(耗时) * 1000:.1f} ms "
+            f"timeouts={len(测量.结果) - len(耗时)}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+from badge_app.backend.alerts import 价格提醒引擎
+
+合约 = "SHFE.cu2501"
+
+
+def _类型(提醒列表):
+    return [提醒.类型 for 提醒 in 提醒列表]
+
+
+def test_高于只在进入区间时触发一次():
+    引擎 = 价格提醒引擎({合约: [{"type": "above", "price": 100}]})
+    assert 引擎.评估({合约: 99}) == []
+    assert _类型(引擎.评估({合约: 100})) == ["above"]
+    assert 引擎.评估({合约: 101}) == []
+    assert 引擎.评估({合约: 105}) == []
+    # 回到阈值以下复位后再次触发
+    assert 引擎.评估({合约: 99}) == []
+    assert _类型(引擎.评估({合约: 102})) == ["above"]
+
+
+def test_低于的回差():
+    引擎 = 价格提醒引擎({合约: [{"type": "below", "price": 100, "rearm": 5}]})
+    assert _类型(引擎.评估({合约: 98})) == ["below"]
+    # 没有越过 阈值 + 回差 不复位
+    assert 引擎.评估({合约: 104}) == []
+    assert 引擎.评估({合约: 97}) == []
+    assert 引擎.评估({合约: 106}) == []
+    assert _类型(引擎.评估({合约: 99})) == ["below"]
+
+
+def test_穿越需要前一笔且离开回差后才再次触发():
+    引擎 = 价格提醒引擎({合约: [{"type": "cross", "price": 100, "rearm": 2}]})
+    # 第一笔没有前价，不算穿越
+    assert 引擎.评估({合约: 101}) == []
+    提醒 = 引擎.评估({合约: 99})
+    assert _类型(提醒) == ["cross"] and "下穿" in 提醒[0].文本
+    # 贴着阈值来回不再触发
+    assert 引擎.评估({合约: 100.5}) == []
+    assert 引擎.评估({合约: 99.5}) == []
+    assert 引擎.评估({合约: 97}) == []
+    提醒 = 引擎.评估({合约: 101})
+    assert _类型(提醒) == ["cross"] and "上穿" in 提醒[0].文本
+
+
+def test_涨跌幅默认以第一笔为参考价():
+    引擎 = 价格提醒引擎({合约: [{"type": "move_pct", "pct": 1}]})
+    assert 引擎.评估({合约: 200}) == []
+    assert 引擎.评估({合约: 201}) == []
+    提醒 = 引擎.评估({合约: 198})
+    assert _类型(提醒) == ["move_pct"] and 提醒[0].参考价 == 200
+    assert 引擎.评估({合约: 197}) == []
+
+
+def test_只判定本批更新的合约():
+    另一合约 = "DCE.m2501"
+    引擎 = 价格提醒引擎({合约: [{"type": "above", "price": 100}], 另一合约: [{"type": "above", "price": 10}]})
+    assert _类型(引擎.评估({合约: 150})) == ["above"]
+    # 合约 的价格仍高于阈值，但本批没有它的新价格
+    提醒 = 引擎.评估({另一合约: 11, "INE.sc2501": 1e9})
+    assert [(p.合约, p.类型) for p in 提醒] == [(另一合约, "above")]
+    assert 引擎.评估({合约: float("nan")}) == []
+
+
+def test_无效规则被跳过(capsys):
+    引擎 = 价格提醒引擎({合约: [{"type": "above"}, {"type": "nope", "price": 1}, {"type": "below", "price": 5}]})
+    assert len(引擎) == 1
+    assert "忽略无效的价格提醒规则" in capsys.readouterr().out
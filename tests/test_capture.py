@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+import math
+
+import pytest
+
+from badge_app.backend.capture import 回放行情源, 行情录制器
+
+_笔数 = [
+    ("SHFE.cu2501", 1000.0, 71230.0, 5.0, 71220.0, 71240.0),
+    ("SHFE.cu2501", 1000.5, 71240.0, 7.0, 71230.0, 71250.0),
+    ("DCE.m2501", 1001.0, 3012.0, 1.0, math.nan, 3013.0),
+    ("SHFE.cu2501", 1001.5, 71250.0, 9.0, 71240.0, 71260.0),
+]
+
+
+@pytest.fixture
+def 录制文件(tmp_path):
+    路径 = str(tmp_path / "ticks.tqt")
+    录制器 = 行情录制器(路径)
+    录制器.登记("SHFE.cu2501", 0, 10.0)
+    录制器.登记("DCE.m2501", None)
+    for 笔 in _笔数:
+        录制器.记录(*笔)
+    录制器.关闭()
+    return 路径
+
+
+def _全部回放(源, 合约列表):
+    quotes = {合约: 源.get_quote(合约) for 合约 in 合约列表}
+    结果 = []
+    while not 源.已结束:
+        源.wait_update()
+        for 合约, quote in quotes.items():
+            if 源.is_changing(quote):
+                结果.append((合约, quote["last_price"], quote["volume"]))
+    return quotes, 结果
+
+
+def test_录制后回放得到相同的逐笔(录制文件):
+    源 = 回放行情源(录制文件, 倍速=0, 每批笔数=1)
+    try:
+        assert len(源) == 2 + len(_笔数)
+        assert sorted(源.合约列表) == ["DCE.m2501", "SHFE.cu2501"]
+        quotes, 结果 = _全部回放(源, 源.合约列表)
+        assert 结果 == [(合约, 价, 量) for 合约, _, 价, 量, _, _ in _笔数]
+        assert 源.已回放笔数 == len(_笔数)
+        铜 = quotes["SHFE.cu2501"]
+        assert (铜["price_decs"], 铜["price_tick"]) == (0, 10.0)
+        assert 铜["datetime"] == "1970-01-01 08:16:41.500000"
+        assert math.isnan(quotes["DCE.m2501"]["bid_price1"])
+        assert quotes["DCE.m2501"]["price_decs"] is None
+    finally:
+        源.close()
+
+
+def test_只报告变化的字段(录制文件):
+    源 = 回放行情源(录制文件, 倍速=0, 每批笔数=1)
+    try:
+        铜 = 源.get_quote("SHFE.cu2501")
+        源.wait_update()
+        源.wait_update()
+        assert 源.is_changing(铜, "last_price")
+        assert 源.is_changing(铜, ["bid_price1", "volume"])
+        源.wait_update()
+        assert not 源.is_changing(铜)
+    finally:
+        源.close()
+
+
+def test_追加录制保留已有记录(录制文件):
+    录制器 = 行情录制器(录制文件)
+    录制器.记录("SHFE.cu2501", 1002.0, 71260.0, 10.0, 71250.0, 71270.0)
+    录制器.关闭()
+    源 = 回放行情源(录制文件, 倍速=0, 每批笔数=1)
+    try:
+        _, 结果 = _全部回放(源, ["SHFE.cu2501"])
+        assert [价 for _, 价, _ in 结果] == [71230.0, 71240.0, 71250.0, 71260.0]
+    finally:
+        源.close()
+
+
+def test_不是录制文件时报错(tmp_path):
+    路径 = tmp_path / "bad.tqt"
+    路径.write_bytes(b"not a capture file".ljust(96, b"\0"))
+    with pytest.raises(ValueError):
+        行情录制器(str(路径))
@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pytest
+
+from badge_app.backend.history import 行情环形缓冲
+
+
+def _写入(缓冲, 起, 止):
+    for i in range(起, 止):
+        缓冲.追加(float(i), 100.0 + i, float(i), 99.0 + i, 101.0 + i)
+
+
+def test_容量必须为正数():
+    with pytest.raises(ValueError):
+        行情环形缓冲(0)
+
+
+def test_未写满时按写入顺序返回():
+    缓冲 = 行情环形缓冲(4)
+    assert 缓冲.最新() is None
+    _写入(缓冲, 0, 3)
+    assert len(缓冲) == 3
+    assert 缓冲.最近()["时间"].tolist() == [0.0, 1.0, 2.0]
+    assert 缓冲.最新()["最新价"] == 102.0
+
+
+@pytest.mark.parametrize("写入笔数", [4, 5, 7, 8, 9, 23])
+def test_绕回后最近窗口连续且从旧到新(写入笔数):
+    缓冲 = 行情环形缓冲(4)
+    _写入(缓冲, 0, 写入笔数)
+    assert len(缓冲) == 4
+    期望 = [float(i) for i in range(写入笔数 - 4, 写入笔数)]
+    数据 = 缓冲.最近()
+    assert 数据["时间"].tolist() == 期望
+    assert 数据["最新价"].tolist() == [100.0 + t for t in 期望]
+    assert 缓冲.最近(2)["时间"].tolist() == 期望[-2:]
+    # 镜像写入让窗口在底层数组里连续，返回的是视图而不是副本
+    assert not 数据["时间"].flags.owndata
+
+
+def test_视图只读():
+    缓冲 = 行情环形缓冲(4)
+    _写入(缓冲, 0, 6)
+    with pytest.raises(ValueError):
+        缓冲.最近()["最新价"][0] = 0.0
+
+
+def test_读取新增只复制上次之后的部分():
+    缓冲 = 行情环形缓冲(4)
+    _写入(缓冲, 0, 3)
+    总数, 数据 = 缓冲.读取新增(0)
+    assert 总数 == 3 and 数据["时间"].tolist() == [0.0, 1.0, 2.0]
+
+    _写入(缓冲, 3, 5)
+    总数, 数据 = 缓冲.读取新增(总数)
+    assert 总数 == 5 and 数据["时间"].tolist() == [3.0, 4.0]
+    # 返回的是副本，之后的写入不会改动它
+    _写入(缓冲, 5, 9)
+    assert 数据["时间"].tolist() == [3.0, 4.0]
+
+    总数2, 数据 = 缓冲.读取新增(总数)
+    assert 总数2 == 9
+    # 新增超过容量时只能拿到最近 容量 笔
+    assert 数据["时间"].tolist() == [5.0, 6.0, 7.0, 8.0]
+    assert 缓冲.读取新增(总数2)[1]["时间"].size == 0
+
+
+def test_占用字节数固定():
+    缓冲 = 行情环形缓冲(16)
+    _写入(缓冲, 0, 100)
+    assert 缓冲.占用字节数 == 2 * 16 * 行情环形缓冲.每笔字节数
+    assert np.isfinite(缓冲.最近()["卖一价"]).all()
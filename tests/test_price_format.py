@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from badge_app.backend.market import 定点格式器, 格式化价格
+
+
+@pytest.mark.parametrize(
+    "小数位, 刻度, 文本",
+    [
+        (0, 0, "0"),
+        (0, 71230, "71230"),
+        (0, -15, "-15"),
+        (1, 7, "0.7"),
+        (1, -7, "-0.7"),
+        (2, 5, "0.05"),
+        (2, -5, "-0.05"),
+        (2, -12345, "-123.45"),
+        (4, 10000, "1.0000"),
+        (4, 1, "0.0001"),
+    ],
+)
+def test_定点格式器_按小数位补零(小数位, 刻度, 文本):
+    assert 定点格式器(小数位)(刻度) == 文本
+
+
+def test_定点格式器_无价格显示占位符():
+    assert 定点格式器(0)(None) == "—"
+    assert 定点格式器(2)(None) == "—"
+
+
+def test_定点格式器_同一小数位共用():
+    assert 定点格式器(2) is 定点格式器(2)
+
+
+@pytest.mark.parametrize(
+    "价格, 小数位, 文本",
+    [
+        (71230.0, 0, "71230"),
+        (3456.2, 1, "3456.2"),
+        # 浮点运算留下的尾差不影响刻度
+        (0.1 + 0.2, 1, "0.3"),
+        (1.1 * 3, 2, "3.30"),
+        (-0.0005, 4, "-0.0005"),
+        # 恰好落在半个刻度上时与 格式化价格 一样舍入到偶数
+        (2.5, 0, "2"),
+        (3.5, 0, "4"),
+        (-2.5, 0, "-2"),
+        (0.125, 2, "0.12"),
+        (0.375, 2, "0.38"),
+    ],
+)
+def test_价格转刻度后格式化(价格, 小数位, 文本):
+    # 与 行情循环._处理变化 相同：round(价格 × 10**小数位) 得到刻度
+    刻度 = round(价格 * 10 ** 小数位)
+    assert 定点格式器(小数位)(刻度) == 文本
+    assert 格式化价格(价格, 小数位) == 文本
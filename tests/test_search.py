@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from badge_app.backend.search import 合约搜索索引
+
+
+@pytest.fixture
+def 索引():
+    return 合约搜索索引(
+        [
+            ("SHFE.cu2501", 10),
+            ("SHFE.cu2502", 50),
+            ("KQ.m@SHFE.cu", 5),
+            ("DCE.cs2501", 100),
+            ("SHFE.au2501", 1),
+            ("CZCE.SR501", 7),
+            ("SHFE.cu2501", 999),
+        ],
+        最近合约=["SHFE.au2501"],
+    )
+
+
+def test_重复代码只保留第一次(索引):
+    assert len(索引) == 6
+    assert 索引.搜索("cu2501") == ["SHFE.cu2501"]
+
+
+def test_空查询按最近使用再按成交量(索引):
+    assert 索引.搜索("") == [
+        "SHFE.au2501", "DCE.cs2501", "SHFE.cu2502", "SHFE.cu2501", "CZCE.SR501", "KQ.m@SHFE.cu",
+    ]
+
+
+def test_完全相同排在代码前缀之前(索引):
+    # KQ.m@SHFE.cu 的合约部分恰好是 cu，成交量最小也排第一
+    assert 索引.搜索("cu") == ["KQ.m@SHFE.cu", "SHFE.cu2502", "SHFE.cu2501"]
+
+
+def test_月份前缀排在包含之前(索引):
+    结果 = 索引.搜索("501")
+    assert 结果[0] == "CZCE.SR501"
+    assert set(结果[1:]) == {"SHFE.au2501", "DCE.cs2501", "SHFE.cu2501"}
+
+
+def test_同一层级内最近使用优先于成交量(索引):
+    assert 索引.搜索("2501") == ["SHFE.au2501", "DCE.cs2501", "SHFE.cu2501"]
+
+
+def test_包含匹配需要至少三个字符(索引):
+    assert 索引.搜索("u2") == []
+    assert 索引.搜索("u250") == ["SHFE.au2501", "SHFE.cu2502", "SHFE.cu2501"]
+
+
+def test_不区分大小写且限制数量(索引):
+    # shfe.cu 与主连去掉 KQ.m@ 后的部分完全相同
+    assert 索引.搜索("SHFE.CU", 数量=1) == ["KQ.m@SHFE.cu"]
+    assert 索引.搜索("SHFE.CU2", 数量=1) == ["SHFE.cu2502"]
+    assert 索引.搜索("zz") == []